@@ -0,0 +1,177 @@
+# Heap objects allocated by gesture() and GestureCapture.update(), per call
+# and per dataset drained, before and after the in-place FIFO filter
+#
+# CPython can't say what CircuitPython would put on its heap, so the driver's
+# own frames are traced bytecode by bytecode and the steps that allocate on
+# MicroPython are counted:
+#
+#   * tuples, lists, dicts, sets, slices and strings built at runtime
+#     (constant tuples are free, they're in the bytecode)
+#   * functions and generators made, e.g. every `all(... for ...)`
+#   * tuple(), list(), bytes(), bytearray() and memoryview() calls, and
+#     list appends
+#
+# `for ... in range(...)` isn't counted: MicroPython compiles it to a plain
+# loop. Only the driver's code is traced, not the I2C calls under it.
+# `code-memtest.py` measures the same thing on the board with gc.mem_free().
+#
+# `Legacy` is the drain from before: each dataset copied into buf4, three
+# generator filters over it, and a list of tuples for the first and last.
+#
+# Usage: python bench_alloc.py [swipes]
+
+import dis
+import os
+import random
+import sys
+
+import fakes
+
+clock = fakes.VirtualClock()
+apds9960 = fakes.install(clock)
+
+from gesture_capture import GestureCapture  # pylint: disable=wrong-import-position
+
+SWIPES = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+POLL_S = 0.02
+GAP_S = 1.0
+
+ALLOCATING_OPS = {dis.opmap[name] for name in (
+    "BUILD_TUPLE", "BUILD_LIST", "BUILD_MAP", "BUILD_SET", "BUILD_SLICE", "BUILD_STRING",
+    "BUILD_CONST_KEY_MAP", "MAKE_FUNCTION", "RETURN_GENERATOR", "LIST_APPEND", "FORMAT_VALUE",
+) if name in dis.opmap}
+ALLOCATING_CALLS = (tuple, list, bytes, bytearray, memoryview)
+TRACED_FILES = {os.path.join(fakes.DRIVER_ROOT, name) for name in ("apds9960.py", "gesture_capture.py")}
+
+
+class Heap:
+    objects = 0
+
+
+def traced(code) -> bool:
+    return code.co_filename in TRACED_FILES or code.co_qualname.startswith("Legacy.")
+
+
+def opcode_tracer(frame, event, arg):
+    if not traced(frame.f_code):
+        return None
+    frame.f_trace_opcodes = True
+    if event == "opcode" and frame.f_code.co_code[frame.f_lasti] in ALLOCATING_OPS:
+        Heap.objects += 1
+    return opcode_tracer
+
+
+def call_profiler(frame, event, arg):
+    if event == "c_call" and traced(frame.f_code):
+        if arg in ALLOCATING_CALLS or getattr(arg, "__name__", None) == "append":
+            Heap.objects += 1
+
+
+def counted(call):
+    sys.settrace(opcode_tracer)
+    sys.setprofile(call_profiler)
+    try:
+        return call()
+    finally:
+        sys.settrace(None)
+        sys.setprofile(None)
+
+
+class Legacy(apds9960.APDS9960):
+    """gesture() with the old per-dataset unpacking"""
+
+    def gesture(self):
+        status = self.read_gesture_status()
+        frame = []
+        dataset_count = status[apds9960._GSTATUS_BLOCK_GFLVL]
+        if dataset_count > 0 and self._read8(apds9960._APDS9960_STATUS) & apds9960._BIT_MASK_STATUS_GINT:
+            if not self.buf129:
+                self.buf129 = bytearray(129)
+            buffer = self.buf129
+            buffer[0] = apds9960._APDS9960_GFIFO_U
+            if not self.buf8:
+                self.buf8 = bytearray(8)
+            buffer_dataset = bytearray(4) if not hasattr(self, "buf4") else self.buf4
+            self.buf4 = buffer_dataset
+            while dataset_count:
+                with self.i2c_device as i2c:
+                    i2c.write_then_readinto(
+                        buffer, buffer, out_end=1, in_start=1, in_end=min(129, 1 + (dataset_count * 4)))
+                idx = 0
+                for i in range(dataset_count):
+                    rec = i + 1
+                    idx = 1 + ((rec - 1) * 4)
+                    buffer_dataset[0] = buffer[idx]
+                    buffer_dataset[1] = buffer[idx + 1]
+                    buffer_dataset[2] = buffer[idx + 2]
+                    buffer_dataset[3] = buffer[idx + 3]
+                    if (
+                        (not all(val == 255 for val in buffer_dataset))
+                        and (not all(val == 0 for val in buffer_dataset))
+                        and (all(val >= 30 for val in buffer_dataset))
+                    ):
+                        if len(frame) < 2:
+                            frame.append(tuple(buffer_dataset))
+                        else:
+                            frame[1] = tuple(buffer_dataset)
+                apds9960.time.sleep(0.03)
+                dataset_count = self._read8(apds9960._APDS9960_GFLVL)
+        if len(frame) < 2:
+            return 0
+        for i in range(4):
+            self.buf8[i] = frame[0][i]
+            self.buf8[i + 4] = frame[1][i]
+        return self.classify(self.buf8)
+
+
+def run(mode):
+    sensor = fakes.APDS9960Model(clock)
+    bus = fakes.Bus(sensor)
+    apds = (Legacy if mode == "old gesture()" else apds9960.APDS9960)(bus)
+    apds.enable_proximity = True
+    apds.enable_gesture = True
+    apds.rotation = 90  # Takes the rotation lookup too
+    if mode == "capture":
+        check = GestureCapture(apds, fakes.Pin(sensor)).update
+    else:
+        check = apds.gesture
+
+    rng = random.Random(23)
+    names = sorted(fakes.DIRECTIONS)
+    start = clock.now + 0.5
+    for i in range(SWIPES):
+        sensor.play(fakes.swipe(names[i % 4], start + i * GAP_S, datasets=rng.randint(16, 40), rng=rng))
+    end = start + SWIPES * GAP_S
+
+    calls = busy_calls = busy_objects = idle_objects = gestures = 0
+    worst = 0
+    while clock.now < end:
+        popped = sensor.popped
+        Heap.objects = 0
+        if counted(check):
+            gestures += 1
+        calls += 1
+        if sensor.popped > popped:
+            busy_calls += 1
+            busy_objects += Heap.objects
+        else:
+            idle_objects += Heap.objects
+        worst = max(worst, Heap.objects)
+        clock.sleep(POLL_S)
+
+    return {
+        "gestures": gestures,
+        "idle": idle_objects / max(1, calls - busy_calls),
+        "busy": busy_objects / max(1, busy_calls),
+        "dataset": (busy_objects + idle_objects) / max(1, sensor.popped),
+        "worst": worst,
+    }
+
+
+print("{} swipes of 16-40 datasets, rotation 90".format(SWIPES))
+print(" {:14} | {:>8} | {:>9} | {:>9} | {:>11} | {:>10}".format(
+    "path", "gestures", "idle call", "busy call", "per dataset", "worst call"))
+for mode in ("old gesture()", "gesture()", "capture"):
+    stats = run(mode)
+    print(" {:14} | {:8} | {:9.2f} | {:9.1f} | {:11.2f} | {:10}".format(
+        mode, stats["gestures"], stats["idle"], stats["busy"], stats["dataset"], stats["worst"]))
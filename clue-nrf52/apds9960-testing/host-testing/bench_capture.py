@@ -0,0 +1,125 @@
+# Polled gesture() vs. GestureCapture, from a main loop that's busy elsewhere
+#
+# Each pass of the loop checks for a gesture and then blocks for WORK_S, a
+# stand-in for display refreshes and the rest of an app. Swipes of 16 to 40
+# datasets (45-110 ms) arrive every GAP_S or so, in all four directions.
+#
+#   * gesture(): the driver's polled call, once per pass
+#   * capture + INT: GestureCapture.update() with the INT pin
+#   * capture, no pin: GestureCapture.update() reading status every pass
+#
+# Reported: swipes classified right / wrong / missed, worst and mean time a
+# single call blocked the loop, I2C transactions per pass, and decision
+# latency from the end of a swipe to its gesture code coming back.
+#
+# The swipes are written out with fakes.write_stream() and replayed from the
+# file, as a recording from a real sensor would be. Pass a recorded stream to
+# replay that instead; its swipes aren't labelled, so only detections count.
+#
+# Usage: python bench_capture.py [swipes] [stream file]
+
+import os
+import random
+import sys
+import tempfile
+
+import fakes
+
+clock = fakes.VirtualClock()
+apds9960 = fakes.install(clock)
+
+from gesture_capture import GestureCapture  # pylint: disable=wrong-import-position
+
+SWIPES = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+STREAM = sys.argv[2] if len(sys.argv) > 2 else None
+GAP_S = 1.5
+WORK_S = (0.01, 0.05, 0.1, 0.2, 0.3)
+
+
+def synthesize(path):
+    rng = random.Random(22)
+    names = sorted(fakes.DIRECTIONS)
+    gestures, labels = [], []
+    for i in range(SWIPES):
+        name = names[rng.randrange(len(names))]
+        gestures.append(fakes.swipe(name, 0.0, datasets=rng.randint(16, 40), rng=rng))
+        labels.append(fakes.DIRECTIONS[name][0])
+    fakes.write_stream(path, gestures)
+    return labels
+
+
+def run(mode, gestures, labels, work_s):
+    sensor = fakes.APDS9960Model(clock)
+    bus = fakes.Bus(sensor)
+    apds = apds9960.APDS9960(bus)
+    apds.enable_proximity = True
+    apds.enable_gesture = True
+    if mode == "gesture()":
+        check = apds.gesture
+    else:
+        capture = GestureCapture(apds, fakes.Pin(sensor) if mode == "capture + INT" else None)
+        check = capture.update
+
+    rng = random.Random(7)
+    start = clock.now + 0.5
+    swipes = []  # [start, end, label, answered]
+    when = start
+    for datasets, label in zip(gestures, labels):
+        when += rng.uniform(-0.2, 0.2)
+        sensor.play(datasets, at=when)
+        swipes.append([when, when + datasets[-1][0] - datasets[0][0], label, False])
+        when += GAP_S
+    bus.reset_counts()
+
+    passes = detected = correct = wrong = 0
+    blocked = []
+    latencies = []
+    while clock.now < when:
+        before = clock.now
+        result = check()
+        blocked.append(clock.now - before)
+        passes += 1
+        if result:
+            detected += 1
+            started = [swipe for swipe in swipes if swipe[0] <= clock.now and not swipe[3]]
+            if started:
+                swipe = started[-1]
+                swipe[3] = True
+                latencies.append(clock.now - swipe[1])
+                if swipe[2] is not None:
+                    correct += swipe[2] == result
+                    wrong += swipe[2] != result
+        clock.sleep(work_s)
+
+    missed = sum(not swipe[3] for swipe in swipes)
+    return {
+        "detected": detected,
+        "correct": correct,
+        "wrong": wrong,
+        "missed": missed,
+        "worst_ms": max(blocked) * 1000,
+        "mean_ms": sum(blocked) / passes * 1000,
+        "xfers": bus.transactions / passes,
+        "latency_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "overflows": sensor.dropped,
+    }
+
+
+if STREAM:
+    replay = fakes.read_stream(STREAM)
+    answers = [None] * len(replay)
+else:
+    path = os.path.join(tempfile.mkdtemp(), "swipes.txt")
+    answers = synthesize(path)
+    replay = fakes.read_stream(path)
+
+print("{} swipes ~{} s apart{}".format(len(replay), GAP_S, ", from " + STREAM if STREAM else ""))
+print(" {:>7} | {:16} | {:>7} | {:>5} | {:>6} | {:>8} | {:>7} | {:>6} | {:>10} | {:>7}".format(
+    "work ms", "mode", "correct", "wrong", "missed", "worst ms", "mean ms", "xfers", "latency ms", "dropped"))
+for work in WORK_S:
+    for mode in ("gesture()", "capture + INT", "capture, no pin"):
+        stats = run(mode, replay, answers, work)
+        correct = "{}/{}".format(stats["correct"], len(replay)) if not STREAM else str(stats["detected"])
+        print(" {:7.0f} | {:16} | {:>7} | {:5} | {:6} | {:8.1f} | {:7.2f} | {:6.2f} | {:10.1f} | {:7}".format(
+            work * 1000, mode, correct, stats["wrong"], stats["missed"], stats["worst_ms"], stats["mean_ms"],
+            stats["xfers"], stats["latency_ms"], stats["overflows"]))
@@ -0,0 +1,183 @@
+# Gesture classification accuracy and CPU cost: first/last datasets vs.
+# the full-trajectory fit
+#
+# A labelled corpus of PER_LABEL gestures for each of up/down/left/right, the
+# four diagonals, and near/far goes through the driver's gesture() on the
+# chip model. The swipes vary in length (3-50 datasets, so some very fast),
+# peak counts, noise, path angle, speed through the middle and per-channel
+# gain, and GLITCH of datasets have one channel well off. The corpus is
+# written with fakes.write_stream() and replayed from the file. Pass a
+# labelled corpus recorded off a real sensor to use that instead.
+#
+#   * first/last: the driver's own classify()
+#   * trajectory: TrajectoryClassifier() with the driver's threshold
+#   * +diag/near: TrajectoryClassifier(diagonal=DIAGONAL, near_far=NEAR_FAR)
+#
+# Reported: accuracy on the cardinal swipes (and on the fast ones, 8
+# datasets or fewer, among them), on diagonals, on near/far and
+# overall (a classifier that can't report diagonals or near/far gets those
+# wrong by design). Then the CPU per gesture to classify the useful datasets,
+# after the FIFO filter: bytecodes executed, a rough proxy for time on the
+# board, and CPython microseconds, where only the ratio carries over.
+#
+# Usage: python bench_classify.py [per label] [corpus file]
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import fakes
+
+clock = fakes.VirtualClock()
+apds9960 = fakes.install(clock)
+
+from gesture_trajectory import TrajectoryClassifier  # pylint: disable=wrong-import-position
+
+PER_LABEL = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+CORPUS = sys.argv[2] if len(sys.argv) > 2 else None
+DIAGONAL = 50
+NEAR_FAR = 40
+GLITCH = 0.08
+GAP_S = 1.0
+POLL_S = 0.02
+
+
+def synthesize(path):
+    rng = random.Random(24)
+    gestures, labels = [], []
+    for name in fakes.GESTURES:
+        for _ in range(PER_LABEL):
+            gains = [rng.uniform(0.85, 1.15) for _ in range(4)]
+            noise = rng.randint(2, 8)
+            if name in ("near", "far"):
+                datasets = fakes.approach(name, 0.0, datasets=rng.randint(20, 70), peak=rng.randint(120, 240),
+                                          noise=noise, rng=rng, gains=gains, glitch=GLITCH)
+            else:
+                skew = 8 if name in fakes.DIAGONALS else 20
+                datasets = fakes.swipe(name, 0.0, datasets=rng.choice((rng.randint(3, 8), rng.randint(8, 50))),
+                                       peak=rng.randint(60, 240), floor=rng.randint(30, 60), noise=noise, rng=rng,
+                                       angle=rng.uniform(-skew, skew), warp=rng.uniform(-0.6, 0.6), gains=gains,
+                                       glitch=GLITCH)
+            gestures.append(datasets)
+            labels.append(name)
+    fakes.write_stream(path, gestures, labels, header=("Synthetic corpus from bench_classify.py",))
+
+
+def replay(corpus, trajectory):
+    """gesture() result for each corpus entry, through the chip model"""
+    sensor = fakes.APDS9960Model(clock)
+    bus = fakes.Bus(sensor)
+    apds = apds9960.APDS9960(bus)
+    apds.enable_proximity = True
+    apds.enable_gesture = True
+    apds.trajectory = trajectory
+
+    results = []
+    for _, datasets in corpus:
+        start = clock.now + 0.1
+        sensor.play(datasets, at=start)
+        end = start + datasets[-1][0] - datasets[0][0] + 0.3
+        result = 0
+        while clock.now < end and not result:
+            result = apds.gesture()
+            clock.sleep(POLL_S)
+        clock.advance_to(end + GAP_S)
+        results.append(result)
+    return results
+
+
+def useful(datasets):
+    """The datasets the driver's FIFO filter keeps"""
+    return [(u, d, l, r) for _, u, d, l, r in datasets
+            if min(u, d, l, r) >= 30 and not (u == d == l == r == 255)]
+
+
+class Ops:
+    count = 0
+
+
+def opcode_tracer(frame, event, arg):
+    frame.f_trace_opcodes = True
+    if event == "opcode":
+        Ops.count += 1
+    return opcode_tracer
+
+
+def first_last(apds, kept):
+    frame = apds.buf8
+    for n, (u, d, l, r) in enumerate(kept):
+        # What the drain does per useful dataset, to keep the first and last
+        pos = 4 if n else 0
+        frame[pos] = u
+        frame[pos + 1] = d
+        frame[pos + 2] = l
+        frame[pos + 3] = r
+    return apds.classify(frame) if len(kept) >= 2 else 0
+
+
+def fitted(classifier, kept):
+    classifier.reset()
+    for u, d, l, r in kept:
+        classifier.add(u, d, l, r)
+    return classifier.classify()
+
+
+def cpu(corpus, classify):
+    """Bytecodes and CPython us per gesture"""
+    kept = [useful(datasets) for _, datasets in corpus]
+    Ops.count = 0
+    sys.settrace(opcode_tracer)
+    try:
+        for datasets in kept:
+            classify(datasets)
+    finally:
+        sys.settrace(None)
+    ops = Ops.count / len(kept)
+
+    repeats = 20
+    begin = time.perf_counter()
+    for _ in range(repeats):
+        for datasets in kept:
+            classify(datasets)
+    elapsed = time.perf_counter() - begin
+    return ops, elapsed * 1000000 / repeats / len(kept)
+
+
+if CORPUS:
+    corpus = fakes.read_corpus(CORPUS)
+else:
+    corpus_path = os.path.join(tempfile.mkdtemp(), "corpus.txt")
+    synthesize(corpus_path)
+    corpus = fakes.read_corpus(corpus_path)
+corpus = [(label, datasets) for label, datasets in corpus if label in fakes.GESTURES]
+
+host = apds9960.APDS9960(fakes.Bus(fakes.APDS9960Model(clock)))
+host.buf8 = bytearray(8)
+classifiers = (
+    ("first/last", None, lambda kept: first_last(host, kept)),
+    ("trajectory", TrajectoryClassifier(), None),
+    ("+diag/near", TrajectoryClassifier(diagonal=DIAGONAL, near_far=NEAR_FAR), None),
+)
+groups = (
+    ("cardinal", lambda label, datasets: label in fakes.DIRECTIONS),
+    ("fast", lambda label, datasets: label in fakes.DIRECTIONS and len(datasets) <= 8),
+    ("diagonal", lambda label, datasets: label in fakes.DIAGONALS),
+    ("near/far", lambda label, datasets: label in ("near", "far")),
+    ("overall", lambda label, datasets: True),
+)
+
+print("{} gestures{}, diagonal {}%, near/far {}%".format(
+    len(corpus), ", from " + CORPUS if CORPUS else ", {:.0f}% glitched".format(GLITCH * 100), DIAGONAL, NEAR_FAR))
+print(" {:11} | {:>9} | {:>9} | {:>9} | {:>9} | {:>9} | {:>10} | {:>10}".format(
+    "classifier", *(name for name, _ in groups), "bytecodes", "CPython us"))
+for name, classifier, offline in classifiers:
+    results = replay(corpus, classifier)
+    scores = []
+    for _, member in groups:
+        picked = [(label, result) for (label, datasets), result in zip(corpus, results) if member(label, datasets)]
+        right = sum(fakes.GESTURES[label][0] == result for label, result in picked)
+        scores.append("{:.1f}%".format(100 * right / len(picked)) if picked else "-")
+    ops, us = cpu(corpus, offline or (lambda kept, c=classifier: fitted(c, kept)))
+    print(" {:11} | {:>9} | {:>9} | {:>9} | {:>9} | {:>9} | {:10.0f} | {:10.1f}".format(name, *scores, ops, us))
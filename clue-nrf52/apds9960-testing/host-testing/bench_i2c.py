@@ -0,0 +1,169 @@
+# I2C traffic of the v2 driver vs. the same driver before the config shadow
+# and the gesture status burst read
+#
+# `Legacy` puts back the old register access: every bit get/set reads the
+# register from the chip first. `legacy_gesture()` repeats the old gesture()
+# I/O sequence (GSTATUS, GFLVL and STATUS reads up front, GFLVL again before
+# every FIFO drain) without classifying, since only the traffic is compared.
+#
+#   * setters: enabling the engines and setting the prox interrupt, as an
+#     app's setup would
+#   * idle: gesture() polled with nothing in front of the sensor
+#   * swipes: gesture() polled every POLL_S through swipes in all directions
+#   * overflow: polled every 0.5 s, so long swipes overflow the FIFO
+#
+# Reported per gesture() call (or per setter): transactions, bytes on the
+# wire and wire time at 100 kHz, plus how many swipes the v2 driver got right.
+#
+# Usage: python bench_i2c.py [swipes]
+
+import random
+import sys
+
+import fakes
+
+clock = fakes.VirtualClock()
+apds9960 = fakes.install(clock)
+
+SWIPES = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+POLL_S = 0.02
+GAP_S = 1.5
+IDLE_CALLS = 200
+
+
+class Legacy(apds9960.APDS9960):
+    """Config registers read back from the chip on every bit access"""
+
+    def _get_bit(self, register, mask):
+        buf = self.buf2
+        buf[0] = register
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(buf, buf, out_end=1, in_start=1)
+        return bool(buf[1] & mask)
+
+    def _set_bit(self, register, mask, value):
+        buf = self.buf2
+        buf[0] = register
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(buf, buf, out_end=1, in_start=1)
+        if value:
+            buf[1] |= mask
+        else:
+            buf[1] &= ~mask
+        with self.i2c_device as i2c:
+            i2c.write(buf, end=2)
+
+    def _get_bits(self, register, pos, mask):
+        return (self._read8(register) & mask) >> pos
+
+    def _set_bits(self, register, pos, mask, value):
+        buf = self.buf2
+        buf[0] = register
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(buf, buf, out_end=1, in_start=1)
+        buf[1] = (buf[1] & ~mask) | (value << pos)
+        with self.i2c_device as i2c:
+            i2c.write(buf, end=2)
+
+    def gesture(self):
+        """The old gesture() reads, datasets discarded"""
+        if self._get_bit(apds9960._APDS9960_GSTATUS, apds9960._BIT_MASK_GSTATUS_GFOV):
+            self._set_bit(apds9960._APDS9960_GCONF4, apds9960._BIT_MASK_GCONF4_GFIFO_CLR, True)
+            wait_cycles = 0
+            while (
+                not self._get_bit(apds9960._APDS9960_STATUS, apds9960._BIT_MASK_STATUS_GINT)
+                and wait_cycles <= 30
+            ):
+                apds9960.time.sleep(0.003)
+                wait_cycles += 1
+
+        datasets_available = self._read8(apds9960._APDS9960_GFLVL)
+        if self._get_bit(apds9960._APDS9960_STATUS, apds9960._BIT_MASK_STATUS_GINT) and datasets_available > 0:
+            if not self.buf129:
+                self.buf129 = bytearray(129)
+            buffer = self.buf129
+            buffer[0] = apds9960._APDS9960_GFIFO_U
+            while True:
+                dataset_count = self._read8(apds9960._APDS9960_GFLVL)
+                if dataset_count == 0:
+                    break
+                with self.i2c_device as i2c:
+                    i2c.write_then_readinto(
+                        buffer, buffer, out_end=1, in_start=1, in_end=min(129, 1 + (dataset_count * 4)))
+                apds9960.time.sleep(0.03)
+        return 0
+
+
+def make(cls):
+    sensor = fakes.APDS9960Model(clock)
+    bus = fakes.Bus(sensor)
+    apds = cls(bus)
+    apds.enable_proximity = True
+    apds.enable_gesture = True
+    bus.reset_counts()
+    return sensor, bus, apds
+
+
+def setters(cls):
+    _, bus, apds = make(cls)
+    apds.enable_proximity = False
+    apds.enable_gesture = False
+    bus.reset_counts()
+    apds.enable_proximity = True
+    apds.enable_proximity_interrupt = True
+    apds.proximity_interrupt_threshold = (0, 5, 4)
+    apds.enable_gesture = True
+    apds.enable_color = True
+    return bus, 5, 0, 0
+
+
+def idle(cls):
+    _, bus, apds = make(cls)
+    for _ in range(IDLE_CALLS):
+        apds.gesture()
+        clock.sleep(POLL_S)
+    return bus, IDLE_CALLS, 0, 0
+
+
+def swipes(cls, poll_s=POLL_S, datasets=24):
+    sensor, bus, apds = make(cls)
+    rng = random.Random(21)
+    names = sorted(fakes.DIRECTIONS)
+    expected = []
+    start = clock.now + 0.5
+    for i in range(SWIPES):
+        name = names[i % len(names)]
+        sensor.play(fakes.swipe(name, start + i * GAP_S, datasets=datasets, rng=rng))
+        expected.append((start + i * GAP_S, fakes.DIRECTIONS[name][0]))
+
+    calls = correct = 0
+    end = start + SWIPES * GAP_S
+    while clock.now < end:
+        result = apds.gesture()
+        calls += 1
+        if result:
+            # Credit it to the latest swipe that's started
+            due = [code for when, code in expected if when <= clock.now]
+            correct += bool(due) and due[-1] == result
+        clock.sleep(poll_s)
+    return bus, calls, correct, sensor.dropped
+
+
+scenarios = (
+    ("setters", setters),
+    ("idle", idle),
+    ("swipes", swipes),
+    ("overflow", lambda cls: swipes(cls, poll_s=0.5, datasets=60)),
+)
+
+print("{} swipes, polled every {} ms, 100 kHz".format(SWIPES, int(POLL_S * 1000)))
+print(" {:9} | {:6} | {:>6} | {:>7} | {:>8} | {:>6} | {:>7} | {:>8} | {:>7}".format(
+    "scenario", "driver", "calls", "xfers", "bytes", "wire us", "correct", "dropped", "per"))
+for name, scenario in scenarios:
+    for label, cls in (("old", Legacy), ("v2", apds9960.APDS9960)):
+        bus, calls, correct, dropped = scenario(cls)
+        per = "call" if name != "setters" else "setter"
+        correct = "{}/{}".format(correct, SWIPES) if cls is not Legacy and name in ("swipes", "overflow") else "-"
+        print(" {:9} | {:6} | {:6} | {:7.2f} | {:8.2f} | {:7.0f} | {:>7} | {:8} | {:>7}".format(
+            name, label, calls, bus.transactions / calls, (bus.bytes_written + bus.bytes_read) / calls,
+            bus.wire_s * 1000000 / calls, correct, dropped, per))
@@ -0,0 +1,160 @@
+# Gesture config tuning: the same recorded gestures replayed under different
+# GPENTH, GEXTH, GCONF1, GCONF2 and GPULSE settings
+#
+# The recording is either one made on a Clue with v2/clue-testing/
+# code-gesture-record.py, or, with no file given, PER_LABEL synthetic swipes
+# in each of up/down/left/right recorded here: fakes.ReplaySensor plays them
+# through the driver, and the same GestureRecorder the Clue uses reads the
+# FIFO every 5 ms into a file, config snapshot and all. Either way, what's
+# replayed comes out of a recording file.
+#
+# Each config in CONFIGS is written over the driver's defaults, and every
+# gesture replayed through a fakes.ReplaySensor, which rescales the recorded
+# counts for the new gain, LED drive and pulses, drops datasets for a longer
+# cycle, and enters and exits gesture mode on GPENTH, GEXTH and GEXPERS.
+#
+#   * gesture(): the driver's polled call, every POLL_S
+#   * capture: GestureCapture.update() with the INT pin, every POLL_S
+#
+# Reported: gestures classified right, wrong and missed by the first code
+# that comes back for them, extra codes for the same gesture (split, from the
+# engine exiting and re-entering partway through), mean latency from the last
+# recorded dataset to the first code (negative if it came back early), I2C
+# bytes per gesture (both directions, status reads included), and datasets
+# dropped by a full FIFO.
+#
+# Usage: python bench_tuning.py [per label] [recording file]
+
+import os
+import random
+import sys
+import tempfile
+
+import fakes
+
+clock = fakes.VirtualClock()
+apds9960 = fakes.install(clock)
+
+# pylint: disable=wrong-import-position
+import gesture_recorder
+from gesture_capture import GestureCapture
+from gesture_recorder import GestureRecorder
+
+clock.patch(gesture_recorder)
+
+PER_LABEL = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+RECORDING = sys.argv[2] if len(sys.argv) > 2 else None
+GAP_S = 1.0
+RECORD_POLL_S = 0.005
+POLL_S = 0.02
+TAIL_S = 0.5
+
+CONFIGS = (
+    ("defaults", {}),
+    ("low exit", {fakes.GEXTH: 0x0A}),
+    ("high enter", {fakes.GPENTH: 0x28}),
+    ("fast exit", {fakes.GCONF1: 0x80}),
+    ("fifo 16", {fakes.GCONF1: 0xC2}),
+    ("fifo 1", {fakes.GCONF1: 0x02}),
+    ("gain 8x", {fakes.GCONF2: 0x61}),
+    ("gain 1x", {fakes.GCONF2: 0x01}),
+    ("wait 14ms", {fakes.GCONF2: 0x44}),
+    ("32x 32us", {fakes.GPULSE: 0xDF}),
+)
+
+
+def sensor_and_driver():
+    sensor = fakes.ReplaySensor(clock)
+    bus = fakes.Bus(sensor)
+    apds = apds9960.APDS9960(bus)
+    apds.enable_proximity = True
+    apds.enable_gesture = True
+    return sensor, bus, apds
+
+
+def synthesize(path):
+    """Record tapered swipes through GestureRecorder, as on the board"""
+    rng = random.Random(25)
+    sensor, _, apds = sensor_and_driver()
+    with open(path, "w") as stream:
+        stream.write("# Synthetic recording from bench_tuning.py\n")
+        recorder = GestureRecorder(apds, stream)
+        recorder.configure()
+        recorded = {address: value for address, value in gesture_recorder.RECORDING_CONFIG}
+        config = dict(fakes.DEFAULT_CONFIG)
+        config.update(recorded)
+        period = fakes.cycle_time(config)
+
+        names = sorted(fakes.DIRECTIONS) * PER_LABEL
+        rng.shuffle(names)
+        for name in names:
+            gains = [rng.uniform(0.85, 1.15) for _ in range(4)]
+            datasets = fakes.swipe(name, 0.0, datasets=rng.randint(12, 45), peak=rng.randint(80, 230),
+                                   floor=rng.randint(20, 50), period=period, noise=rng.randint(2, 6), rng=rng,
+                                   angle=rng.uniform(-20, 20), warp=rng.uniform(-0.5, 0.5), gains=gains,
+                                   taper=0.3)
+            recorder.label = name
+            sensor.play(datasets, at=clock.now + 0.1, recorded=recorded)
+            end = clock.now + GAP_S
+            while clock.now < end:
+                recorder.poll()
+                clock.sleep(RECORD_POLL_S)
+    return recorder
+
+
+def replay(recording, config, mode):
+    sensor, bus, apds = sensor_and_driver()
+    for address, value in config.items():
+        apds.write_register(address, value)
+    if mode == "capture":
+        check = GestureCapture(apds, fakes.Pin(sensor)).update
+    else:
+        check = apds.gesture
+    bus.reset_counts()
+
+    stats = {"correct": 0, "wrong": 0, "missed": 0, "split": 0, "latency": [], "dropped": 0}
+    for label, datasets, regs in recording:
+        clock.sleep(GAP_S)
+        start = clock.now
+        end = start + datasets[-1][0] - datasets[0][0]
+        sensor.play(datasets, at=start, recorded=regs)
+        results = []
+        while clock.now < end + TAIL_S:
+            result = check()
+            if result:
+                if not results:
+                    stats["latency"].append(clock.now - end)
+                results.append(result)
+            clock.sleep(POLL_S)
+        if not results:
+            stats["missed"] += 1
+            continue
+        stats["split"] += len(results) - 1
+        if fakes.GESTURES[label][0] == results[0]:
+            stats["correct"] += 1
+        else:
+            stats["wrong"] += 1
+    stats["dropped"] = sensor.dropped
+    stats["bytes"] = (bus.bytes_written + bus.bytes_read) / len(recording)
+    return stats
+
+
+if RECORDING:
+    path = RECORDING
+else:
+    path = os.path.join(tempfile.mkdtemp(), "recording.txt")
+    made = synthesize(path)
+    print("Recorded {} swipes, {} datasets, {} overflows".format(made.gestures, made.datasets, made.overflows))
+recording = [entry for entry in fakes.read_recording(path) if entry[0] in fakes.GESTURES]
+
+print("{} labelled gestures{}, polled every {:.0f} ms".format(
+    len(recording), ", from " + RECORDING if RECORDING else "", POLL_S * 1000))
+print(" {:10} | {:10} | {:>7} | {:>5} | {:>6} | {:>5} | {:>10} | {:>13} | {:>7}".format(
+    "config", "mode", "correct", "wrong", "missed", "split", "latency ms", "bytes/gesture", "dropped"))
+for name, config in CONFIGS:
+    for mode in ("gesture()", "capture"):
+        stats = replay(recording, config, mode)
+        latency = stats["latency"]
+        print(" {:10} | {:10} | {:>7} | {:5} | {:6} | {:5} | {:10.1f} | {:13.0f} | {:7}".format(
+            name, mode, "{}/{}".format(stats["correct"], len(recording)), stats["wrong"], stats["missed"],
+            stats["split"], sum(latency) / len(latency) * 1000 if latency else 0.0, stats["bytes"], stats["dropped"]))
@@ -0,0 +1,604 @@
+"""
+Host-side stand-ins for the I2C bus and the APDS-9960 itself, so the `v2`
+driver can be exercised and benchmarked under CPython on a virtual clock.
+
+    import fakes
+    clock = fakes.VirtualClock()
+    sensor = fakes.APDS9960Model(clock)
+    bus = fakes.Bus(sensor)
+    apds9960 = fakes.install(clock)
+    apds = apds9960.APDS9960(bus)
+
+    sensor.play(fakes.swipe("up", start=1.0))
+    clock.advance_to(1.2)
+    print(apds.gesture(), bus.transactions, bus.bytes_read)
+
+`Bus` counts transactions and bytes and moves the clock along by how long
+they'd take on the wire. `APDS9960Model` keeps a register file and feeds its
+gesture FIFO from scripted (time, U, D, L, R) datasets as the clock passes
+them, with the overflow, GFLVL, GSTATUS, STATUS and GMODE behaviour the
+driver relies on.
+"""
+
+import math
+import os
+import random
+import sys
+import types
+from collections import deque
+
+DRIVER_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "v2")
+CLUE_TESTING_ROOT = os.path.join(DRIVER_ROOT, "clue-testing")
+
+I2C_ADDRESS = 0x39
+DEVICE_ID = 0xAB
+ENABLE = 0x80
+STATUS = 0x93
+GPENTH = 0xA0
+GEXTH = 0xA1
+GCONF1 = 0xA2
+GCONF2 = 0xA3
+GPULSE = 0xA6
+GCONF4 = 0xAB
+GFLVL = 0xAE
+GSTATUS = 0xAF
+AICLEAR = 0xE7
+GFIFO_U = 0xFC
+
+ENABLE_PON = 0x01
+ENABLE_GEN = 0x40
+STATUS_GINT = 0x04
+GCONF4_GMODE = 0x01
+GCONF4_GIEN = 0x02
+GCONF4_GFIFO_CLR = 0x04
+GSTATUS_GVALID = 0x01
+GSTATUS_GFOV = 0x02
+
+FIFO_DEPTH = 32
+FIFO_THRESHOLDS = (1, 4, 8, 16)  # GCONF1<GFIFOTH>
+DATASET_PERIOD_S = 0.0028  # One gesture engine cycle at the driver's defaults
+
+# The registers a gesture config is made of, and what set_defaults writes to them
+GESTURE_CONFIG = (GPENTH, GEXTH, GCONF1, GCONF2, GPULSE)
+DEFAULT_CONFIG = {GPENTH: 0x05, GEXTH: 0x1E, GCONF1: 0x82, GCONF2: 0x41, GPULSE: 0x85}
+GEXPERS_CYCLES = (1, 2, 4, 7)  # GCONF1<GEXPERS>
+GGAIN = (1, 2, 4, 8)  # GCONF2<GGAIN>
+GLDRIVE_MA = (100, 50, 25, 12.5)  # GCONF2<GLDRIVE>
+GWTIME_S = (0.0, 0.0028, 0.0056, 0.0084, 0.014, 0.0224, 0.0308, 0.0392)  # GCONF2<GWTIME>
+GPLEN_S = (0.000004, 0.000008, 0.000016, 0.000032)  # GPULSE<GPLEN>
+CYCLE_OVERHEAD_S = 0.0005  # Rough, the datasheet doesn't say
+
+I2C_BITS_PER_BYTE = 9  # 8 data bits and an ACK
+I2C_FRAMING_BITS = 2  # START and STOP, or a repeated START
+I2C_CALL_S = 0.00015  # CircuitPython's own cost per I2CDevice transaction
+
+
+class VirtualClock:
+    """Time only moves when something sleeps or advances it"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def monotonic_ns(self) -> int:
+        return int(self.now * 1000000000)
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+    def advance_to(self, when: float) -> None:
+        if when > self.now:
+            self.now = when
+
+    def patch(self, module) -> None:
+        module.time = types.SimpleNamespace(
+            monotonic=self.monotonic, monotonic_ns=self.monotonic_ns, sleep=self.sleep)
+
+
+class APDS9960Model:
+    """Register file and gesture FIFO of an APDS-9960.
+
+    `play(datasets)` schedules one gesture: (time, U, D, L, R) datasets that
+    go into the FIFO as the clock reaches them, while the engine is enabled.
+    GMODE is set from the first dataset to the last, and the engine exiting
+    with data left in the FIFO raises GINT, as does GFLVL passing GFIFOTH.
+    A full FIFO drops new datasets and sets GFOV."""
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.regs = bytearray(256)
+        self.regs[0x92] = DEVICE_ID
+        self.regs[0x81] = 0xFF  # ATIME
+        self.regs[0x8F] = 0x00  # CONTROL
+        self.fifo = deque()
+        self.overflow = False
+        self.exited = False  # Engine left gesture mode with datasets still queued
+        self._pending = deque()  # Scheduled datasets not in the FIFO yet
+        self._bursts = deque()  # (start, end) of each scheduled gesture
+        self.pushed = 0
+        self.dropped = 0
+        self.popped = 0
+
+    def play(self, datasets, at: float = None) -> None:
+        """Schedule a gesture, shifted to start `at` if given"""
+        datasets = list(datasets)
+        if not datasets:
+            return
+        if at is not None:
+            shift = at - datasets[0][0]
+            datasets = [(dataset[0] + shift,) + tuple(dataset[1:]) for dataset in datasets]
+        self._pending.extend(datasets)
+        self._bursts.append((datasets[0][0], datasets[-1][0]))
+
+    @property
+    def engine_on(self) -> bool:
+        enable = self.regs[ENABLE]
+        return bool(enable & ENABLE_PON and enable & ENABLE_GEN)
+
+    def threshold(self) -> int:
+        return FIFO_THRESHOLDS[self.regs[GCONF1] >> 6]
+
+    def update(self) -> None:
+        now = self.clock.now
+        pending = self._pending
+        while pending and pending[0][0] <= now:
+            dataset = pending.popleft()
+            if not self.engine_on:
+                continue
+            if len(self.fifo) >= FIFO_DEPTH:
+                self.overflow = True
+                self.dropped += 1
+                continue
+            self.fifo.append(dataset[1:])
+            self.pushed += 1
+
+        gmode = False
+        bursts = self._bursts
+        while bursts and bursts[0][1] < now:
+            bursts.popleft()
+            if self.fifo:
+                self.exited = True
+        if bursts and bursts[0][0] <= now and self.engine_on:
+            gmode = True
+        if gmode:
+            self.regs[GCONF4] |= GCONF4_GMODE
+        else:
+            self.regs[GCONF4] &= ~GCONF4_GMODE & 0xFF
+
+    def gint(self) -> bool:
+        return bool(self.fifo) and (len(self.fifo) > self.threshold() or self.exited or self.overflow)
+
+    def interrupt(self) -> bool:
+        """INT pin asserted (active low on the real thing): GINT with GIEN set"""
+        self.update()
+        return self.gint() and bool(self.regs[GCONF4] & GCONF4_GIEN)
+
+    def _read_register(self, register: int) -> int:
+        if register == GFLVL:
+            return len(self.fifo)
+        if register == GSTATUS:
+            return (GSTATUS_GVALID if len(self.fifo) >= self.threshold() else 0) | (
+                GSTATUS_GFOV if self.overflow else 0)
+        if register == STATUS:
+            return self.regs[STATUS] & ~STATUS_GINT & 0xFF | (STATUS_GINT if self.gint() else 0)
+        return self.regs[register]
+
+    def read(self, register: int, count: int) -> bytes:
+        self.update()
+        out = bytearray(count)
+        if register >= GFIFO_U:
+            # FIFO reads pop whole datasets, U/D/L/R each
+            for i in range(count // 4):
+                if not self.fifo:
+                    break
+                out[i * 4:i * 4 + 4] = bytes(self.fifo.popleft())
+                self.popped += 1
+            if not self.fifo:
+                self.exited = False
+            return bytes(out)
+        for i in range(count):
+            out[i] = self._read_register((register + i) & 0xFF)
+        return bytes(out)
+
+    def write(self, data: bytes) -> None:
+        self.update()
+        register = data[0]
+        if register == AICLEAR and len(data) == 1:
+            return
+        for i, value in enumerate(data[1:]):
+            address = (register + i) & 0xFF
+            if address == GCONF4 and value & GCONF4_GFIFO_CLR:
+                self.fifo.clear()
+                self.overflow = False
+                self.exited = False
+                value &= ~GCONF4_GFIFO_CLR
+            if address in (GFLVL, GSTATUS, STATUS, 0x92):
+                continue  # Read-only
+            self.regs[address] = value
+
+
+def gesture_response(regs) -> float:
+    """Relative gesture channel counts under a config: gain, LED drive, pulses
+    and pulse length all scale the signal"""
+    gconf2 = regs[GCONF2]
+    gpulse = regs[GPULSE]
+    return (GGAIN[(gconf2 >> 5) & 3] * GLDRIVE_MA[(gconf2 >> 3) & 3]
+            * ((gpulse & 0x3F) + 1) * GPLEN_S[gpulse >> 6])
+
+
+def cycle_time(regs) -> float:
+    """Approximate seconds per gesture engine cycle under a config: four
+    channels of pulses, then GWTIME"""
+    gpulse = regs[GPULSE]
+    pulses = 4 * ((gpulse & 0x3F) + 1) * GPLEN_S[gpulse >> 6] * 2
+    return CYCLE_OVERHEAD_S + pulses + GWTIME_S[regs[GCONF2] & 7]
+
+
+class ReplaySensor(APDS9960Model):
+    """Plays recorded datasets back as the light the sensor sees, rather than
+    as what its FIFO held, so the config the driver has written decides what
+    the gesture engine makes of them:
+
+    * counts scale with GGAIN, GLDRIVE, GPULSE and GPLEN against the
+      `recorded` config, saturating at 255
+    * a longer cycle (GWTIME, more or longer pulses) skips datasets
+    * the engine enters when any channel reaches GPENTH (standing in for
+      PDATA) and exits once every channel's been under GEXTH for GEXPERS
+      cycles, or the recording runs out
+    * GFIFOTH sets the FIFO threshold, as in `APDS9960Model`
+
+    GEXMSK, offsets and the proximity engine's own config aren't modelled. A
+    recording only holds what the engine passed at the time, so record with
+    a permissive config (see `gesture_recorder.RECORDING_CONFIG`) and replay
+    with stricter ones."""
+
+    def __init__(self, clock: VirtualClock):
+        super().__init__(clock)
+        self._samples = deque()  # (t, U, D, L, R, response recorded under)
+        self.in_gesture = False
+        self._below = 0
+        self._next_cycle = 0.0
+        self._last_sample = None
+
+    def play(self, datasets, at: float = None, recorded=None) -> None:
+        """Schedule recorded datasets, made under the `recorded` registers
+        ({address: value}, the driver's defaults if not given)"""
+        datasets = list(datasets)
+        if not datasets:
+            return
+        config = dict(DEFAULT_CONFIG)
+        config.update(recorded or {})
+        response = gesture_response(config)
+        shift = 0.0 if at is None else at - datasets[0][0]
+        self._samples.extend((dataset[0] + shift,) + tuple(dataset[1:]) + (response,) for dataset in datasets)
+
+    def _exit(self) -> None:
+        self.in_gesture = False
+        if self.fifo:
+            self.exited = True
+
+    def update(self) -> None:
+        now = self.clock.now
+        regs = self.regs
+        samples = self._samples
+        period = cycle_time(regs)
+        while samples and samples[0][0] <= now:
+            t, u, d, l, r, response = samples.popleft()
+            self._last_sample = t
+            if not self.engine_on or t < self._next_cycle - period / 4:
+                continue  # Engine off, or still busy with its last cycle
+            self._next_cycle = t + period
+
+            scale = gesture_response(regs) / response
+            dataset = tuple(min(255, int(value * scale)) for value in (u, d, l, r))
+            loudest = max(dataset)
+            if not self.in_gesture:
+                if loudest < max(1, regs[GPENTH]):
+                    continue
+                self.in_gesture = True
+                self._below = 0
+
+            if len(self.fifo) >= FIFO_DEPTH:
+                self.overflow = True
+                self.dropped += 1
+            else:
+                self.fifo.append(dataset)
+                self.pushed += 1
+
+            self._below = self._below + 1 if loudest < regs[GEXTH] else 0
+            if self._below >= GEXPERS_CYCLES[regs[GCONF1] & 3]:
+                self._exit()
+
+        # Past the end of the recording the hand's gone, and the counts with it
+        if self.in_gesture and self._last_sample is not None and (not samples or samples[0][0] > now):
+            if now >= self._last_sample + GEXPERS_CYCLES[regs[GCONF1] & 3] * period:
+                self._exit()
+
+        if self.in_gesture:
+            regs[GCONF4] |= GCONF4_GMODE
+        else:
+            regs[GCONF4] &= ~GCONF4_GMODE & 0xFF
+
+
+class Pin:
+    """The sensor's INT line as a pulled-up `digitalio.DigitalInOut`, low while asserted"""
+
+    def __init__(self, device: APDS9960Model):
+        self.device = device
+        self.reads = 0
+
+    @property
+    def value(self) -> bool:
+        self.reads += 1
+        return not self.device.interrupt()
+
+
+class Bus:
+    """`busio.I2C` with one device on it. Counts transactions (a
+    write_then_readinto is one, with a repeated start) and bytes each way, and
+    advances the clock by the wire time at `frequency` plus `call_s`."""
+
+    def __init__(self, device: APDS9960Model, frequency: int = 100000, call_s: float = I2C_CALL_S):
+        self.device = device
+        self.frequency = frequency
+        self.call_s = call_s
+        self.reset_counts()
+
+    def reset_counts(self) -> None:
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.wire_s = 0.0
+
+    def _account(self, written: int, read: int) -> None:
+        bits = I2C_FRAMING_BITS + (1 + written) * I2C_BITS_PER_BYTE
+        if read:
+            bits += I2C_FRAMING_BITS + (1 + read) * I2C_BITS_PER_BYTE
+        wire = bits / self.frequency
+        self.transactions += 1
+        self.bytes_written += written
+        self.bytes_read += read
+        self.wire_s += wire
+        self.device.clock.sleep(wire + self.call_s)
+
+    def write(self, data) -> None:
+        self._account(len(data), 0)
+        self.device.write(bytes(data))
+
+    def write_then_read(self, out, count: int) -> bytes:
+        self._account(len(out), count)
+        return self.device.read(out[0], count)
+
+
+class I2CDevice:
+    """`adafruit_bus_device.i2c_device.I2CDevice` on a `Bus`"""
+
+    def __init__(self, i2c: Bus, device_address: int, probe: bool = True):
+        if device_address != I2C_ADDRESS:
+            raise ValueError("No I2C device at address: 0x{:x}".format(device_address))
+        self.i2c = i2c
+        self.device_address = device_address
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def write(self, buf, *, start: int = 0, end: int = None) -> None:
+        self.i2c.write(buf[start:len(buf) if end is None else end])
+
+    def readinto(self, buf, *, start: int = 0, end: int = None) -> None:
+        raise NotImplementedError("The APDS9960 driver always addresses a register first")
+
+    def write_then_readinto(self, out_buffer, in_buffer, *, out_start: int = 0, out_end: int = None,
+                            in_start: int = 0, in_end: int = None) -> None:
+        out = out_buffer[out_start:len(out_buffer) if out_end is None else out_end]
+        in_end = len(in_buffer) if in_end is None else in_end
+        in_buffer[in_start:in_end] = self.i2c.write_then_read(out, in_end - in_start)
+
+
+GESTURES = {
+    # gesture() code, then which end of the U/D and L/R axes the hand reaches
+    # first: 1 for U (or L), -1 for D (or R), 0 for no motion along it
+    "up": (1, 1, 0),
+    "down": (2, -1, 0),
+    "left": (3, 0, 1),
+    "right": (4, 0, -1),
+    "near": (5, 0, 0),
+    "far": (6, 0, 0),
+    "up-left": (7, 1, 1),
+    "up-right": (8, 1, -1),
+    "down-left": (9, -1, 1),
+    "down-right": (10, -1, -1),
+}
+DIRECTIONS = {name: GESTURES[name] for name in ("up", "down", "left", "right")}
+DIAGONALS = {name: GESTURES[name] for name in ("up-left", "up-right", "down-left", "down-right")}
+
+
+def _dataset(t, channels, gains, noise, rng, glitch=0.0):
+    if gains:
+        channels = [value * gain for value, gain in zip(channels, gains)]
+    if glitch and rng.random() < glitch:
+        # Ambient IR flicker or a reflection, one channel way off for a dataset
+        channels = list(channels)
+        channels[rng.randrange(4)] *= rng.choice((0.6, 1.5))
+    return (t,) + tuple(max(0, min(255, int(value) + rng.randint(-noise, noise))) for value in channels)
+
+
+def _fade(i: int, datasets: int, taper: float) -> float:
+    if not taper or datasets < 2:
+        return 1.0
+    progress = i / (datasets - 1)
+    return min(1.0, progress / taper, (1 - progress) / taper)
+
+
+def swipe(direction: str, start: float, datasets: int = 24, peak: int = 180, floor: int = 40,
+          period: float = DATASET_PERIOD_S, noise: int = 3, rng: random.Random = None,
+          angle: float = 0.0, warp: float = 0.0, gains=None, glitch: float = 0.0, taper: float = 0.0):
+    """Datasets for a hand passing over the sensor: counts rise and fall on
+    all four channels, and the lead moves from one end of `direction`'s
+    axis to the other. For up/down/left/right the other pair stays balanced.
+
+    `angle` turns the path by that many degrees, `warp` (-1 to 1) speeds the
+    hand up or slows it down through the middle, and `gains` scales the
+    U/D/L/R channels, for a sensor that doesn't read them all the same.
+    `glitch` is the chance of any one dataset having a channel way off.
+    `taper` fades everything in from, and out to, nothing over that fraction
+    of the gesture at each end, for recordings that start and end in the dark."""
+    _, lead_ud, lead_lr = GESTURES[direction]
+    if lead_ud and lead_lr:
+        lead_ud *= math.sqrt(0.5)
+        lead_lr *= math.sqrt(0.5)
+    if angle:
+        radians = math.radians(angle)
+        lead_ud, lead_lr = (lead_ud * math.cos(radians) - lead_lr * math.sin(radians),
+                            lead_ud * math.sin(radians) + lead_lr * math.cos(radians))
+    rng = rng or random.Random(0)
+    out = []
+    for i in range(datasets):
+        progress = i / (datasets - 1) if datasets > 1 else 0.5
+        if warp:
+            progress -= warp * math.sin(2 * math.pi * progress) / (2 * math.pi)
+        envelope = peak * (0.4 + 0.6 * math.sin(math.pi * progress))
+        fade = _fade(i, datasets, taper)
+        envelope *= fade
+        floor_now = floor * fade
+        u = floor_now + envelope * (0.5 + lead_ud * (0.5 - progress))
+        d = floor_now + envelope * (0.5 - lead_ud * (0.5 - progress))
+        l = floor_now + envelope * (0.5 + lead_lr * (0.5 - progress))
+        r = floor_now + envelope * (0.5 - lead_lr * (0.5 - progress))
+        out.append(_dataset(start + i * period, (u, d, l, r), gains, noise, rng, glitch))
+    return out
+
+
+def approach(kind: str, start: float, datasets: int = 40, peak: int = 200, floor: int = 35,
+             period: float = DATASET_PERIOD_S, noise: int = 3, rng: random.Random = None, gains=None,
+             glitch: float = 0.0, taper: float = 0.0):
+    """Datasets for a hand coming straight down onto the sensor and pulling
+    away quickly ("near"), or starting close and rising away slowly ("far").
+    All four channels move together."""
+    if kind not in ("near", "far"):
+        raise ValueError("kind must be near or far")
+    rng = rng or random.Random(0)
+    out = []
+    for i in range(datasets):
+        progress = i / (datasets - 1) if datasets > 1 else 0.5
+        if kind == "far":
+            progress = 1 - progress
+        if progress < 0.75:
+            level = 0.25 + progress  # Closing in...
+        elif progress < 0.9:
+            level = 1.0  # ...holding...
+        else:
+            level = 1.0 - (progress - 0.9) * 6  # ...and gone
+        fade = _fade(i, datasets, taper)
+        value = (floor + peak * level * 0.5) * fade
+        out.append(_dataset(start + i * period, (value, value, value, value), gains, noise, rng, glitch))
+    return out
+
+
+def gesture(name: str, start: float, rng: random.Random = None, **kwargs):
+    """Datasets for any of `GESTURES`"""
+    if name in ("near", "far"):
+        return approach(name, start, rng=rng, **kwargs)
+    return swipe(name, start, rng=rng, **kwargs)
+
+
+def write_stream(path: str, gestures, labels=None, header=None) -> None:
+    """Save gestures, each a list of (time, U, D, L, R) datasets, as text:
+    one dataset per line and a blank line after each gesture. With `labels`,
+    each gesture starts with a "> label" line, which makes the file a labelled
+    corpus. `header` lines are written as comments at the top."""
+    with open(path, "w") as stream:
+        for line in header or ():
+            stream.write("# {}\n".format(line))
+        stream.write("# seconds U D L R\n")
+        for i, datasets in enumerate(gestures):
+            if labels is not None:
+                stream.write("> {}\n".format(labels[i]))
+            for t, u, d, l, r in datasets:
+                stream.write("{:.6f} {} {} {} {}\n".format(t, u, d, l, r))
+            stream.write("\n")
+
+
+def read_recording(path: str):
+    """(label, datasets, registers) for each gesture in a `write_stream()` or
+    `gesture_recorder` file. The registers ({address: value}) are the last
+    "# reg" snapshot before the gesture, empty if there wasn't one. Labels
+    are `None` where there's none."""
+    recording, label, datasets, regs = [], None, [], {}
+    with open(path) as stream:
+        for line in stream:
+            line = line.strip()
+            if line.startswith("#"):
+                fields = line[1:].split()
+                if len(fields) == 4 and fields[0] == "reg":
+                    regs = dict(regs)
+                    regs[int(fields[2], 16)] = int(fields[3], 16)
+                continue
+            if line.startswith(">") or not line:
+                if datasets:
+                    recording.append((label, datasets, regs))
+                datasets = []
+                label = line[1:].strip() if line else None
+                continue
+            t, u, d, l, r = line.split()
+            datasets.append((float(t), int(u), int(d), int(l), int(r)))
+    if datasets:
+        recording.append((label, datasets, regs))
+    return recording
+
+
+def read_corpus(path: str):
+    """(label, datasets) for each gesture in a `write_stream()` file, label
+    `None` where it has none"""
+    return [(label, datasets) for label, datasets, _ in read_recording(path)]
+
+
+def read_stream(path: str):
+    """Gestures from a `write_stream()` file, each a list of datasets"""
+    return [datasets for _, datasets in read_corpus(path)]
+
+
+def _fake_const(value):
+    return value
+
+
+def install(clock: VirtualClock):
+    """Register the fake modules and return the `v2` driver module, its
+    sleeps running on `clock`"""
+    micropython = types.ModuleType("micropython")
+    micropython.const = _fake_const
+    sys.modules["micropython"] = micropython
+
+    bus_device = types.ModuleType("adafruit_bus_device")
+    i2c_device = types.ModuleType("adafruit_bus_device.i2c_device")
+    i2c_device.I2CDevice = I2CDevice
+    bus_device.i2c_device = i2c_device
+    sys.modules["adafruit_bus_device"] = bus_device
+    sys.modules["adafruit_bus_device.i2c_device"] = i2c_device
+
+    busio = types.ModuleType("busio")
+    busio.I2C = Bus  # Only used for typing
+    sys.modules["busio"] = busio
+    digitalio = types.ModuleType("digitalio")
+    digitalio.DigitalInOut = Pin  # Only used for typing
+    sys.modules["digitalio"] = digitalio
+
+    for root in (CLUE_TESTING_ROOT, DRIVER_ROOT):
+        if root not in sys.path:
+            sys.path.insert(0, root)
+
+    import importlib  # pylint: disable=import-outside-toplevel
+    driver = importlib.import_module("apds9960")
+    clock.patch(driver)
+
+    # As installed on the board, for the clue-testing scripts
+    package = types.ModuleType("adafruit_apds9960")
+    package.apds9960 = driver
+    sys.modules["adafruit_apds9960"] = package
+    sys.modules["adafruit_apds9960.apds9960"] = driver
+    return driver
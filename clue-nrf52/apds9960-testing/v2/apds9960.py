@@ -91,7 +91,7 @@ _APDS9960_GCONF2 = const(0xA3)
 # _APDS9960_GOFFSET_L  = const(0xA7)
 # _APDS9960_GOFFSET_R  = const(0xA9)
 _APDS9960_GPULSE = const(0xA6)
-# _APDS9960_GCONF3 = const(0xAA)
+_APDS9960_GCONF3 = const(0xAA)
 _APDS9960_GCONF4 = const(0xAB)
 _APDS9960_GFLVL = const(0xAE)
 _APDS9960_GSTATUS = const(0xAF)
@@ -112,6 +112,27 @@ _BIT_MASK_ENABLE_GESTURE = const(0x40)
 _BIT_MASK_STATUS_GINT = const(0x04)
 _BIT_MASK_GSTATUS_GFOV = const(0x02)
 _BIT_MASK_GCONF4_GFIFO_CLR = const(0x04)
+_BIT_MASK_GCONF4_GIEN = const(0x02)
+
+# Config registers written far more than the chip changes them. The driver keeps a
+# shadow copy of ENABLE through GCONF3, so bit setters are one write with no read.
+# GCONF4 isn't one of them: the chip sets and clears its GMODE bit, and writing
+# GMODE forces the gesture engine in (1) or out (0), so it's read-modify-write.
+_SHADOW_BASE = const(0x80)
+_SHADOW_LEN = const(0x2B)
+_SHADOWED = (
+    _APDS9960_ENABLE,
+    _APDS9960_PERS,
+    _APDS9960_CONTROL,
+    _APDS9960_GCONF1,
+    _APDS9960_GCONF2,
+    _APDS9960_GCONF3,
+)
+
+# Gesture status block, GCONF4 through GSTATUS in one read: GMODE, GFLVL and GFOV
+_GSTATUS_BLOCK_LEN = const(5)
+_GSTATUS_BLOCK_GFLVL = const(3)
+_GSTATUS_BLOCK_GSTATUS = const(4)
 
 _BIT_POS_PERS_PPERS = const(4)
 _BIT_MASK_PERS_PPERS = const(0xF0)
@@ -164,14 +185,20 @@ class APDS9960:
         self.rotation = rotation
 
         self.buf129 = None  # Gesture FIFO buffer
-        self.buf4 = None  # Gesture data processing buffer
+        self.buf8 = None  # First and last useful gesture datasets
+        # Optional gesture_trajectory.TrajectoryClassifier, fed every useful dataset
+        self.trajectory = None
         self.buf2 = bytearray(2)  # I2C communication buffer
+        self.buf_gstatus = bytearray(_GSTATUS_BLOCK_LEN)
+        self._shadow = bytearray(_SHADOW_LEN)
 
         self.i2c_device = I2CDevice(i2c, _APDS9960_I2C_ADDRESS)
 
         if self._read8(_APDS9960_ID) != _DEVICE_ID:
             raise RuntimeError()
 
+        self.reload_config()
+
         if reset:
             # Disable prox, gesture, and color engines
             self.enable_proximity = False
@@ -193,7 +220,7 @@ class APDS9960:
             self.clear_interrupt()
 
             # Clear gesture FIFOs and interrupt
-            self._set_bit(_APDS9960_GCONF4, _BIT_MASK_GCONF4_GFIFO_CLR, True)
+            self.clear_gesture_fifo()
 
             # Disable sensor and all functions/interrupts and wait for sleep delay to finish
             self._write8(_APDS9960_ENABLE, 0)
@@ -278,10 +305,37 @@ class APDS9960:
                 _APDS9960_PERS, _BIT_POS_PERS_PPERS, _BIT_MASK_PERS_PPERS, persist
             )
 
+    def reload_config(self) -> None:
+        """Re-read the shadowed config registers from the chip, for when
+        something other than this driver has written to them"""
+        buf = self.buf2
+        buf[0] = _SHADOW_BASE
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(buf, self._shadow, out_end=1)
+
     def clear_interrupt(self) -> None:
         """Clear all non-gesture interrupts"""
         self._writecmdonly(_APDS9960_AICLEAR)
 
+    def write_register(self, register: int, value: int) -> None:
+        """Write a raw byte to a config register, for settings without a
+        property of their own (GPENTH, GEXTH, GCONF1, GCONF2, GPULSE...)"""
+        self._write8(register, value)
+
+    def read_gesture_status(self) -> bytearray:
+        """GCONF4 through GSTATUS in one 5 byte read: GCONF4 at 0, GFLVL at 3
+        and GSTATUS at 4. The buffer is reused, so it's only good until the next call."""
+        buf = self.buf2
+        buf[0] = _APDS9960_GCONF4
+        status = self.buf_gstatus
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(buf, status, out_end=1)
+        return status
+
+    def clear_gesture_fifo(self) -> None:
+        """Empty the gesture FIFO and clear GFOV and the gesture interrupt"""
+        self._set_bit(_APDS9960_GCONF4, _BIT_MASK_GCONF4_GFIFO_CLR, True)
+
     ## Gesture Properties
     @property
     def enable_gesture(self) -> bool:
@@ -293,6 +347,16 @@ class APDS9960:
         """If true, the sensor's gesture engine is enabled"""
         self._set_bit(_APDS9960_ENABLE, _BIT_MASK_ENABLE_GESTURE, value)
 
+    @property
+    def enable_gesture_interrupt(self) -> bool:
+        """If true, the gesture FIFO threshold and engine exit assert the interrupt pin"""
+        return self._get_bit(_APDS9960_GCONF4, _BIT_MASK_GCONF4_GIEN)
+
+    @enable_gesture_interrupt.setter
+    def enable_gesture_interrupt(self, value: bool) -> None:
+        """If true, the gesture FIFO threshold and engine exit assert the interrupt pin"""
+        self._set_bit(_APDS9960_GCONF4, _BIT_MASK_GCONF4_GIEN, value)
+
     @property
     def rotation(self) -> int:
         """Gesture rotation offset. Acceptable values are 0, 90, 180, 270."""
@@ -326,7 +390,8 @@ class APDS9960:
 
     ## GESTURE DETECTION
     # pylint: disable-msg=too-many-branches,too-many-locals,too-many-statements
-    # Yes, that's a lot of pylint disabling, but breaking this up eats a lot of memory on import
+    # Yes, that's a lot of pylint disabling, but breaking this up eats a lot of memory on import.
+    # classify() is the one piece split out, since gesture_capture needs it too.
     def gesture(self) -> int:
         """Returns gesture code if detected.
         0 if no gesture detected
@@ -334,25 +399,26 @@ class APDS9960:
         2 if down,
         3 if left,
         4 if right
+
+        With a `trajectory` classifier set, its codes: 5-10 for near, far
+        and the diagonals if it's configured to report them.
         """
-        # If FIFOs have overflowed we're already way too late, so clear those FIFOs and wait
-        if self._get_bit(_APDS9960_GSTATUS, _BIT_MASK_GSTATUS_GFOV):
-            self._set_bit(_APDS9960_GCONF4, _BIT_MASK_GCONF4_GFIFO_CLR, True)
-            wait_cycles = 0
-            # Don't wait forever though, just enough to see if a gesture is happening
-            while (
-                not self._get_bit(_APDS9960_STATUS, _BIT_MASK_STATUS_GINT)
-                and wait_cycles <= 30
-            ):
-                time.sleep(0.003)
-                wait_cycles += 1
-
-        # Only start retrieval if there are datasets to retrieve
-        frame = []
-        datasets_available = self._read8(_APDS9960_GFLVL)
+        status = self.read_gesture_status()
+
+        # After an overflow the FIFO still holds the start of the gesture, so it's
+        # drained as usual. GFOV is cleared once it's empty.
+        overflowed = status[_GSTATUS_BLOCK_GSTATUS] & _BIT_MASK_GSTATUS_GFOV
+
+        # Only start retrieval if there are datasets to retrieve. STATUS is a
+        # separate read, so it's only worth it when there are.
+        kept = 0
+        trajectory = self.trajectory
+        if trajectory is not None:
+            trajectory.reset()
+        dataset_count = status[_GSTATUS_BLOCK_GFLVL]
         if (
-            self._get_bit(_APDS9960_STATUS, _BIT_MASK_STATUS_GINT)
-            and datasets_available > 0
+            dataset_count > 0
+            and self._read8(_APDS9960_STATUS) & _BIT_MASK_STATUS_GINT
         ):
             if not self.buf129:
                 self.buf129 = bytearray(129)
@@ -360,17 +426,13 @@ class APDS9960:
             buffer = self.buf129
             buffer[0] = _APDS9960_GFIFO_U
 
-            if not self.buf4:
-                self.buf4 = bytearray(4)
+            if not self.buf8:
+                self.buf8 = bytearray(8)
 
-            buffer_dataset = self.buf4
+            frame = self.buf8
 
             # Retrieve new data until our FIFOs are truly empty
-            while True:
-                dataset_count = self._read8(_APDS9960_GFLVL)
-                if dataset_count == 0:
-                    break
-
+            while dataset_count:
                 with self.i2c_device as i2c:
                     i2c.write_then_readinto(
                         buffer,
@@ -380,45 +442,66 @@ class APDS9960:
                         in_end=min(129, 1 + (dataset_count * 4)),
                     )
 
-                # Unpack data stream into more usable U/D/L/R datasets for analysis
-                idx = 0
-                for i in range(dataset_count):
-                    rec = i + 1
-                    idx = 1 + ((rec - 1) * 4)
-
-                    buffer_dataset[0] = buffer[idx]
-                    buffer_dataset[1] = buffer[idx + 1]
-                    buffer_dataset[2] = buffer[idx + 2]
-                    buffer_dataset[3] = buffer[idx + 3]
-
-                    # Drop fully-saturated and fully-zero to conserve memory
-                    # Filter to remove useless (saturated, empty, low-count) datasets
-                    if (
-                        (not all(val == 255 for val in buffer_dataset))
-                        and (not all(val == 0 for val in buffer_dataset))
-                        and (all(val >= 30 for val in buffer_dataset))
-                    ):
-                        if len(frame) < 2:
-                            frame.append(tuple(buffer_dataset))
-                        else:
-                            frame[1] = tuple(buffer_dataset)
+                # Filter datasets straight out of the FIFO buffer, keeping only the
+                # first and last useful ones. No copies, so nothing's allocated per dataset.
+                for idx in range(1, min(129, 1 + (dataset_count * 4)), 4):
+                    u = buffer[idx]
+                    d = buffer[idx + 1]
+                    l = buffer[idx + 2]
+                    r = buffer[idx + 3]
+
+                    # Drop saturated, empty and low-count datasets. Any channel
+                    # under 30 covers all-zero too.
+                    if u < 30 or d < 30 or l < 30 or r < 30:
+                        continue
+                    if u == 255 and d == 255 and l == 255 and r == 255:
+                        continue
+
+                    pos = 4 if kept else 0
+                    frame[pos] = u
+                    frame[pos + 1] = d
+                    frame[pos + 2] = l
+                    frame[pos + 3] = r
+                    kept += 1
+                    if trajectory is not None:
+                        trajectory.add(u, d, l, r)
 
                 # Wait a very short time to see if new FIFO data has arrived before we drop out
                 time.sleep(0.03)
+                dataset_count = self._read8(_APDS9960_GFLVL)
+
+        if overflowed:
+            self.clear_gesture_fifo()
 
         # If we only got one useful frame, that's not enough to make a solid guess
-        if len(frame) < 2:
+        if kept < 2:
             return 0
 
-        # We should have a dataframe with two tuples now, a "first" and "last" entry.
-        # Time to process the dataframe!
+        if trajectory is not None:
+            return self.rotate(trajectory.classify())
+        return self.classify(self.buf8)
+
+    # pylint: disable-msg=too-many-branches
+    def classify(self, frame: bytearray, first: int = 0, last: int = 4) -> int:
+        """Gesture code from the first and last useful U/D/L/R datasets of a
+        gesture, found at offsets `first` and `last` of `frame`, rotated by
+        `rotation`. 0 if there's no clear direction."""
 
         # Determine our up/down and left/right ratios along with our first/last deltas
-        f_r_ud = ((frame[0][0] - frame[0][1]) * 100) // (frame[0][0] + frame[0][1])
-        f_r_lr = ((frame[0][2] - frame[0][3]) * 100) // (frame[0][2] + frame[0][3])
+        f_u = frame[first]
+        f_d = frame[first + 1]
+        f_l = frame[first + 2]
+        f_r = frame[first + 3]
+        l_u = frame[last]
+        l_d = frame[last + 1]
+        l_l = frame[last + 2]
+        l_r = frame[last + 3]
+
+        f_r_ud = ((f_u - f_d) * 100) // (f_u + f_d)
+        f_r_lr = ((f_l - f_r) * 100) // (f_l + f_r)
 
-        l_r_ud = ((frame[1][0] - frame[1][1]) * 100) // (frame[1][0] + frame[1][1])
-        l_r_lr = ((frame[1][2] - frame[1][3]) * 100) // (frame[1][2] + frame[1][3])
+        l_r_ud = ((l_u - l_d) * 100) // (l_u + l_d)
+        l_r_lr = ((l_l - l_r) * 100) // (l_l + l_r)
 
         delta_ud = l_r_ud - f_r_ud
         delta_lr = l_r_lr - f_r_lr
@@ -473,11 +556,16 @@ class APDS9960:
                 else:
                     gesture_found = 3
 
-        if gesture_found != 0:
+        return self.rotate(gesture_found)
+
+    def rotate(self, gesture_found: int) -> int:
+        """Gesture code turned by `rotation`. Near/far (5, 6) don't turn."""
+        if gesture_found != 0 and gesture_found not in (5, 6):
             if self._rotation != 0:
-                # If we need to rotate our gesture, lets do that before returning
-                dir_lookup = [1, 4, 2, 3]
-                idx = (dir_lookup.index(gesture_found) + self._rotation // 90) % 4
+                # If we need to rotate our gesture, lets do that before returning.
+                # Clockwise from up, diagonals between: a constant, unlike a list
+                dir_lookup = (1, 8, 4, 10, 2, 9, 3, 7)
+                idx = (dir_lookup.index(gesture_found) + self._rotation // 45) % 8
                 return dir_lookup[idx]
 
         return gesture_found
@@ -506,6 +594,8 @@ class APDS9960:
         buf[1] = abyte
         with self.i2c_device as i2c:
             i2c.write(buf)
+        if command in _SHADOWED:
+            self._shadow[command - _SHADOW_BASE] = abyte
 
     def _writecmdonly(self, command: int) -> None:
         """Writes a command and 0 bytes of data to the I2C device"""
@@ -524,6 +614,8 @@ class APDS9960:
 
     def _get_bit(self, register: int, mask: int) -> bool:
         """Gets a single bit value from the I2C device's register"""
+        if register in _SHADOWED:
+            return bool(self._shadow[register - _SHADOW_BASE] & mask)
         buf = self.buf2
         buf[0] = register
         with self.i2c_device as i2c:
@@ -532,6 +624,10 @@ class APDS9960:
 
     def _set_bit(self, register: int, mask: int, value: bool) -> None:
         """Sets a single bit value in the I2C device's register"""
+        if register in _SHADOWED:
+            current = self._shadow[register - _SHADOW_BASE]
+            self._write8(register, current | mask if value else current & ~mask)
+            return
         buf = self.buf2
         buf[0] = register
         with self.i2c_device as i2c:
@@ -544,7 +640,9 @@ class APDS9960:
             i2c.write(buf, end=2)
 
     def _get_bits(self, register: int, pos: int, mask: int) -> int:
-        """Sets a multi-bit value in the I2C device's register"""
+        """Gets a multi-bit value from the I2C device's register"""
+        if register in _SHADOWED:
+            return (self._shadow[register - _SHADOW_BASE] & mask) >> pos
         buf = self.buf2
         buf[0] = register
         with self.i2c_device as i2c:
@@ -553,6 +651,10 @@ class APDS9960:
 
     def _set_bits(self, register: int, pos: int, mask: int, value: int) -> None:
         """Sets a multi-bit value in the I2C device's register"""
+        if register in _SHADOWED:
+            current = self._shadow[register - _SHADOW_BASE]
+            self._write8(register, (current & ~mask) | (value << pos))
+            return
         buf = self.buf2
         buf[0] = register
         with self.i2c_device as i2c:
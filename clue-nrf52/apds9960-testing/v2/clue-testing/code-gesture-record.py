@@ -0,0 +1,45 @@
+# Gesture Recorder
+#
+# Dumps raw gesture FIFO datasets and config register snapshots to the serial
+# console, labelled, for replaying on a host with `host-testing/`. Capture the
+# console to a file (e.g. `tio -o session.txt /dev/ttyACM0`) and use it as a
+# corpus. Everything else printed here is a `#` comment, so the log replays as is.
+#
+# Press A to move on to the next label, B to record the next few unlabelled.
+
+import time
+import board
+from adafruit_apds9960.apds9960 import APDS9960
+from clue_keypad import ClueKeys
+from gesture_recorder import GestureRecorder
+
+labels = ("up", "down", "left", "right", "up-left", "up-right", "down-left", "down-right", "near", "far")
+label_idx = 0
+
+i2c = board.I2C()
+apds = APDS9960(i2c)
+apds.enable_proximity = True
+apds.enable_gesture = True
+
+keys = ClueKeys()
+recorder = GestureRecorder(apds, label=labels[label_idx])
+recorder.configure()
+
+str_prompt = "# Swipe: {}"
+str_done = "# Recorded {} gestures, {} datasets, {} overflows"
+
+print(str_prompt.format(labels[label_idx]))
+while True:
+    if recorder.poll():
+        print(str_done.format(recorder.gestures, recorder.datasets, recorder.overflows))
+
+    presses = keys.get_presses()
+    if presses[0]:
+        label_idx = (label_idx + 1) % len(labels)
+        recorder.label = labels[label_idx]
+        print(str_prompt.format(labels[label_idx]))
+    elif presses[1]:
+        recorder.label = None
+        print(str_prompt.format("anything, unlabelled"))
+
+    time.sleep(0.005)  # Well inside the 32 datasets the FIFO holds
@@ -3,7 +3,7 @@ from adafruit_apds9960.apds9960 import APDS9960
 
 try:
     # Only used for typing
-    from typing import Dict
+    from typing import Dict, List, Tuple
 except ImportError:
     pass
 
@@ -13,8 +13,8 @@ class ConfigRegsAPDS:
         if not apds:
             if not i2c_bus:
                 import board
-                i2c = board.I2C()
-            self.i2c_device = I2CDevice(i2c, 0x39)
+                i2c_bus = board.I2C()
+            self.i2c_device = I2CDevice(i2c_bus, 0x39)
         else:
             self.i2c_device = apds.i2c_device
 
@@ -55,11 +55,14 @@ class ConfigRegsAPDS:
     def sorted_reg_dict(self) -> Dict[str, int]:
         return sorted(self.config_regs, key=self.config_regs.get)
 
-    def print_reg_states(self) -> None:
+    def read_regs(self) -> List[Tuple[str, int, int]]:
+        """(name, address, value) for every register, in address order"""
         buf2 = bytearray(2)
-        for key in self.sorted_reg_dict():
-            reg_val = self._read8(buf2, self.config_regs[key])
-            print(" {0:22} 0x{1:02X} | 0x{2:02X} | b{2:08b} | {2:3d}".format(key, self.config_regs[key], reg_val))
+        return [(key, self.config_regs[key], self._read8(buf2, self.config_regs[key])) for key in self.sorted_reg_dict()]
+
+    def print_reg_states(self) -> None:
+        for key, addr, reg_val in self.read_regs():
+            print(" {0:22} 0x{1:02X} | 0x{2:02X} | b{2:08b} | {2:3d}".format(key, addr, reg_val))
 
     def _read8(self, buf: bytearray, addr: int) -> int:
         buf[0] = addr
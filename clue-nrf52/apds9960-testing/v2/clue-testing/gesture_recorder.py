@@ -0,0 +1,109 @@
+# Records raw gesture FIFO datasets off an APDS9960, with timestamps and
+# config register snapshots, in the text stream format `host-testing/` replays:
+#
+#   # reg _APDS9960_GPENTH 0xA0 0x05     <- config, whenever it's snapshotted
+#   > up                                 <- label, if one's set
+#   12.345678 84 31 52 55                <- seconds U D L R, one per dataset
+#   ...
+#                                        <- blank line after each gesture
+#
+# Every dataset is kept, unfiltered, so a replay can apply whatever filtering
+# and config it's testing. Datasets come out of the FIFO in batches, so their
+# times are spread evenly between one read and the next.
+
+import time
+from micropython import const
+from config_regs_apds import ConfigRegsAPDS
+
+_APDS9960_GFIFO_U = const(0xFC)
+_BIT_MASK_GCONF4_GMODE = const(0x01)
+_BIT_MASK_GSTATUS_GFOV = const(0x02)
+_GSTATUS_BLOCK_GCONF4 = const(0)
+_GSTATUS_BLOCK_GFLVL = const(3)
+_GSTATUS_BLOCK_GSTATUS = const(4)
+_DATASET_NS = const(2800000)  # Guess at the spacing of the very first batch
+
+# Catches the most a replay might want: enter at 1 count, exit below 5 after
+# 7 cycles, GINT from the first dataset. Gain, drive and pulses as set_defaults.
+RECORDING_CONFIG = (
+    (0xA0, 0x01),  # GPENTH
+    (0xA1, 0x05),  # GEXTH
+    (0xA2, 0x03),  # GCONF1: GFIFOTH 1 dataset, GEXPERS 7 cycles
+    (0xA3, 0x41),  # GCONF2
+    (0xA6, 0x85),  # GPULSE
+)
+
+
+class GestureRecorder:
+
+    def __init__(self, apds, stream=None, label: str = None):
+        self.apds = apds
+        self.regs = ConfigRegsAPDS(apds=apds)
+        self.stream = stream  # Anything with write(), or None for the serial console
+        self.label = label
+        self.gestures = 0
+        self.datasets = 0
+        self.overflows = 0
+        self.buffer = bytearray(129)
+        self.in_gesture = False
+        self.start_ns = time.monotonic_ns()
+        self.last_ns = 0
+
+    def configure(self, config=RECORDING_CONFIG) -> None:
+        """Write (register, value) pairs to the sensor and snapshot the result"""
+        for register, value in config:
+            self.apds.write_register(register, value)
+        self.snapshot()
+
+    def snapshot(self) -> None:
+        """Write the config registers out, applying to the gestures after them"""
+        for name, addr, value in self.regs.read_regs():
+            self._write("# reg {} 0x{:02X} 0x{:02X}".format(name, addr, value))
+
+    def poll(self) -> bool:
+        """Read out and record whatever's in the FIFO. True once a gesture's
+        finished, with the engine out of gesture mode and the FIFO empty."""
+        apds = self.apds
+        status = apds.read_gesture_status()
+        now = time.monotonic_ns()
+        count = status[_GSTATUS_BLOCK_GFLVL]
+
+        if count:
+            if not self.in_gesture:
+                self.in_gesture = True
+                if self.label:
+                    self._write("> " + self.label)
+                self.last_ns = now - count * _DATASET_NS
+
+            buffer = self.buffer
+            buffer[0] = _APDS9960_GFIFO_U
+            with apds.i2c_device as i2c:
+                i2c.write_then_readinto(buffer, buffer, out_end=1, in_start=1, in_end=1 + count * 4)
+
+            step = (now - self.last_ns) // count
+            for i in range(count):
+                t = self.last_ns + (i + 1) * step - self.start_ns
+                idx = 1 + i * 4
+                self._write("{}.{:06d} {} {} {} {}".format(
+                    t // 1000000000, (t // 1000) % 1000000,
+                    buffer[idx], buffer[idx + 1], buffer[idx + 2], buffer[idx + 3]))
+            self.datasets += count
+            self.last_ns = now
+
+        if status[_GSTATUS_BLOCK_GSTATUS] & _BIT_MASK_GSTATUS_GFOV:
+            # Poll faster: the datasets that didn't fit are gone
+            self.overflows += 1
+            apds.clear_gesture_fifo()
+
+        if self.in_gesture and not count and not status[_GSTATUS_BLOCK_GCONF4] & _BIT_MASK_GCONF4_GMODE:
+            self._write("")
+            self.in_gesture = False
+            self.gestures += 1
+            return True
+        return False
+
+    def _write(self, line: str) -> None:
+        if self.stream is None:
+            print(line)
+        else:
+            self.stream.write(line + "\n")
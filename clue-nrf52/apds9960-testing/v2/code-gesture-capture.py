@@ -0,0 +1,42 @@
+# Interrupt-Driven Gesture Test
+#
+# Gestures are captured off the APDS's INT pin while the loop is busy with
+# something slow, standing in for a display refresh. Press A to change how
+# long the loop blocks for. Needs `clue_keypad.py` from `clue-testing`.
+
+import time
+import board
+import digitalio
+from adafruit_apds9960.apds9960 import APDS9960
+from adafruit_apds9960.gesture_capture import GestureCapture
+from clue_keypad import ClueKeys
+
+i2c = board.I2C()
+apds = APDS9960(i2c)
+apds.enable_proximity = True
+apds.enable_gesture = True
+
+apds_int = digitalio.DigitalInOut(board.PROXIMITY_LIGHT_INTERRUPT)
+apds_int.switch_to_input(pull=digitalio.Pull.UP)
+
+capture = GestureCapture(apds, apds_int)
+keys = ClueKeys()
+
+gesture_names = ("none", "up", "down", "left", "right")
+work_times = (0.0, 0.05, 0.1, 0.2, 0.3)
+work_idx = 0
+
+str_gesture = "GESTURE: {:5} | datasets: {:2} | overflows: {}"
+str_work = "WORK: {:3.0f} ms per loop"
+
+print(str_work.format(work_times[work_idx] * 1000))
+while True:
+    gesture = capture.update()
+    if gesture:
+        print(str_gesture.format(gesture_names[gesture], capture.last_count, capture.overflows))
+
+    if keys.get_presses()[0]:
+        work_idx = (work_idx + 1) % len(work_times)
+        print(str_work.format(work_times[work_idx] * 1000))
+
+    time.sleep(work_times[work_idx])
@@ -7,6 +7,10 @@ from array import array
 mem_frees = array('i', [0, 0, 0, 0])
 mem_usages = array('i', [0, 0, 0])
 gest = 0
+# Per-gesture: calls, calls that found a gesture, total and worst bytes for those
+gest_stats = array('i', [0, 0, 0, 0])
+gest_mem = 0
+gest_target = 5
 scl1 = 'SCL1'
 gc.collect()
 
@@ -23,6 +27,8 @@ else:
 str_apds_used = "USAGE: Driver Only  | {}"
 str_apds_inst_used = "USAGE: Instance     | {}"
 str_apds_gest_used = "USAGE: Post-gesture | {}"
+str_apds_wave = "Swipe over the sensor {} times"
+str_apds_per_gest = "USAGE: Per gesture  | avg {} | max {} | over {} calls"
 
 str_spacer = ""
 gc.collect()
@@ -49,4 +55,23 @@ print(str_spacer)
 
 print(str_apds_used.format(mem_usages[0]))
 print(str_apds_inst_used.format(mem_usages[1]))
-print(str_apds_gest_used.format(mem_usages[2]))
\ No newline at end of file
+print(str_apds_gest_used.format(mem_usages[2]))
+
+# Per gesture: with the GC off, everything gesture() allocates shows up in
+# mem_free, so a drain that allocates per dataset stands out
+print(str_apds_wave.format(gest_target))
+while gest_stats[1] < gest_target:
+    gc.collect()
+    gc.disable()
+    gest_mem = gc.mem_free()
+    gest = apds.gesture()
+    gest_mem -= gc.mem_free()
+    gc.enable()
+    gest_stats[0] += 1
+    if gest:
+        gest_stats[1] += 1
+        gest_stats[2] += gest_mem
+        if gest_mem > gest_stats[3]:
+            gest_stats[3] = gest_mem
+
+print(str_apds_per_gest.format(gest_stats[2] // gest_stats[1], gest_stats[3], gest_stats[0]))
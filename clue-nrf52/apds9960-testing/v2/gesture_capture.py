@@ -0,0 +1,167 @@
+"""
+`gesture_capture`
+====================================================
+
+Interrupt-driven gesture capture for the APDS9960 driver.
+
+`APDS9960.gesture()` is polled and blocks: up to ~100 ms waiting out a FIFO
+overflow and 30 ms after every FIFO drain. `GestureCapture.update()` never
+sleeps. It's meant to be called once per pass of a main loop. It only goes
+to the bus when the sensor's INT pin says the gesture FIFO has passed its
+threshold, or while a gesture is in progress. Each call drains whatever
+datasets are waiting into a preallocated buffer, and the gesture is
+classified once the engine exits.
+
+.. code-block:: python
+
+    import board
+    import digitalio
+
+    apds.enable_proximity = True
+    apds.enable_gesture = True
+
+    apds_int = digitalio.DigitalInOut(board.PROXIMITY_LIGHT_INTERRUPT)
+    apds_int.switch_to_input(pull=digitalio.Pull.UP)
+    capture = GestureCapture(apds, apds_int)
+
+    while True:
+        gesture = capture.update()
+        if gesture:
+            print(gesture)
+        # ...display updates and everything else
+
+INT is a level rather than an edge, and it stays asserted until the FIFO is
+read, so a slow main loop can't miss it. The FIFO holds 32 datasets (about
+90 ms at the driver's defaults). A gesture that runs past that during a long
+refresh overflows the FIFO, but the 32 datasets from the start of the gesture
+are kept and drained, so the gesture can usually still be classified. The
+FIFO is cleared after that drain to reset GFOV, which also drops anything
+that arrived during it (a dataset or so). Datasets after the clear are
+drained as usual.
+
+Without an INT pin, `update()` reads the gesture status on every call,
+which is still a single 5 byte read. Proximity interrupts share the pin, so
+leave `enable_proximity_interrupt` off, or expect an extra status read per
+call while one's asserted.
+
+* Author(s): Erik Hess
+"""
+
+from micropython import const
+
+try:
+    # Only used for typing
+    from digitalio import DigitalInOut
+except ImportError:
+    pass
+
+_APDS9960_GFIFO_U = const(0xFC)
+_BIT_MASK_GCONF4_GMODE = const(0x01)
+_BIT_MASK_GSTATUS_GFOV = const(0x02)
+_GSTATUS_BLOCK_GCONF4 = const(0)
+_GSTATUS_BLOCK_GFLVL = const(3)
+_GSTATUS_BLOCK_GSTATUS = const(4)
+
+
+class GestureCapture:
+    """Drains an `APDS9960`'s gesture FIFO as the sensor fills it.
+
+    :param APDS9960 apds: Sensor to capture from. Gesture interrupts are enabled on it.
+    :param DigitalInOut interrupt: The sensor's INT pin as a pulled-up input, or `None` to poll
+    :param int max_datasets: Datasets kept per gesture. Past that, the last one is overwritten.
+    """
+
+    def __init__(self, apds, interrupt: DigitalInOut = None, max_datasets: int = 64):
+        if max_datasets < 2:
+            raise ValueError("max_datasets must be at least 2")
+
+        self.apds = apds
+        self.interrupt = interrupt
+        self.max_datasets = max_datasets
+        self.datasets = bytearray(max_datasets * 4)  # U/D/L/R, oldest first
+        self.count = 0  # Datasets kept for the current gesture
+        self.last_count = 0  # ...and for the last one classified
+        self.active = False  # A gesture is in progress, so keep reading without INT
+        self.overflows = 0
+
+        if not apds.buf129:
+            apds.buf129 = bytearray(129)
+
+        # Start from an empty FIFO with nothing asserted
+        apds.clear_gesture_fifo()
+        apds.enable_gesture_interrupt = True
+
+    def update(self) -> int:
+        """Drain any waiting datasets. Returns the gesture code once the
+        engine has exited after a gesture (see `APDS9960.gesture()`), otherwise 0."""
+        interrupt = self.interrupt
+        if not self.active and interrupt is not None and interrupt.value:
+            return 0  # INT is active low
+
+        apds = self.apds
+        status = apds.read_gesture_status()
+        dataset_count = status[_GSTATUS_BLOCK_GFLVL]
+        if dataset_count:
+            if not self.active and apds.trajectory is not None:
+                apds.trajectory.reset()  # Whatever gesture() last left there
+            self._drain(dataset_count)
+            self.active = True
+
+        if status[_GSTATUS_BLOCK_GSTATUS] & _BIT_MASK_GSTATUS_GFOV:
+            # The 32 datasets GFOV was raised on have been read. Clearing resets
+            # GFOV, and drops whatever arrived during the drain with it.
+            self.overflows += 1
+            apds.clear_gesture_fifo()
+
+        if status[_GSTATUS_BLOCK_GCONF4] & _BIT_MASK_GCONF4_GMODE or not self.active:
+            return 0
+        return self._finish()
+
+    def reset(self) -> None:
+        """Drop the gesture in progress"""
+        self.count = 0
+        self.active = False
+        if self.apds.trajectory is not None:
+            self.apds.trajectory.reset()
+
+    def _drain(self, dataset_count: int) -> None:
+        apds = self.apds
+        buffer = apds.buf129
+        buffer[0] = _APDS9960_GFIFO_U
+        with apds.i2c_device as i2c:
+            i2c.write_then_readinto(buffer, buffer, out_end=1, in_start=1, in_end=1 + dataset_count * 4)
+
+        datasets = self.datasets
+        count = self.count
+        keep = self.max_datasets
+        trajectory = apds.trajectory
+        for idx in range(1, 1 + dataset_count * 4, 4):
+            u = buffer[idx]
+            d = buffer[idx + 1]
+            l = buffer[idx + 2]
+            r = buffer[idx + 3]
+            # Same filter as gesture(): drop saturated and low-count datasets
+            if u < 30 or d < 30 or l < 30 or r < 30 or (u == 255 and d == 255 and l == 255 and r == 255):
+                continue
+            pos = count * 4 if count < keep else (keep - 1) * 4
+            datasets[pos] = u
+            datasets[pos + 1] = d
+            datasets[pos + 2] = l
+            datasets[pos + 3] = r
+            if count < keep:
+                count += 1
+            if trajectory is not None:
+                trajectory.add(u, d, l, r)
+        self.count = count
+
+    def _finish(self) -> int:
+        count = self.count
+        gesture = 0
+        if count >= 2:
+            if self.apds.trajectory is not None:
+                gesture = self.apds.rotate(self.apds.trajectory.classify())
+            else:
+                gesture = self.apds.classify(self.datasets, 0, (count - 1) * 4)
+        self.last_count = count
+        self.reset()
+        return gesture
@@ -0,0 +1,188 @@
+"""
+`gesture_trajectory`
+====================================================
+
+Full-trajectory gesture classification for the APDS9960 driver.
+
+The driver's own classification looks at two datasets, the first and last
+useful ones, and calls it a gesture if their U/D or L/R ratio differs by 30
+or more. One noisy dataset at either end decides the whole thing. Fast
+swipes give only a handful of datasets to pick from, and diagonals land on
+whichever axis happened to win.
+
+`TrajectoryClassifier` fits a line to the U/D and L/R ratios of every useful
+dataset instead, and takes the change along that line over the gesture.
+It's a running least-squares fit, so it keeps a few integer sums rather
+than the datasets themselves, and nothing is allocated per dataset. It can
+also report diagonals, and near/far (a hand moving toward or away from the
+sensor with no sideways motion).
+
+.. code-block:: python
+
+    from adafruit_apds9960.gesture_trajectory import TrajectoryClassifier
+
+    apds.trajectory = TrajectoryClassifier(diagonal=60, near_far=40)
+    gesture = apds.gesture()  # 1-4 as before, plus NEAR, FAR and the diagonals
+
+`GestureCapture` picks it up from the driver too.
+
+* Author(s): Erik Hess
+"""
+
+from micropython import const
+
+UP = const(1)
+DOWN = const(2)
+LEFT = const(3)
+RIGHT = const(4)
+NEAR = const(5)
+FAR = const(6)
+UP_LEFT = const(7)
+UP_RIGHT = const(8)
+DOWN_LEFT = const(9)
+DOWN_RIGHT = const(10)
+
+# The time axis is halved at this many points, after which only every other
+# dataset is added. With ratios in -100..100 that keeps every sum a small int.
+_FOLD_AT = const(64)
+_MAX_POINTS = const(255)
+
+
+class TrajectoryClassifier:
+    """Running fit of the U/D and L/R ratios over a gesture's datasets.
+
+    :param int threshold: Change in U/D or L/R ratio over the gesture, in
+        percent, that counts as motion along that axis. 30 matches the driver.
+    :param int diagonal: Report a diagonal when the smaller change is at
+        least this percent of the larger one. 0 never reports diagonals.
+    :param int near_far: With no sideways motion, report near or far when the
+        total counts peak this many percent above the start (near) or end
+        (far) of the gesture. 0 never reports them.
+    """
+
+    # pylint: disable-msg=too-many-instance-attributes
+    def __init__(self, threshold: int = 30, diagonal: int = 0, near_far: int = 0):
+        if threshold <= 0:
+            raise ValueError("threshold must be positive")
+        if not 0 <= diagonal <= 100:
+            raise ValueError("diagonal must be 0-100")
+
+        self.threshold = threshold
+        self.diagonal = diagonal
+        self.near_far = near_far
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new gesture"""
+        self.count = 0  # Datasets added
+        self.first_total = 0  # U+D+L+R of the first dataset...
+        self.last_total = 0  # ...the last one...
+        self.peak_total = 0  # ...and the highest, at `peak_at`
+        self.peak_at = 0
+        self._n = 0
+        self._t = 0
+        self._stride = 1
+        self._skip = 0
+        self._sum_t = 0
+        self._sum_tt = 0
+        self._sum_ud = 0
+        self._sum_tud = 0
+        self._sum_lr = 0
+        self._sum_tlr = 0
+
+    def add(self, u: int, d: int, l: int, r: int) -> None:
+        """Add a useful (filtered) dataset"""
+        total = u + d + l + r
+        count = self.count
+        if not count:
+            self.first_total = total
+        if total > self.peak_total:
+            self.peak_total = total
+            self.peak_at = count
+        self.last_total = total
+        self.count = count + 1
+
+        if self._skip:
+            self._skip -= 1
+            return
+        if self._n >= _MAX_POINTS:
+            return  # A hand held there for ages, the fit has plenty already
+        self._skip = self._stride - 1
+
+        t = self._t
+        ud = ((u - d) * 100) // (u + d)
+        lr = ((l - r) * 100) // (l + r)
+        self._n += 1
+        self._sum_t += t
+        self._sum_tt += t * t
+        self._sum_ud += ud
+        self._sum_tud += t * ud
+        self._sum_lr += lr
+        self._sum_tlr += t * lr
+
+        t += 1
+        if t == _FOLD_AT:
+            self._sum_t //= 2
+            self._sum_tt //= 4
+            self._sum_tud //= 2
+            self._sum_tlr //= 2
+            t //= 2
+            self._stride *= 2
+        self._t = t
+
+    def change_ud(self) -> int:
+        """Fitted change in U/D ratio over the gesture, percent. Negative is up."""
+        return self._change(self._sum_ud, self._sum_tud)
+
+    def change_lr(self) -> int:
+        """Fitted change in L/R ratio over the gesture, percent. Negative is left."""
+        return self._change(self._sum_lr, self._sum_tlr)
+
+    def _change(self, sum_r: int, sum_tr: int) -> int:
+        n = self._n
+        span = self._t - 1
+        if n < 2 or span < 1:
+            return 0
+        den = n * self._sum_tt - self._sum_t * self._sum_t
+        if den <= 0:
+            return 0
+        # slope * span, without the product leaving small int range
+        return (n * sum_tr - self._sum_t * sum_r) // max(1, den // span)
+
+    def classify(self) -> int:
+        """Gesture code for the datasets added since `reset()`, unrotated.
+        0 if there's no clear direction."""
+        if self._n < 2:
+            return 0
+
+        ud = self.change_ud()
+        lr = self.change_lr()
+        abs_ud = abs(ud)
+        abs_lr = abs(lr)
+        threshold = self.threshold
+
+        if abs_ud < threshold and abs_lr < threshold:
+            return self._depth()
+
+        if self.diagonal and abs_ud >= threshold and abs_lr >= threshold:
+            if min(abs_ud, abs_lr) * 100 >= self.diagonal * max(abs_ud, abs_lr):
+                if ud < 0:
+                    return UP_LEFT if lr < 0 else UP_RIGHT
+                return DOWN_LEFT if lr < 0 else DOWN_RIGHT
+
+        if abs_ud >= abs_lr:
+            return UP if ud < 0 else DOWN
+        return LEFT if lr < 0 else RIGHT
+
+    def _depth(self) -> int:
+        near_far = self.near_far
+        last = self.count - 1
+        if not near_far or last < 2:
+            return 0
+        peak = self.peak_total * 100
+        # Approaching peaks late having risen from the start, leaving peaks early and falls to the end
+        if self.peak_at * 2 >= last and peak >= self.first_total * (100 + near_far):
+            return NEAR
+        if self.peak_at * 2 <= last and peak >= self.last_total * (100 + near_far):
+            return FAR
+        return 0
@@ -0,0 +1,151 @@
+# Key latency and sampling: the old blocking loop vs. tasks.Scheduler
+#
+# Ten minutes of a spool being printed from, with someone pressing WEIGH,
+# DEBUG or TARE every 3-40 s, on a virtual clock against `fakes`. The HX711
+# converts at 10 SPS into the PIO's 8-deep FIFO.
+#
+#   * old: the loop code.py had before, which spins on get_presses() and
+#     blocks in read(50) for 5-10 s per weigh or tare, re-weighing until the
+#     panel takes the refresh.
+#   * tasks: ScaleTasks on a Scheduler, sampling every 50 ms and scanning
+#     keys every 10 ms.
+#
+# Reported: how long presses waited before anything read them (which should
+# stay within one keys period for the scheduler), how long a WEIGH took to
+# put a weight on the label, conversions read vs. made vs. dropped from a
+# full FIFO, and the scheduler's own report with its lateness histogram.
+#
+# Usage: python bench_loop.py [seconds] [seed]
+
+import random
+import sys
+
+import fakes
+
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 600
+SEED = int(sys.argv[2]) if len(sys.argv) > 2 else 18
+SPS = 10
+KEYS_PERIOD = 0.01
+LOSS_G_PER_S = 0.05
+
+
+def weight(t):
+    return 1000 - LOSS_G_PER_S * t
+
+
+rng = random.Random(SEED)
+script = []
+t = 2.0
+while t < SECONDS - 30:
+    script.append((t, rng.choices((0, 1, 2), (0.7, 0.15, 0.15))[0]))
+    t += rng.uniform(3, 40)
+
+
+class Rig:
+
+    def __init__(self):
+        self.clock = fakes.VirtualClock()
+        self.hx = fakes.HX711(self.clock, weight, sps=SPS)
+        self.keys = fakes.Keys(self.clock, script)
+        self.pixel = fakes.Pixel(self.clock)
+        self.weight_label = fakes.Label("0.00 g", clock=self.clock)
+        self.status_label = fakes.Label("", clock=self.clock)
+        self.display = fakes.Display(self.clock, labels=(self.weight_label, self.status_label))
+        self.display.refresh()
+        self.render = fakes.load(self.clock, "render").RenderScheduler(self.display)
+
+        self.shown = []  # When the weight label was set, to time WEIGH responses
+        set_label = self.render.set
+
+        def tracked(label, text=None, color=None):
+            if label is self.weight_label:
+                self.shown.append(self.clock.now)
+            set_label(label, text, color)
+
+        self.render.set = tracked
+        self.debug = False
+
+    def toggle_debug(self):
+        self.debug = not self.debug
+        self.render.set(self.status_label, "offset: {}".format(self.hx.offset) if self.debug else "")
+
+    def weigh_latencies(self):
+        latencies = []
+        for (when, key), read in zip(script, self.keys.latencies):
+            if key != 0:
+                continue
+            read_at = when + read
+            after = [shown for shown in self.shown if shown >= read_at]
+            if after:
+                latencies.append(after[0] - when)
+        return latencies
+
+
+def hx_read(hx, count):
+    total = hx.read_raw()
+    for _ in range(count - 1):
+        total += hx.read_raw(clear_fifo=False)
+    return hx.to_weight(total / count)
+
+
+def old_loop(rig):
+    hx, render, clock = rig.hx, rig.render, rig.clock
+    event = fakes.Event()
+    while clock.now < SECONDS:
+        presses = [False, False, False]
+        while rig.keys.events.get_into(event):
+            presses[event.key_number] = True
+        weigh = presses[0]
+        if presses[2]:
+            rig.pixel.fill((255, 255, 255))
+            hx_read(hx, 50)
+            hx.offset = int(hx_read(hx, 50) * hx.scale) + hx.offset
+            rig.pixel.fill((0, 0, 0))
+            weigh = True
+            clock.sleep(1)
+        elif presses[1]:
+            rig.toggle_debug()
+
+        if weigh or render.pending:
+            rig.pixel.fill((255, 255, 255))
+            if weigh:
+                hx_read(hx, 50)
+            render.set(rig.weight_label, "{:.2f} g".format(hx_read(hx, 50)))
+            rig.pixel.fill((0, 0, 0))
+        render.poll()
+        rig.pixel.fill((0, 0, 255) if render.pending or rig.display.busy else (0, 0, 0))
+
+
+def tasks_loop(rig):
+    tasks = fakes.load(rig.clock, "tasks")
+    scale_tasks = fakes.load(rig.clock, "scale_tasks")
+    scale = scale_tasks.ScaleTasks(
+        rig.hx, rig.keys, fakes.Event(), rig.pixel, rig.render, rig.weight_label,
+        on_debug=rig.toggle_debug)
+    scheduler = tasks.Scheduler()
+    scale.install(scheduler, keys_period=KEYS_PERIOD)
+    scheduler.run(until=SECONDS)
+    return scheduler
+
+
+print("{:.0f} s, {} presses ({} WEIGH), {} SPS".format(
+    SECONDS, len(script), sum(1 for _, key in script if key == 0), SPS))
+print(" {:6} | {:>9} | {:>9} | {:>9} | {:>9} | {:>5} | {:>9} | {:>7} | {:>9}".format(
+    "loop", "key ms", "key max", "weigh s", "weigh max", "read", "converted", "dropped", "refreshes"))
+
+for name in ("old", "tasks"):
+    rig = Rig()
+    scheduler = old_loop(rig) if name == "old" else tasks_loop(rig)
+    rig.clock.advance_to(SECONDS)
+    rig.hx.is_ready()  # Count conversions up to the end
+    keys = [latency * 1000 for latency in rig.keys.latencies]
+    weighs = rig.weigh_latencies()
+    print(" {:6} | {:9.1f} | {:9.1f} | {:9.2f} | {:9.2f} | {:5} | {:9} | {:7} | {:9}".format(
+        name, sum(keys) / len(keys), max(keys), sum(weighs) / len(weighs), max(weighs),
+        rig.hx.read, rig.hx.converted, rig.hx.dropped, len(rig.display.refreshes) - 1))
+
+print()
+print(scheduler.report())
+worst_key = max(rig.keys.latencies)
+print("\nworst key latency {:.1f} ms, {} one keys period of {:.0f} ms".format(
+    worst_key * 1000, "within" if worst_key <= KEYS_PERIOD else "OVER", KEYS_PERIOD * 1000))
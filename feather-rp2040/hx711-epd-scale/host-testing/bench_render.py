@@ -0,0 +1,117 @@
+# Press-to-panel latency: the old refresh-and-block loop vs. RenderScheduler
+#
+# An hour of a spool being printed from (losing 3 g a minute), with someone
+# pressing WEIGH every 20-200 s. Each weigh takes `weigh` seconds (2x read(50)
+# at 10 SPS). Both loops run against `fakes.Display` on a virtual clock:
+#
+#   * old: weigh, set the label, refresh() if the panel isn't busy, then
+#     blink until it's done. Presses meanwhile merge into one. A refresh
+#     sooner than `seconds_per_frame` raises, which on the board ends code.py.
+#   * scheduler: weigh, stage the label, and keep re-weighing until `poll()`
+#     gets a refresh in, so what's shown is never older than one weigh.
+#
+# Reported per `seconds_per_frame`: refreshes, refresh() errors, presses whose
+# weigh made it to the panel, press-to-shown latency, weighs taken, and label
+# renders. Every refresh's weight is checked to be at most one weigh old.
+#
+# Usage: python bench_render.py [seconds] [weigh s]
+
+import random
+import sys
+
+import fakes
+
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 3600
+WEIGH_S = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+LOSS_G_PER_S = 0.05
+
+
+def weight(t):
+    return 1000 - LOSS_G_PER_S * t
+
+
+rng = random.Random(17)
+presses = []
+t = 5.0
+while t < SECONDS:
+    presses.append(t)
+    t += rng.uniform(20, 200)
+
+
+weighs = 0
+
+
+def weigh(clock):
+    global weighs  # pylint: disable=global-statement
+    clock.sleep(WEIGH_S)
+    weighs += 1
+    return "{:.2f} g".format(weight(clock.now))
+
+
+def old_loop(clock, display, label):
+    latencies, errors = [], 0
+    for press in presses:
+        if press < clock.now:
+            continue  # Still blinking, get_presses() folds it into the one being handled
+        clock.advance_to(press)
+        label.text = weigh(clock)
+        if display.busy:
+            clock.advance_to(display._last + display.refresh_time)
+        try:
+            display.refresh()
+        except RuntimeError:
+            errors += 1
+            continue
+        latencies.append(clock.now - press)
+        clock.sleep(display.refresh_time)  # keep_blinking() until not busy
+    return latencies, errors
+
+
+def scheduler_loop(clock, display, label, render):
+    latencies = []
+    waiting = []  # Presses whose weigh isn't on the panel yet
+    weighed = []  # ...and those measured, waiting for a refresh
+    queue = list(presses)
+    while queue or waiting or weighed or render.pending:
+        if queue and queue[0] <= clock.now:
+            waiting.append(queue.pop(0))
+            continue
+        if waiting or render.pending:
+            text = weigh(clock)
+            weighed += waiting
+            waiting = []
+            render.set(label, text)
+        if render.poll():
+            latencies += [clock.now - press for press in weighed]
+            weighed = []
+        elif not waiting and not render.pending:
+            clock.advance_to(queue[0] if queue else clock.now)
+    return latencies, 0
+
+
+def fresh(display, label):
+    """Every refresh shows a weight taken at most one weigh before it"""
+    return all(abs(float(shown[label].split()[0]) - weight(t)) <= LOSS_G_PER_S * WEIGH_S * 1.01
+               for t, shown in display.refreshes[1:])
+
+
+print("{:.0f} s, {} presses, {} s per weigh".format(SECONDS, len(presses), WEIGH_S))
+print(" {:9} | {:>7} | {:>9} | {:>6} | {:>5} | {:>9} | {:>7} | {:>6} | {:>7} | {:>5}".format(
+    "loop", "s/frame", "refreshes", "errors", "shown", "latency s", "max s", "weighs", "renders", "fresh"))
+
+for seconds_per_frame in (15, 60, 180):
+    for name in ("old", "scheduler"):
+        clock = fakes.VirtualClock()
+        label = fakes.Label("0.00 g")
+        display = fakes.Display(clock, seconds_per_frame=seconds_per_frame, labels=(label,))
+        display.refresh()  # Startup screen
+        weighs = 0
+        if name == "old":
+            latencies, errors = old_loop(clock, display, label)
+        else:
+            render = fakes.load(clock, "render").RenderScheduler(display)
+            latencies, errors = scheduler_loop(clock, display, label, render)
+        print(" {:9} | {:7} | {:9} | {:6} | {:5} | {:9.1f} | {:7.1f} | {:6} | {:7} | {:>5}".format(
+            name, seconds_per_frame, len(display.refreshes) - 1, errors, len(latencies),
+            sum(latencies) / len(latencies), max(latencies), weighs, label.renders,
+            "ok" if fresh(display, label) else "BAD"))
@@ -0,0 +1,214 @@
+"""
+Host-side stand-ins for the EPD scale's display, keys, NeoPixel and HX711,
+so `v0/render.py`, `v0/tasks.py` and the UI logic around them can be
+exercised under CPython on a virtual clock. Calls that take real time on
+the board (a label re-layout, a NeoPixel write, the refresh SPI transfer)
+advance the clock by roughly that much.
+
+    import fakes
+    clock = fakes.VirtualClock()
+    display = fakes.Display(clock)
+    render = fakes.load(clock, "render").RenderScheduler(display)
+"""
+
+import importlib
+import os
+import sys
+import types
+
+APP_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "v0")
+
+
+class VirtualClock:
+    """Time only moves when something sleeps or advances it"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def monotonic_ns(self) -> int:
+        return round(self.now * 1000000000)
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+    def advance_to(self, when: float) -> None:
+        if when > self.now:
+            self.now = when
+
+    def patch(self, module) -> None:
+        module.time = types.SimpleNamespace(
+            monotonic=self.monotonic, monotonic_ns=self.monotonic_ns, sleep=self.sleep)
+
+
+LABEL_RENDER_S = 0.003  # Setting a Label's text re-lays out every glyph
+REFRESH_CALL_S = 0.1  # display.refresh() blocks while the frame goes out over SPI
+PIXEL_WRITE_S = 0.0003
+KEY_SCAN_S = 0.00005
+HX_READ_S = 0.0002
+
+
+class Label:
+    """`adafruit_display_text.label.Label`'s text and color, counting renders"""
+
+    def __init__(self, text: str = "", color: int = 0x000000, clock: VirtualClock = None):
+        self._text = text
+        self.color = color
+        self.clock = clock
+        self.renders = 0
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @text.setter
+    def text(self, text: str) -> None:
+        self._text = text
+        self.renders += 1
+        if self.clock:
+            self.clock.sleep(LABEL_RENDER_S)
+
+
+class Display:
+    """`adafruit_il0373.IL0373` as displayio's EPaperDisplay sees it: a
+    refresh keeps `busy` set for `refresh_time` seconds, and another isn't
+    allowed until `seconds_per_frame` after the last one started. A refresh
+    too soon raises RuntimeError, like the real one."""
+
+    def __init__(self, clock: VirtualClock, seconds_per_frame: float = 15, refresh_time: float = 16, labels=()):
+        self.clock = clock
+        self.seconds_per_frame = seconds_per_frame
+        self.refresh_time = refresh_time
+        self.labels = labels
+        self._last = None
+        self.refreshes = []  # (time, {label: text}) as shown by each refresh
+
+    @property
+    def time_to_refresh(self) -> float:
+        if self._last is None:
+            return 0.0
+        return max(0.0, self._last + self.seconds_per_frame - self.clock.now)
+
+    @property
+    def busy(self) -> bool:
+        return self._last is not None and self.clock.now < self._last + self.refresh_time
+
+    def refresh(self) -> None:
+        if self.time_to_refresh > 0:
+            raise RuntimeError("Refresh too soon")
+        self._last = self.clock.now
+        self.refreshes.append((self.clock.now, {label: label.text for label in self.labels}))
+        self.clock.sleep(REFRESH_CALL_S)
+
+
+class Event:
+    """`keypad.Event`, filled in by `get_into()`"""
+
+    def __init__(self, key_number: int = 0, pressed: bool = True):
+        self.key_number = key_number
+        self.pressed = pressed
+
+
+class _EventQueue:
+
+    def __init__(self, keys):
+        self._keys = keys
+
+    def get_into(self, event: Event) -> bool:
+        keys = self._keys
+        keys.clock.sleep(KEY_SCAN_S)
+        script = keys.script
+        if keys.position >= len(script) or script[keys.position][0] > keys.clock.now:
+            return False
+        when, key_number = script[keys.position]
+        keys.position += 1
+        event.key_number = key_number
+        event.pressed = True
+        keys.latencies.append(keys.clock.now - when)
+        return True
+
+
+class Keys:
+    """`keypad.Keys` replaying a script of (time, key number) presses. How long
+    each waited before something read it goes into `latencies`."""
+
+    def __init__(self, clock: VirtualClock, script: list):
+        self.clock = clock
+        self.script = script
+        self.position = 0
+        self.latencies = []
+        self.events = _EventQueue(self)
+
+
+class Pixel:
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.color = (0, 0, 0)
+        self.writes = 0
+
+    def fill(self, color) -> None:
+        self.color = color
+        self.writes += 1
+        self.clock.sleep(PIXEL_WRITE_S)
+
+
+class HX711:
+    """An HX711 behind the PIO driver: converts every 1/sps s into an 8-deep
+    FIFO, dropping conversions while it's full, with `weight(t)` on the
+    platform. Just the parts of the `HX711` API the scale uses."""
+
+    def __init__(self, clock: VirtualClock, weight, sps: int = 10, offset: int = 0, scale: float = 395.513):
+        self.clock = clock
+        self.weight = weight
+        self.sps = sps
+        self.offset = offset
+        self.scale = scale
+        self.gain = 1
+        self._next = 1 / sps  # Next conversion to go into the FIFO
+        self.fifo = []
+        self.converted = 0
+        self.dropped = 0
+        self.read = 0
+
+    def _update(self) -> None:
+        now = self.clock.now
+        while self._next <= now:
+            self.converted += 1
+            if len(self.fifo) < 8:
+                self.fifo.append(int(self.weight(self._next) * self.scale) + self.offset)
+            else:
+                self.dropped += 1
+            self._next += 1 / self.sps
+
+    def is_ready(self) -> bool:
+        self._update()
+        return bool(self.fifo)
+
+    def read_raw(self, clear_fifo: bool = True) -> int:
+        self._update()
+        if clear_fifo:
+            self.fifo.clear()
+        while not self.fifo:
+            self.clock.advance_to(self._next)
+            self._update()
+        self.read += 1
+        self.clock.sleep(HX_READ_S)
+        return self.fifo.pop(0)
+
+    def tare(self, offset: int = None) -> None:
+        self.offset = self.read_raw() if offset is None else offset
+
+    def to_weight(self, raw: int) -> float:
+        return (raw - self.offset) / self.scale
+
+
+def load(clock: VirtualClock, name: str):
+    """A module from `v0/`, running on `clock`"""
+    if APP_ROOT not in sys.path:
+        sys.path.insert(0, APP_ROOT)
+    module = importlib.import_module(name)
+    clock.patch(module)
+    return module
@@ -1,4 +1,3 @@
-import time
 import board
 
 # i2c = board.STEMMA_I2C()
@@ -41,7 +40,22 @@ from hx711.hx711_pio import HX711_PIO
 pio_data = board.D25
 pio_clk = board.D24
 
-hx = HX711_PIO(pio_data, pio_clk, tare=False, scalar=395.513)
+hx = HX711_PIO(pio_data, pio_clk, tare=False, scale=395.513)
+
+import microcontroller
+
+# Zero drift vs. the RP2040's die temperature, learned from every tare
+hx.compensate_drift(lambda: microcontroller.cpu.temperature)
+
+from hx711.recorder import SessionRecorder
+
+RECORD_PATH = "/session.hxl"
+RECORD_FLUSH_EVERY = 100  # Flash writes per 100 readings logged
+
+try:
+    recorder = SessionRecorder(RECORD_PATH, flush_every=RECORD_FLUSH_EVERY)
+except OSError:
+    recorder = None  # Read-only unless boot.py does storage.remount("/", readonly=False)
 
 import keypad
 
@@ -53,75 +67,11 @@ buttons = keypad.Keys((key_a, key_b, key_c), value_when_pressed=False, pull=True
 
 event_buffer = keypad.Event()
 
-BUTTON_A_PRESS = keypad.Event(0, True)
-BUTTON_B_PRESS = keypad.Event(1, True)
-BUTTON_C_PRESS = keypad.Event(2, True)
-
-presses = {
-    0: False,
-    1: False,
-    2: False
-}
-
-def get_presses(keys: keypad.Keys):
-    presses[0] = False
-    presses[1] = False
-    presses[2] = False
-
-    while keys.events.get_into(event_buffer):
-        if event_buffer == BUTTON_A_PRESS:
-            presses[0] = True
-        elif event_buffer == BUTTON_B_PRESS:
-            presses[1] = True
-        elif event_buffer == BUTTON_C_PRESS:
-            presses[2] = True
-    return presses
-
-def wait_for_keypress(keys: keypad.Keys):
-    while True:
-        new_presses = get_presses(keys)
-        
-        if new_presses[0] or new_presses[1] or new_presses[2]:
-            break
-        else:
-            time.sleep(0.001)
-
 import neopixel
 
 pixel = neopixel.NeoPixel(board.NEOPIXEL, 1)
 pixel.brightness = 1.0
-
-def keep_blinking(pixel, time_sec=1, delay=0.1, fill=(255, 255, 255), keys=None, epd=None):
-
-    start_time = time.monotonic()
-
-    if epd:
-        print("Blinking for EPD refresh, busy: {}".format(epd.busy))
-
-    blink = True
-    while blink:
-
-        # Check for keypress, if we need to
-        if keys:
-            presses = get_presses(keys)
-            if presses[0] or presses[1] or presses[2]:
-                blink = False
-
-        time.sleep(delay)
-        pixel.fill(fill)
-        time.sleep(delay)
-        pixel.fill((0,0,0))
-
-        now_time = time.monotonic()
-        if now_time - start_time > time_sec:
-            blink = False
-
-        if epd:
-            if not epd.busy:
-                print("Stopping EPD refresh blink, busy: {}, time: {}".format(epd.busy, now_time - start_time))
-                blink = False
-
-keep_blinking(pixel, fill=(0, 255, 0))
+pixel.fill((0, 255, 0))
 
 import displayio
 import terminalio
@@ -144,7 +94,7 @@ WIDTH = 296
 HEIGHT = 128
 ROTATION = 270
 TEXT_SCALE = 4
-eink_refresh_delay = 180  #  Advice is not to refresh more often than every 180 seconds, whew...
+eink_refresh_delay = 180  #  Advice is not to refresh more often than every 180 seconds, RenderScheduler enforces it
 
 BG_COLOR = 0xFFFFFF  # white background
 TEXT_COLOR = 0x000000  # black text
@@ -309,6 +259,12 @@ display = adafruit_il0373.IL0373(
 display.show(splash)
 
 # Display setup complete, grab our first scale read and refresh that puppy
+from render import RenderScheduler
+from tasks import Scheduler
+from scale_tasks import ScaleTasks
+
+render = RenderScheduler(display, min_interval=eink_refresh_delay)
+
 pixel.fill((255, 255, 255))
 hx.read(50)
 hx.tare()
@@ -317,13 +273,12 @@ hx.tare()
 reading = hx.read(50)
 reading_raw = hx.read_raw()
 
-text_area.text = "{:.2f} g".format(reading)
+render.set(text_area, "{:.2f} g".format(reading))
 pixel.fill((0, 0, 0))
 
-display.refresh()
-time.sleep(1)
-print("INIT: [{: 8.2f} g] [{: 8} raw] offset: {}, scalar: {}".format(
-    reading, reading_raw, hx.offset, hx.scalar))
+render.poll()
+print("INIT: [{: 8.2f} g] [{: 8} raw] offset: {}, scale: {}".format(
+    reading, reading_raw, hx.offset, hx.scale))
 
 if rtc_enabled:
     print("INIT: Startup at {}, {} {}, {}:{}:{}".format(
@@ -335,79 +290,38 @@ if rtc_enabled:
         startup_time.tm_sec
     ))
 
-keep_blinking(pixel, time_sec=eink_refresh_delay, fill=(0, 0, 255), epd=display)
-
 
 # Final prep for loop
 
-# wait_for_keypress(buttons)
 debug = False
-while True:
-
-    new_presses = get_presses(buttons)
-
-    tare = False
-    debug = False
-    weigh = False
-    if new_presses[0]:
-        weigh = True
-    elif new_presses[1]:
-        debug = True
-    elif new_presses[2]:
-        tare = True
-
-    if tare:
-        pixel.fill((255, 255, 255))
-        print("Tare requested, current offset: [{}]".format(hx.offset))
-        hx.read(50)
-        hx.tare()
-        hx.read(50)
-        hx.tare()
-        print("Tare completed, new offset: [{}]".format(hx.offset))
-        pixel.fill((0, 0, 0))
-        weigh = True
-        time.sleep(1)
+
+def toggle_debug():
+    global debug
+    debug = not debug
+    print("HX details, offset: [{}], scale: [{}], gain: [{}]".format(
+        hx.offset, hx.scale, hx.gain
+    ))
 
     if debug:
-        print("HX details, offset: [{}], scalar: [{}], gain: [{}]".format(
-            hx.offset, hx.scalar, hx.gain
-        ))
-
-        debug = not debug
-
-        if debug:
-            button_b_label.color = HIGHLIGHT_COLOR
-            status_left.text = "offset: {}".format(hx.offset)
-            status_center.text = "scalar: {}".format(hx.scalar)
-            status_right.text = "gain: {}".format(hx.gain)
-        else:
-            button_b_label.color = TEXT_COLOR
-            status_left.text = ""
-            status_right.text = ""
-            status_center.text = title_text
-        
-        if rtc_enabled:
-            time_left.text = get_status_time(startup_time)
-
-        display.refresh()
-        keep_blinking(pixel, time_sec=eink_refresh_delay, fill=(0, 0, 255), epd=display)
-
-    if weigh:
-        pixel.fill((255, 255, 255))
-        pre_read = hx.read(50)
-        reading = hx.read(50)
-        reading_raw = hx.read_raw()
-        print(
-            "Weighed: [{: 8.2f} g] [{: 8} raw] offset: {}, scalar: {}".format(
-                reading, reading_raw, hx.offset, hx.scalar
-            )
-        )
-        text_area.text = "{:.2f} g".format(reading)
-        if rtc_enabled:
-            time_left.text = get_status_time(startup_time)
-        pixel.fill((0, 0, 0))
-        if display.busy:
-            keep_blinking(pixel, time_sec=eink_refresh_delay, fill=(0, 0, 255), epd=display)
-        display.refresh()
-        keep_blinking(pixel, time_sec=eink_refresh_delay, fill=(0, 0, 255), epd=display)
-    
\ No newline at end of file
+        render.set(button_b_label, color=HIGHLIGHT_COLOR)
+        render.set(status_left, "offset: {}".format(hx.offset))
+        render.set(status_center, "scale: {}".format(hx.scale))
+        render.set(status_right, "gain: {}".format(hx.gain))
+    else:
+        render.set(button_b_label, color=TEXT_COLOR)
+        render.set(status_left, "")
+        render.set(status_right, "")
+        render.set(status_center, title_text)
+
+    if rtc_enabled:
+        render.set(time_left, get_status_time(startup_time))
+
+scale = ScaleTasks(
+    hx, buttons, event_buffer, pixel, render, text_area,
+    recorder=recorder, on_debug=toggle_debug)
+
+scheduler = Scheduler()
+scale.install(scheduler)
+scheduler.add("report", 600, lambda: print(scheduler.report()), offset=600)
+
+scheduler.run()
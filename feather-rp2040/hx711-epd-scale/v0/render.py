@@ -0,0 +1,91 @@
+"""
+Render scheduler for the e-paper UI: label changes are staged instead of
+applied, and `poll()` applies whatever is pending in one `display.refresh()`
+as soon as the panel allows it. Changes made in between are coalesced, so
+the panel only ever shows the latest value of each label and nothing has to
+block until the next refresh is allowed.
+
+    render = RenderScheduler(display)
+    render.set(text_area, "{:.2f} g".format(reading))
+    while True:
+        render.poll()  # ...alongside everything else the loop does
+
+Labels are only touched when a refresh actually happens, so re-rendering
+their text for values nobody saw costs nothing either.
+"""
+
+import time
+
+try:
+    # Only used for typing
+    from typing import Optional
+except ImportError:
+    pass
+
+
+class RenderScheduler:
+
+    def __init__(self, display, min_interval: float = 0):
+        self.display = display
+        self.min_interval = min_interval  # On top of the panel's own time_to_refresh
+        self._pending = {}  # label: (text, color), latest staged change
+        self._last_refresh = None
+
+        self.requested = 0  # set() calls that changed something
+        self.applied = 0  # Label changes that made it to the panel
+        self.refreshes = 0
+        self.pending_since = None  # monotonic() of the oldest change not shown yet
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending)
+
+    @property
+    def coalesced(self) -> int:
+        """Changes dropped because a newer one replaced them before a refresh"""
+        return self.requested - self.applied - len(self._pending)
+
+    def set(self, label, text: str = None, color: int = None) -> None:
+        """Stage a new text and/or color for `label`, shown on the next refresh"""
+        staged = self._pending.get(label)
+        if staged is None:
+            if (text is None or text == label.text) and (color is None or color == label.color):
+                return  # Already on screen
+            staged = (None, None)
+        if text is None:
+            text = staged[0]
+        if color is None:
+            color = staged[1]
+        self._pending[label] = (text, color)
+        self.requested += 1
+        if self.pending_since is None:
+            self.pending_since = time.monotonic()
+
+    def time_to_refresh(self) -> Optional[float]:
+        """Seconds until poll() can refresh, None if nothing is pending"""
+        if not self._pending:
+            return None
+        wait = self.display.time_to_refresh
+        if self.min_interval and self._last_refresh is not None:
+            wait = max(wait, self._last_refresh + self.min_interval - time.monotonic())
+        return max(wait, 0)
+
+    def poll(self) -> bool:
+        """Apply pending changes and refresh if the panel allows it now.
+        Returns True if a refresh was started."""
+        if not self._pending or self.display.busy or self.time_to_refresh() > 0:
+            return False
+
+        for label, (text, color) in self._pending.items():
+            if text is not None:
+                label.text = text
+            if color is not None:
+                label.color = color
+            self.applied += 1
+        self._pending.clear()
+
+        self.display.refresh()
+        self._last_refresh = time.monotonic()
+        self.refreshes += 1
+        self.pending_since = None
+        return True
@@ -0,0 +1,163 @@
+"""
+The scale's work split into short tasks for `tasks.Scheduler`:
+
+* `scan_keys`: drains keypad events, WEIGH/DEBUG/TARE act straight away
+* `sample`: reads whatever conversions the HX711 has ready into a running window
+* `watch_epd`: keeps a requested weight current until the panel can show it
+* `animate_pixel`: blinks the NeoPixel while a change waits for the panel
+
+Nothing blocks. A weigh shows the mean of the last `window` readings, which
+`sample` keeps up to date all the time, so it doesn't cost 2x read(50) of
+waiting any more.
+"""
+
+import array
+
+try:
+    # Only used for typing
+    from typing import Callable
+except ImportError:
+    pass
+
+KEY_WEIGH = 0
+KEY_DEBUG = 1
+KEY_TARE = 2
+
+PIXEL_OFF = (0, 0, 0)
+PIXEL_WAITING = (0, 0, 255)  # A change is waiting for the panel
+PIXEL_WORKING = (255, 255, 255)  # Tare or weigh window still filling
+
+
+class ScaleTasks:
+
+    def __init__(
+            self,
+            hx,
+            keys,
+            event,
+            pixel,
+            render,
+            weight_label,
+            *,
+            window: int = 50,
+            recorder=None,
+            on_debug: Callable = None
+        ):
+        self.hx = hx
+        self.keys = keys
+        self._event = event  # keypad.Event to read into, so scanning doesn't allocate
+        self.pixel = pixel
+        self.render = render
+        self.weight_label = weight_label
+        self.recorder = recorder  # Readings are logged from a weigh request until it's shown
+        self.on_debug = on_debug
+
+        self._window = array.array('i', [0] * window)
+        self._head = 0
+        self._filled = 0
+        self._sum = 0
+
+        self.watching = False  # A weigh is waiting for the panel
+        self._pending_tare = False
+        self._blink = False
+        self._pixel_color = None
+        self.samples = 0
+        self.presses = 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether the window is full, i.e. a weigh means something"""
+        return self._filled == len(self._window)
+
+    def raw_mean(self) -> int:
+        return self._sum // self._filled if self._filled else 0
+
+    def weight(self) -> float:
+        return self.hx.to_weight(self.raw_mean())
+
+    def reset_window(self) -> None:
+        self._head = 0
+        self._filled = 0
+        self._sum = 0
+
+    def sample(self) -> None:
+        hx = self.hx
+        window = self._window
+        size = len(window)
+        while hx.is_ready():
+            raw = hx.read_raw(clear_fifo=False)
+            head = self._head
+            self._sum += raw - window[head]
+            window[head] = raw
+            self._head = head + 1 if head + 1 < size else 0
+            if self._filled < size:
+                self._filled += 1
+            self.samples += 1
+            if self.watching and self.recorder:
+                self.recorder.record_reading(hx, raw)
+
+        if self._pending_tare and self.ready:
+            hx.tare(self.raw_mean())  # Also teaches the drift model, if there is one
+            self._pending_tare = False
+            self.weigh()
+
+    def scan_keys(self) -> None:
+        event = self._event
+        while self.keys.events.get_into(event):
+            if not event.pressed:
+                continue
+            self.presses += 1
+            key = event.key_number
+            if key == KEY_WEIGH:
+                self.weigh()
+            elif key == KEY_DEBUG:
+                if self.on_debug:
+                    self.on_debug()
+            elif key == KEY_TARE:
+                self.tare()
+
+    def weigh(self) -> None:
+        self.watching = True
+        self._show_weight()
+
+    def tare(self) -> None:
+        """Tare on a fresh window, so readings from before the press don't count"""
+        self.reset_window()
+        self._pending_tare = True
+
+    def _show_weight(self) -> None:
+        if self.ready:
+            self.render.set(self.weight_label, "{:.2f} g".format(self.weight()))
+
+    def watch_epd(self) -> None:
+        if self.watching:
+            self._show_weight()  # Only the latest reaches the panel
+        if self.render.poll():
+            self.watching = self.render.pending
+
+    def animate_pixel(self) -> None:
+        if self._pending_tare or self.watching and not self.ready:
+            color = PIXEL_WORKING
+        elif self.render.pending or self.render.display.busy:
+            self._blink = not self._blink
+            color = PIXEL_WAITING if self._blink else PIXEL_OFF
+        else:
+            color = PIXEL_OFF
+        if color != self._pixel_color:  # Each fill() is a NeoPixel write
+            self.pixel.fill(color)
+            self._pixel_color = color
+
+    def install(
+            self,
+            scheduler,
+            *,
+            keys_period: float = 0.01,
+            sample_period: float = 0.05,
+            epd_period: float = 0.25,
+            pixel_period: float = 0.1
+        ) -> None:
+        """Add the tasks to `scheduler`, tightest deadline first"""
+        scheduler.add("keys", keys_period, self.scan_keys)
+        scheduler.add("hx711", sample_period, self.sample)
+        scheduler.add("epd", epd_period, self.watch_epd)
+        scheduler.add("pixel", pixel_period, self.animate_pixel)
@@ -0,0 +1,145 @@
+"""
+A small cooperative scheduler of periodic tasks, so the scale can scan keys,
+animate the NeoPixel, watch the EPD and keep sampling the HX711 in one loop
+without any of them sleeping on the others.
+
+    scheduler = Scheduler()
+    scheduler.add("keys", 0.01, scan_keys)
+    scheduler.add("hx711", 0.05, sample)
+    scheduler.run()
+
+Tasks run in the order they were added whenever they're due, so put the
+ones with the tightest deadlines first. Every run's lateness (how long after
+it was due it actually started) goes into `histogram`. A task that falls a
+whole period or more behind skips the missed runs rather than bunching up.
+Callbacks must return quickly; anything long should be split over runs.
+
+Times are kept as integer `monotonic_ns()` nanoseconds. A float `monotonic()`
+on CircuitPython loses sub-millisecond resolution after a few hours up, and
+10 ms periods stop adding up; the arguments are still seconds.
+"""
+
+import time
+
+# Histogram bin edges, ms of lateness. Anything past the last goes in the overflow bin
+LATENESS_BINS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+_NS_PER_S = 1000000000
+_NS_PER_MS = 1000000
+
+
+class Task:
+
+    def __init__(self, name: str, period: float, callback, deadline: float = None):
+        self.name = name
+        self.period_ns = int(period * _NS_PER_S)
+        self.callback = callback
+        # Lateness allowed before it counts as missed
+        self.deadline_ns = self.period_ns if deadline is None else int(deadline * _NS_PER_S)
+        self.due_ns = 0
+
+        self.runs = 0
+        self.missed = 0  # Runs that started later than `deadline`
+        self.skipped = 0  # Periods dropped after falling a whole period behind
+        self.worst_ns = 0  # Largest lateness seen
+        self.busy_ns = 0  # Time spent in the callback
+
+    @property
+    def period(self) -> float:
+        return self.period_ns / _NS_PER_S
+
+    @property
+    def worst(self) -> float:
+        """Largest lateness seen, s"""
+        return self.worst_ns / _NS_PER_S
+
+    @property
+    def busy(self) -> float:
+        """Time spent in the callback, s"""
+        return self.busy_ns / _NS_PER_S
+
+
+class Scheduler:
+
+    def __init__(self):
+        self.tasks = []
+        self.histogram = [0] * (len(LATENESS_BINS_MS) + 1)
+        self.loops = 0
+        self.started_ns = time.monotonic_ns()
+
+    def add(self, name: str, period: float, callback, deadline: float = None, offset: float = 0.0) -> Task:
+        """Run `callback()` every `period` s, first `offset` s from now"""
+        if period <= 0:
+            raise ValueError("period must be positive")
+        task = Task(name, period, callback, deadline)
+        task.due_ns = time.monotonic_ns() + int(offset * _NS_PER_S)
+        self.tasks.append(task)
+        return task
+
+    def _record(self, lateness_ns: int) -> None:
+        lateness_ms = lateness_ns // _NS_PER_MS
+        for i, edge in enumerate(LATENESS_BINS_MS):
+            if lateness_ms < edge:
+                self.histogram[i] += 1
+                return
+        self.histogram[-1] += 1
+
+    def run_once(self) -> int:
+        """Run every task that's due, returns how many ran"""
+        self.loops += 1
+        ran = 0
+        now = time.monotonic_ns()
+        for task in self.tasks:
+            if now < task.due_ns:
+                continue
+
+            lateness = now - task.due_ns
+            self._record(lateness)
+            if lateness > task.deadline_ns:
+                task.missed += 1
+            if lateness > task.worst_ns:
+                task.worst_ns = lateness
+
+            task.callback()
+            finished = time.monotonic_ns()
+            task.busy_ns += finished - now
+            task.runs += 1
+
+            period = task.period_ns
+            task.due_ns += period
+            if task.due_ns <= finished:
+                behind = (finished - task.due_ns) // period + 1
+                task.skipped += behind
+                task.due_ns += behind * period
+
+            now = finished
+            ran += 1
+        return ran
+
+    def time_to_next(self) -> float:
+        """Seconds until the next task is due, 0 if one already is"""
+        if not self.tasks:
+            return 0.0
+        due = min(task.due_ns for task in self.tasks)
+        return max(0, due - time.monotonic_ns()) / _NS_PER_S
+
+    def run(self, until: float = None) -> None:
+        """Run tasks forever, or until `time.monotonic()` reaches `until`,
+        sleeping whenever nothing is due"""
+        until_ns = None if until is None else int(until * _NS_PER_S)
+        while until_ns is None or time.monotonic_ns() < until_ns:
+            if not self.run_once():
+                time.sleep(self.time_to_next())
+
+    def report(self) -> str:
+        """Per-task stats and the lateness histogram, for the console"""
+        lines = ["{:8} {:>6} {:>6} {:>6} {:>8} {:>8}".format(
+            "task", "runs", "missed", "skip", "worst ms", "busy %")]
+        elapsed_ns = time.monotonic_ns() - self.started_ns or 1
+        for task in self.tasks:
+            lines.append("{:8} {:6} {:6} {:6} {:8.1f} {:8.1f}".format(
+                task.name, task.runs, task.missed, task.skipped, task.worst_ns / _NS_PER_MS,
+                task.busy_ns * 100 / elapsed_ns))
+        edges = ("<{}".format(edge) for edge in LATENESS_BINS_MS)
+        lines.append("lateness ms: " + " ".join(
+            "{}:{}".format(edge, count) for edge, count in zip(list(edges) + [">={}".format(LATENESS_BINS_MS[-1])], self.histogram)))
+        return "\n".join(lines)
@@ -6,6 +6,8 @@
 #
 # I2C:
 #   * 0x37: Adafruit 0.91" OLED Display <https://www.adafruit.com/product/4440>
+#
+# Needs the `hx711` package from `../pio-hx711-driver/hx711` in `CIRCUITPY/lib`
 
 import time
 import board
@@ -14,7 +16,7 @@ import displayio
 import adafruit_displayio_ssd1306
 from adafruit_display_text import label
 import terminalio
-from hx711 import HX711
+from hx711 import backends
 
 hx_sck = digitalio.DigitalInOut(board.D6)
 hx_sck.switch_to_output()
@@ -22,7 +24,7 @@ hx_sck.switch_to_output()
 hx_dout = digitalio.DigitalInOut(board.D5)
 hx_dout.switch_to_input()
 
-hx = HX711(hx_dout, hx_sck)
+hx = backends.create("gpio", hx_dout, hx_sck)
 hx.power_on()
 
 displayio.release_displays()
@@ -50,7 +52,7 @@ text_area = label.Label(terminalio.FONT, text=text_hx.format(0), color=0xFFFFFF,
 splash.append(text_area)
 
 while True:
-    read = hx.read()
+    read = hx.read_raw()
     print("HX Read: {}".format(read))
     text_area.text = text_hx.format(read)
     time.sleep(1)
\ No newline at end of file
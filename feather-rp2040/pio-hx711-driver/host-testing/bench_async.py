@@ -0,0 +1,83 @@
+# Keypad responsiveness during a 50-sample weigh: blocking vs. asyncio driver calls
+#
+# Runs the EPD scale's jobs as asyncio tasks on a virtual-time event loop: a
+# weigh task taking `read(50)`, a keypad task scanning every 10 ms, and the
+# NeoPixel blink. Key presses land at fixed times and their latency is how
+# long until the keypad task sees them.
+#
+# Usage: python bench_async.py [seconds] [sps]
+
+import sys
+import asyncio
+
+import fakes
+
+clock = fakes.install()
+
+import hx711  # pylint: disable=wrong-import-position
+from hx711.hx711_pio import HX711_PIO  # pylint: disable=wrong-import-position
+
+clock.patch(hx711)
+
+RUN_SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+SPS = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+KEY_SCAN = 0.010
+BLINK = 0.100
+PRESS_EVERY = 0.737  # Deliberately out of step with everything else
+
+
+def run(use_async):
+    cell = fakes.HX711Model(clock, sps=SPS, counts=iter(range(10000000)))
+    hx = HX711_PIO(cell, fakes.Pin("D24"))
+
+    start = clock.now
+    presses = [start + PRESS_EVERY * (i + 1) for i in range(int(RUN_SECONDS / PRESS_EVERY))]
+    latencies = []
+    blinks = []
+    weighs = []
+
+    async def weigh():
+        while clock.now - start < RUN_SECONDS:
+            if use_async:
+                weight = await hx.read_async(50)
+            else:
+                weight = hx.read(50)
+                await asyncio.sleep(0)
+            weighs.append(weight)
+
+    async def keypad():
+        while clock.now - start < RUN_SECONDS:
+            while presses and presses[0] <= clock.now:
+                latencies.append(clock.now - presses.pop(0))
+            await asyncio.sleep(KEY_SCAN)
+
+    async def blink():
+        last = clock.now
+        while clock.now - start < RUN_SECONDS:
+            await asyncio.sleep(BLINK)
+            blinks.append(clock.now - last)
+            last = clock.now
+
+    async def main():
+        await asyncio.gather(weigh(), keypad(), blink())
+
+    loop = fakes.event_loop(clock)
+    loop.run_until_complete(main())
+    loop.close()
+
+    return latencies, blinks, weighs
+
+
+print("{:.0f} s at {} SPS, read(50) weighs, {:.0f} ms key scan".format(RUN_SECONDS, SPS, KEY_SCAN * 1000))
+print(" {:9} | {:>7} | {:>12} | {:>12} | {:>14}".format(
+    "driver", "weighs", "key mean ms", "key max ms", "blink max ms"))
+
+for name, use_async in (("blocking", False), ("asyncio", True)):
+    latencies, blinks, weighs = run(use_async)
+    print(" {:9} | {:7d} | {:12.1f} | {:12.1f} | {:14.1f}".format(
+        name,
+        len(weighs),
+        sum(latencies) / len(latencies) * 1000,
+        max(latencies) * 1000,
+        max(blinks) * 1000,
+    ))
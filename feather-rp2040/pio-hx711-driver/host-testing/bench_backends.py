@@ -0,0 +1,70 @@
+# One harness, every backend: the same workload through `hx711.backends.create()`
+#
+# Each backend reads a known count sequence (including negative and full-scale
+# values, so two's-complement handling has to agree), then is timed on single
+# reads and read(10) averages, and power-cycled with power_off()/power_on().
+#
+#   * gpio: HX711_GPIO bit-banging a simulated DOUT/SCK pin pair
+#   * pio: HX711_PIO on the fake state machine
+#   * sim: HX711_Sim, the on-device simulated cell
+#
+# Usage: python bench_backends.py [reads] [sps]
+
+import itertools
+import sys
+
+import fakes
+
+clock = fakes.install()
+
+from hx711 import backends  # pylint: disable=wrong-import-position
+
+READS = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+SPS = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+
+PATTERN = (-300000, -1, 0, 1, 0x7FFFFF, -0x800000, 123456)
+
+
+def gpio(counts):
+    cell = fakes.HX711GPIOModel(clock, sps=SPS, counts=counts)
+    return backends.create("gpio", cell.dout_pin(), cell.sck_pin())
+
+
+def pio(counts):
+    return backends.create("pio", fakes.HX711Model(clock, sps=SPS, counts=counts), fakes.Pin("D6"))
+
+
+def sim(counts):
+    return backends.create("sim", sps=SPS, counts=counts)
+
+
+print("{} reads at {} SPS, backends registered: {}".format(READS, SPS, ", ".join(backends.names())))
+print(" {:8} | {:>8} | {:>10} | {:>10} | {:>10} | {:>8}".format(
+    "backend", "decode", "read SPS", "read(10)/s", "cycle ms", "after"))
+
+for name, make in (("gpio", gpio), ("pio", pio), ("sim", sim)):
+    hx = make(itertools.cycle(PATTERN))
+
+    # Constructors may have taken a reading already, sync up on the pattern's start
+    seen = [hx.read_raw(clear_fifo=False) for i in range(len(PATTERN) * 2)]
+    start = seen.index(PATTERN[0])
+    decoded = tuple(seen[start:start + len(PATTERN)]) == PATTERN
+
+    begin = clock.now
+    for i in range(READS):
+        hx.read_raw(clear_fifo=False)
+    read_sps = READS / (clock.now - begin)
+
+    begin = clock.now
+    for i in range(READS // 10):
+        hx.read(10)
+    averages = (READS // 10) / (clock.now - begin)
+
+    begin = clock.now
+    hx.power_off()
+    hx.power_on()
+    after = hx.read_raw()
+    cycle_ms = (clock.now - begin) * 1000
+
+    print(" {:8} | {:>8} | {:10.1f} | {:10.2f} | {:10.1f} | {:>8}".format(
+        name, "ok" if decoded else "WRONG", read_sps, averages, cycle_ms, "ok" if after in PATTERN else after))
@@ -0,0 +1,113 @@
+# Calibration accuracy: single-point determine_scale() vs multi-point fits
+#
+# A fake HX711_PIO weighs a simulated cell with a little bow in its response
+# (full-scale nonlinearity of `bow` counts). Each method calibrates with the
+# same reference weights, then every check weight is read back and compared.
+# Finally the profile is written to a temporary file and loaded again, the
+# way a board would at boot instead of re-running tare(), and damaged copies
+# of the file are loaded to check they come back as None, then saved over to
+# check a fresh file replaces them.
+#
+# Usage: python bench_calibration.py [bow counts] [noise counts]
+
+import os
+import random
+import sys
+import tempfile
+
+import fakes
+
+clock = fakes.install()
+
+from hx711.hx711_pio import HX711_PIO  # pylint: disable=wrong-import-position
+from hx711.calibration import Calibration, save_profile, load_profile  # pylint: disable=wrong-import-position
+
+BOW = float(sys.argv[1]) if len(sys.argv) > 1 else 400
+NOISE = float(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+ZERO = 84000
+COUNTS_PER_GRAM = 210.0
+FULL_SCALE = 2000.0
+REFERENCES = (200.0, 500.0, 1000.0, 2000.0)
+CHECKS = (50.0, 250.0, 750.0, 1250.0, 1750.0)
+
+platform = {"weight": 0.0}
+
+
+def cell_counts():
+    rng = random.Random(1)
+    while True:
+        w = platform["weight"]
+        bow = BOW * 4 * (w / FULL_SCALE) * (1 - w / FULL_SCALE)  # Bulges mid-scale
+        yield int(ZERO + COUNTS_PER_GRAM * w + bow + rng.gauss(0, NOISE))
+
+
+def place(hx, weight):
+    platform["weight"] = weight
+    hx.read_raw()  # Conversion already in flight saw the old load
+
+
+def check(hx, label):
+    errors = []
+    for weight in CHECKS:
+        place(hx, weight)
+        errors.append(hx.read(20) - weight)
+    print(" {:22} | {}| worst {:6.2f} g".format(
+        label, "".join("{:7.2f} ".format(e) for e in errors), max(abs(e) for e in errors)))
+
+
+hx = HX711_PIO(fakes.HX711Model(clock, counts=cell_counts()), fakes.Pin("D24"))
+
+print("bow {:.0f} counts, noise {:.0f} counts, references {}".format(BOW, NOISE, REFERENCES))
+print(" {:22} | {}|".format("error at (g)", "".join("{:7.0f} ".format(w) for w in CHECKS)))
+
+place(hx, 0.0)
+hx.offset = hx.read_average(50)
+place(hx, 1000.0)
+hx.determine_scale(1000.0)
+check(hx, "determine_scale(1000)")
+
+for order, label in ((1, "least-squares line"), (2, "quadratic")):
+    place(hx, 0.0)
+    cal = Calibration(hx)
+    cal.tare()
+    for weight in REFERENCES:
+        place(hx, weight)
+        cal.add(weight)
+    profile = cal.fit(order)
+    profile.apply(hx)
+    check(hx, label)
+    print(" {:22} | residuals {} rms {:.2f} g".format(
+        "", " ".join("{:.2f}".format(r) for r in profile.residuals), profile.rms))
+
+path = os.path.join(tempfile.mkdtemp(), "hx711.cal")
+save_profile(path, profile, cell_id=2)
+save_profile(path, profile, cell_id=2)
+
+fresh = HX711_PIO(fakes.HX711Model(clock, counts=cell_counts()), fakes.Pin("D24"))
+start = fresh._sm.pushed
+loaded = load_profile(path, cell_id=2)
+loaded.apply(fresh)
+print()
+print("profile file {} bytes, slot 2 revision {}, other slots {}".format(
+    os.path.getsize(path), loaded.revision, load_profile(path, cell_id=0)))
+print("boot: {} conversions to load the profile (read(50) + tare() re-runs take 51)".format(
+    fresh._sm.pushed - start))
+check(fresh, "loaded profile")
+
+with open(path, "rb") as cal_file:
+    good = cal_file.read()
+damaged = (
+    ("truncated header", good[:5]),
+    ("truncated slot", good[:len(good) // 3]),  # Partway through slot 2
+    ("garbage", bytes(range(256))[:len(good)]),
+    ("empty", b""),
+)
+for name, data in damaged:
+    with open(path, "wb") as cal_file:
+        cal_file.write(data)
+    before = load_profile(path, cell_id=2)
+    save_profile(path, loaded, cell_id=2)
+    after = load_profile(path, cell_id=2)
+    print("{} file loads as {}, saved over: {}".format(
+        name, before, "ok" if after and after.offset == loaded.offset else "BAD"))
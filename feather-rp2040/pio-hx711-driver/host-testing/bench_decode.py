@@ -0,0 +1,81 @@
+# Benchmark for turning padded PIO words into counts: per-word list/sum vs. batch
+# `decode_into()` vs. NumPy
+#
+# Reports time per word and peak Python heap allocation per call for a burst
+# the size of the EPD scale's `hx.read(50)`, plus a long offline capture.
+#
+# Usage: python bench_decode.py [burst] [capture]
+
+import sys
+import array
+import random
+import timeit
+import tracemalloc
+
+import fakes
+
+fakes.install()
+
+from hx711.decode import decode_word, decode_into, decode_numpy  # pylint: disable=wrong-import-position
+
+BURST = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+CAPTURE = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+rng = random.Random(711)
+
+
+def padded_words(count):
+    return array.array("I", [
+        fakes.HX711Model.word(rng.randint(-0x800000, 0x7FFFFF)) for _ in range(count)
+    ])
+
+
+def average_listsum(words, counts, count):
+    # What read_average() did before: one read_raw()-style decode per word into a list
+    readings = []
+    for i in range(count):
+        readings.append(decode_word(words[i]))
+    return sum(readings) // len(readings)
+
+
+def average_batch(words, counts, count):
+    return decode_into(words, counts, count) // count
+
+
+def average_numpy(words, counts, count):
+    return int(decode_numpy(words[:count]).sum()) // count
+
+
+def peak_alloc(func, *args):
+    func(*args)  # Warm up
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+try:
+    import numpy  # pylint: disable=unused-import
+    candidates = (("list+sum", average_listsum), ("decode_into", average_batch), ("numpy", average_numpy))
+except ImportError:
+    print("NumPy not installed, skipping the host-side path")
+    candidates = (("list+sum", average_listsum), ("decode_into", average_batch))
+
+for size in (BURST, CAPTURE):
+    words = padded_words(size)
+    counts = array.array("i", [0] * size)
+
+    expected = average_listsum(words, counts, size)
+    loops = max(1, 200000 // size)
+
+    print("{} words, {} loops".format(size, loops))
+    print(" {:12} | {:>9} | {:>11} | {:>8}".format("path", "ns/word", "peak bytes", "matches"))
+    for name, func in candidates:
+        seconds = timeit.timeit(lambda: func(words, counts, size), number=loops)
+        print(" {:12} | {:9.1f} | {:11d} | {:>8}".format(
+            name,
+            seconds * 1000000000 / (loops * size),
+            peak_alloc(func, words, counts, size),
+            str(func(words, counts, size) == expected),
+        ))
@@ -0,0 +1,152 @@
+# Zero drift with temperature: tare-only vs. compensated with a learned model
+#
+# A cell whose zero drifts `DRIFT` counts per degree (plus a little curvature)
+# with its own temperature, which lags the room by 20 minutes. The board reads
+# the RP2040 die sensor instead: it runs a few degrees warm, lags the room by
+# 5 minutes and is noisy. Room temperature swings through a day.
+#
+#   * characterize: a day with the platform empty, logged by SessionRecorder,
+#     plus one with an empty-platform tare every 2 hours. Models are fitted
+#     offline from both logs with `drift.fit_session()`.
+#   * evaluate: a different day, a load on the platform, weighed every 5 min.
+#     An operator re-tares (taking the load off) whenever the zero error
+#     passes TOLERANCE_G. Run tare-only, with each offline model, and with a
+#     model learning online from those re-tares.
+#
+# Reported: fitted slope vs. the cell's true one, zero error rms/max in g and
+# how many re-tares each needed.
+#
+# Usage: python bench_drift.py [hours] [tolerance g]
+
+import math
+import os
+import random
+import sys
+import tempfile
+
+import fakes
+
+clock = fakes.install()
+
+from hx711 import drift  # pylint: disable=wrong-import-position
+from hx711.hx711_sim import HX711_Sim  # pylint: disable=wrong-import-position
+from hx711.recorder import SessionRecorder, read_session  # pylint: disable=wrong-import-position
+
+HOURS = float(sys.argv[1]) if len(sys.argv) > 1 else 24
+TOLERANCE_G = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+STEP_S = 30
+ZERO = -81234
+SCALE = 395.513
+DRIFT = 60.0  # counts per degree at 25 C
+CURVE = 1.5  # counts per degree squared
+LOAD_G = 1000.0
+CELL_TAU_S = 1200
+DIE_TAU_S = 300
+DIE_WARM = 6.0
+DIE_NOISE = 0.4
+
+
+class Bench:
+    """Room, cell and die temperatures, integrated one STEP_S at a time"""
+
+    def __init__(self, seed: int, mean: float, swing: float):
+        self.rng = random.Random(seed)
+        self.mean = mean
+        self.swing = swing
+        self.cell = self.die = self.room(0)
+        self.load_g = 0.0
+
+    def room(self, t):
+        day = 2 * math.pi * t / 86400
+        return self.mean + self.swing * math.sin(day) + 0.3 * self.swing * math.sin(3 * day + 1)
+
+    def step(self, t):
+        room = self.room(t)
+        self.cell += (room - self.cell) * STEP_S / CELL_TAU_S
+        self.die += (room - self.die) * STEP_S / DIE_TAU_S
+
+    def zero(self):
+        u = self.cell - 25
+        return ZERO + DRIFT * u + CURVE * u * u
+
+    def counts(self):
+        while True:
+            yield int(self.zero() + self.load_g * SCALE + self.rng.gauss(0, 20))
+
+    def die_temperature(self):
+        return self.die + DIE_WARM + self.rng.gauss(0, DIE_NOISE)
+
+
+def make_hx(bench):
+    hx = HX711_Sim(counts=bench.counts(), offset=ZERO, scale=SCALE)
+    hx.temperature_interval = 0  # Steps are 30 s apart anyway
+    return hx
+
+
+def characterize(path, seed, tare_every):
+    bench = Bench(seed, 22, 5)
+    hx = make_hx(bench)
+    hx.compensate_drift(bench.die_temperature)
+    start = clock.now
+    with SessionRecorder(path, flush_every=64) as recorder:
+        t = 0
+        while t < HOURS * 3600:
+            bench.step(t)
+            clock.advance_to(start + t)
+            if tare_every and t % tare_every == 0:
+                hx.tare()
+                clock.sleep(0.1)  # ...and on to the next conversion
+            hx.read_temperature()
+            recorder.record_reading(hx, hx.read_raw())
+            t += STEP_S
+    return read_session(path)
+
+
+def evaluate(model, learn):
+    bench = Bench(99, 24, 6)
+    bench.load_g = LOAD_G
+    hx = make_hx(bench)
+    if model is not None or learn:
+        hx.compensate_drift(bench.die_temperature, model=model)
+    errors, retares = [], 0
+    start = clock.now
+    t = 0
+    while t < HOURS * 3600:
+        bench.step(t)
+        clock.advance_to(start + t)
+        if t % 300 == 0:
+            hx.read_temperature()
+            error = hx.to_weight(hx.read_raw()) - LOAD_G
+            if abs(error) > TOLERANCE_G:
+                bench.load_g = 0.0
+                hx.tare()
+                bench.load_g = LOAD_G
+                retares += 1
+                clock.sleep(0.1)
+                error = hx.to_weight(hx.read_raw()) - LOAD_G
+            errors.append(error)
+        t += STEP_S
+    rms = (sum(e * e for e in errors) / len(errors)) ** 0.5
+    return hx.drift, rms, max(abs(e) for e in errors), retares
+
+
+out_dir = tempfile.mkdtemp()
+empty = characterize(os.path.join(out_dir, "empty.hxl"), 1, 0)
+tares = characterize(os.path.join(out_dir, "tares.hxl"), 2, 7200)
+models = (
+    ("tare only", None, False),
+    ("fit empty", drift.fit_session(empty, empty=True), False),
+    ("fit tares", drift.fit_session(tares), False),
+    ("fit tares q", drift.fit_session(tares, order=2), False),
+    ("online", None, True),
+)
+
+print("{:.0f} h, {} counts/C at 25 C ({:.3f} g/C), re-tare past {} g".format(
+    HOURS, DRIFT, DRIFT / SCALE, TOLERANCE_G))
+print(" {:12} | {:>6} | {:>8} | {:>8} | {:>8} | {:>7}".format(
+    "model", "points", "slope", "rms g", "max g", "re-tares"))
+for name, model, learn in models:
+    model, rms, worst, retares = evaluate(model, learn)
+    points = len(model.points) if model else 0
+    slope = "{:8.1f}".format(model.slope()) if model and model.fitted else "       -"
+    print(" {:12} | {:6} | {} | {:8.3f} | {:8.3f} | {:7}".format(name, points, slope, rms, worst, retares))
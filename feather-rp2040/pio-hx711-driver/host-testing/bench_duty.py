@@ -0,0 +1,75 @@
+# Duty-cycled sampling: HX711 awake time, conversions and current vs. always-on
+#
+# A battery scale that needs a weight every `interval` seconds. The always-on
+# baseline keeps converting and reads the latest burst when it's due. The duty
+# cycled runs power the chip down in between, with and without dropping the
+# first post-wake conversion (which the model returns `wake_error` counts off).
+# The model's own power tally is printed next to DutyCycle's, they should agree.
+#
+# Usage: python bench_duty.py [minutes] [interval s] [burst] [sps]
+
+import sys
+
+import fakes
+
+clock = fakes.install()
+
+from hx711 import backends  # pylint: disable=wrong-import-position
+from hx711.duty import HX_ACTIVE_MA  # pylint: disable=wrong-import-position
+
+MINUTES = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+INTERVAL = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+BURST = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+SPS = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+LOAD = 250000
+UI_TICK = 0.001  # Main loop pass while a burst is running
+
+
+def make(name):
+    if name == "gpio":
+        cell = fakes.HX711GPIOModel(clock, sps=SPS, counts=None)
+        hx = backends.create("gpio", cell.dout_pin(), cell.sck_pin())
+    else:
+        cell = fakes.HX711Model(clock, sps=SPS, counts=None)
+        hx = backends.create("pio", cell, fakes.Pin("D6"))
+    cell.last_count = LOAD
+    return cell, hx
+
+
+def always_on(name):
+    cell, hx = make(name)
+    start, start_awake, start_conversions, errors = clock.now, cell.awake_s(), cell.conversions, []
+    due = start
+    while clock.now - start < MINUTES * 60:
+        clock.advance_to(due)
+        errors.append(abs(hx.read_average(BURST) - LOAD))
+        due += INTERVAL
+    awake = cell.awake_s() - start_awake
+    return clock.now - start, awake, cell.conversions - start_conversions, HX_ACTIVE_MA, max(errors), awake
+
+
+def duty_cycled(name, discard):
+    cell, hx = make(name)
+    duty = hx.duty_cycle(INTERVAL, BURST, discard)
+    start_awake = cell.awake_s()
+    errors = []
+    while duty.elapsed < MINUTES * 60:
+        if duty.poll():
+            errors.append(abs(duty.reading - LOAD))
+        clock.sleep(duty.time_to_wake() or UI_TICK)
+    return (duty.elapsed, duty.awake, duty.conversions, duty.average_current_ma(), max(errors),
+            cell.awake_s() - start_awake)
+
+
+print("{:.0f} min, a {}-reading burst every {:.0f} s at {} SPS".format(MINUTES, BURST, INTERVAL, SPS))
+print(" {:5} | {:18} | {:>8} | {:>9} | {:>9} | {:>8} | {:>9} | {:>8}".format(
+    "", "mode", "awake s", "awake %", "conv/h", "HX mA", "max err", "model s"))
+
+for name in ("pio", "gpio"):
+    for label, run in (("always on", lambda: always_on(name)),
+                       ("duty, no discard", lambda: duty_cycled(name, 0)),
+                       ("duty, discard 1", lambda: duty_cycled(name, 1))):
+        elapsed, awake, conversions, current, error, model_awake = run()
+        print(" {:5} | {:18} | {:8.1f} | {:9.2f} | {:9.0f} | {:8.4f} | {:9} | {:8.1f}".format(
+            name, label, awake, awake / elapsed * 100, conversions * 3600 / elapsed, current, error,
+            model_awake))
@@ -0,0 +1,116 @@
+# Filter pipeline benchmark on a recorded or synthetic HX711 count stream
+#
+# Feeds the stream through a few filter setups and reports error against the
+# known load, worst-case error, conversions needed to settle after a load step
+# and host CPU time per sample.
+#
+# Usage: python bench_filters.py [counts.txt]
+#
+# `counts.txt` is one signed raw count per line. Without it a synthetic 80 SPS
+# stream is used: empty platform, a 50000-count load dropped on at 1 s, noise
+# and the odd vibration spike.
+
+import sys
+import time
+import random
+
+import fakes
+
+fakes.install()
+
+from hx711.filters import FilterChain, MedianFilter, EMAFilter, OutlierFilter  # pylint: disable=wrong-import-position
+
+SPS = 80
+STEP_AT = SPS
+LOAD = 50000
+NOISE = 40
+SPIKE_RATE = 0.02
+SPIKE_SIZE = 20000
+TOLERANCE = 150  # Counts, roughly 0.4 g at a scale of 400
+
+
+def synthetic_stream(seconds=10, seed=711):
+    rng = random.Random(seed)
+    counts = []
+    truth = []
+    for i in range(seconds * SPS):
+        level = LOAD if i >= STEP_AT else 0
+        value = level + int(rng.gauss(0, NOISE))
+        if rng.random() < SPIKE_RATE:
+            value += rng.choice((-1, 1)) * SPIKE_SIZE
+        counts.append(value)
+        truth.append(level)
+    return counts, truth
+
+
+def load_stream(path):
+    with open(path) as capture:
+        counts = [int(line) for line in capture if line.strip()]
+    # No ground truth for a recording, judge against its own settled tail
+    tail = sorted(counts[-len(counts) // 4:])
+    level = tail[len(tail) // 2]
+    return counts, [level] * len(counts)
+
+
+class BlockAverage:
+    """What `read_average(n)` gives you: one mean per n conversions"""
+
+    def __init__(self, n):
+        self.n = n
+        self.total = 0
+        self.seen = 0
+        self.value = 0
+
+    def update(self, value):
+        self.total += value
+        self.seen += 1
+        if self.seen == self.n:
+            self.value = self.total // self.n
+            self.total = 0
+            self.seen = 0
+        return self.value
+
+
+SETUPS = (
+    ("average(10)", lambda: BlockAverage(10)),
+    ("average(50)", lambda: BlockAverage(50)),
+    ("median(5)", lambda: MedianFilter(5)),
+    ("ema(3)", lambda: EMAFilter(3)),
+    ("outlier+median", lambda: FilterChain(OutlierFilter(9), MedianFilter(5))),
+    ("outlier+med+ema", lambda: FilterChain(OutlierFilter(9), MedianFilter(5), EMAFilter(2))),
+)
+
+if len(sys.argv) > 1:
+    counts, truth = load_stream(sys.argv[1])
+    step_at = 0
+else:
+    counts, truth = synthetic_stream()
+    step_at = STEP_AT
+
+print("{} samples, tolerance {} counts".format(len(counts), TOLERANCE))
+print(" {:16} | {:>9} | {:>9} | {:>13} | {:>9}".format(
+    "filter", "mean err", "max err", "settle (conv)", "us/sample"))
+
+for name, factory in SETUPS:
+    stage = factory()
+    outputs = []
+    cpu = time.perf_counter()
+    for value in counts:
+        outputs.append(stage.update(value))
+    cpu = time.perf_counter() - cpu
+
+    settle = None
+    for i in range(step_at, len(outputs)):
+        if all(abs(outputs[j] - truth[j]) <= TOLERANCE for j in range(i, min(i + SPS, len(outputs)))):
+            settle = i - step_at
+            break
+
+    after = range(step_at + (settle or 0), len(outputs))
+    errors = [abs(outputs[i] - truth[i]) for i in after] or [0]
+    print(" {:16} | {:9.1f} | {:9d} | {:>13} | {:9.2f}".format(
+        name,
+        sum(errors) / len(errors),
+        max(errors),
+        "never" if settle is None else settle,
+        cpu * 1000000 / len(counts),
+    ))
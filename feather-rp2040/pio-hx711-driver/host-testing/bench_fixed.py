@@ -0,0 +1,159 @@
+# Float vs. Q16.16 fixed-point scale conversion, counting heap allocations
+#
+# CPython allocates every int and float, so its own numbers say little about
+# a SAMD21 or RP2040. Instead the raw counts and the driver's scale go in as
+# `MPInt`/`MPFloat`, which count the results CircuitPython would have to put
+# on the heap: every float, and every int outside the 31-bit small-int range.
+# Strings aren't counted; both paths make one for the display.
+#
+#   * to_weight / to_fixed: one conversion per reading
+#   * +drift, read_fixed: read() vs. read_fixed() with temperature drift compensation on, clock and
+#     temperature reads included (re-read every second at 10 SPS)
+#   * read(10) / read_fixed(10): averaged reads, from a driver handing out
+#     the readings as fast as they're asked for
+#
+# Reported per conversion: heap objects, CPython time with plain ints and
+# floats (only the ratio carries over), and the largest difference from the
+# float path in 0.01 g. With drift on, read_fixed() checks the temperature
+# every `fixed_drift_every` conversions (set to 10 here, once a second at
+# 10 SPS) rather than reading the clock on every conversion.
+#
+# Usage: python bench_fixed.py [readings]
+
+import random
+import sys
+import time
+
+import fakes
+
+clock = fakes.install()
+
+import hx711  # pylint: disable=wrong-import-position
+from hx711.drift import DriftModel  # pylint: disable=wrong-import-position
+
+READINGS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+OFFSET = -81234
+SCALE = 395.513
+SMALL_MIN = -(1 << 30)
+SMALL_MAX = (1 << 30) - 1
+
+
+class Heap:
+    objects = 0
+
+
+def box(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        Heap.objects += 1
+        return MPFloat(value)
+    if isinstance(value, int):
+        if not SMALL_MIN <= value <= SMALL_MAX:
+            Heap.objects += 1
+        return MPInt(value)
+    return value
+
+
+def _counted(base, name):
+    method = getattr(base, name)
+
+    def op(self, *args):
+        result = method(self, *args)
+        return result if result is NotImplemented else box(result)
+    return op
+
+
+_OPS = ("__add__", "__radd__", "__sub__", "__rsub__", "__mul__", "__rmul__", "__truediv__", "__rtruediv__",
+        "__floordiv__", "__rfloordiv__", "__mod__", "__neg__", "__abs__", "__round__")
+_INT_OPS = ("__rshift__", "__lshift__", "__and__")
+
+
+class MPInt(int):
+    pass
+
+
+class MPFloat(float):
+    pass
+
+
+for _name in _OPS + _INT_OPS:
+    setattr(MPInt, _name, _counted(int, _name))
+for _name in _OPS:
+    setattr(MPFloat, _name, _counted(float, _name))
+
+
+rng = random.Random(20)
+plain = [OFFSET + int(rng.uniform(-50, 2500) * SCALE) + rng.randint(-40, 40) for _ in range(READINGS)]
+counted = [MPInt(raw) for raw in plain]
+
+
+class Readings(hx711.HX711):
+
+    def __init__(self, counts, **kwargs):
+        self._counts = iter(counts)
+        super().__init__(**kwargs)
+
+    def is_ready(self) -> bool:
+        return True
+
+    def read_raw(self, clear_fifo: bool = True) -> int:
+        return next(self._counts)
+
+
+def temperature():
+    return 24.0 + 3 * (clock.now % 7) / 7
+
+
+def make_hx(raws, drift: bool):
+    wrap = box if raws is counted else float
+    hx = Readings(raws, offset=OFFSET, scale=wrap(SCALE))
+    hx.fixed_point(2)
+    hx.fixed_drift_every = 10  # Once a second at 10 SPS
+    if drift:
+        model = DriftModel()
+        for degrees in (20.0, 24.0, 28.0):
+            model.add(degrees, OFFSET + int(60 * (degrees - 24)))
+        hx.compensate_drift(lambda: wrap(temperature()), model=model)
+    return hx
+
+
+def run(raws, drift, convert, count):
+    """Heap objects per conversion, us per conversion, and the values"""
+    clock.now = 1000.0  # Same temperatures every pass, tare included
+    hx711.time.monotonic = monotonic if raws is counted else clock.monotonic
+    hx = make_hx(raws, drift)
+    values = []
+    Heap.objects = 0
+    start = time.perf_counter()
+    for _ in range(len(raws) // count):
+        clock.now += count / 10  # 10 SPS
+        values.append(convert(hx, count))
+    elapsed = time.perf_counter() - start
+    return Heap.objects / len(values), elapsed * 1000000 / len(values), values
+
+
+def monotonic():
+    return box(clock.monotonic())  # Reading the clock is a float too
+
+
+rows = (
+    ("to_weight / to_fixed", False, 1, lambda hx, count: hx.to_weight(hx.read_raw()),
+     lambda hx, count: hx.to_fixed(hx.read_raw())),
+    ("+drift, read_fixed", True, 1, lambda hx, count: hx.read(), lambda hx, count: hx.read_fixed()),
+    ("read / read_fixed(10)", False, 10, lambda hx, count: hx.read(count), lambda hx, count: hx.read_fixed(count)),
+)
+
+print("{} readings, scale {} counts/g, multiplier {} (Q16.16, 0.01 g per count)".format(
+    READINGS, SCALE, make_hx(plain, False).fixed_point(2)))
+print(" {:22} | {:>10} | {:>10} | {:>10} | {:>10} | {:>9}".format(
+    "conversion", "float heap", "fixed heap", "float us", "fixed us", "max diff"))
+
+for name, drift, count, float_path, fixed_path in rows:
+    float_heap, _, floats = run(counted, drift, float_path, count)
+    fixed_heap, _, fixed = run(counted, drift, fixed_path, count)
+    _, float_us, _ = run(plain, drift, float_path, count)
+    _, fixed_us, _ = run(plain, drift, fixed_path, count)
+    diff = max(abs(round(weight * 100) - value) for weight, value in zip(floats, fixed))
+    print(" {:22} | {:10.1f} | {:10.1f} | {:10.2f} | {:10.2f} | {:9}".format(
+        name, float_heap, fixed_heap, float_us, fixed_us, diff))
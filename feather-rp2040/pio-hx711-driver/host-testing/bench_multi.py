@@ -0,0 +1,67 @@
+# Multi-channel HX711 demux check and throughput benchmark
+#
+# Round-trips random readings through the interleaved `in pins, N` bitstream
+# for 1, 2, 4 and 8 channels and checks `demux_into()` gets them all back, then times
+# it against decoding the same number of single-channel words. Finishes with
+# a four-cell HX711_PIO_Multi read through the fake state machine.
+#
+# Usage: python bench_multi.py [frames]
+
+import sys
+import array
+import random
+import timeit
+
+import fakes
+
+clock = fakes.install()
+
+from hx711.decode import demux_into, decode_into, frame_layout  # pylint: disable=wrong-import-position
+from hx711.hx711_pio_multi import HX_CHANNEL_COUNTS, HX711_PIO_Multi  # pylint: disable=wrong-import-position
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+rng = random.Random(711)
+
+
+def random_frames(channels, frames):
+    readings = [tuple(rng.randint(-0x800000, 0x7FFFFF) for _ in range(channels)) for _ in range(frames)]
+    words = array.array("I")
+    for reading in readings:
+        words.extend(fakes.interleave(reading))
+    return readings, words
+
+
+print("{} frames per channel count".format(FRAMES))
+print(" {:>8} | {:>10} | {:>11} | {:>12} | {:>12} | {:>7}".format(
+    "channels", "words/frm", "frames/s", "readings/s", "single r/s", "correct"))
+
+for channels in HX_CHANNEL_COUNTS:
+    readings, words = random_frames(channels, FRAMES)
+    counts = array.array("i", [0] * (channels * FRAMES))
+
+    demux_into(words, counts, channels, FRAMES)
+    expected = [count for reading in readings for count in reading]
+    correct = list(counts) == expected
+
+    seconds = min(timeit.repeat(lambda: demux_into(words, counts, channels, FRAMES), number=1, repeat=3))
+
+    singles = array.array("I", [fakes.HX711Model.word(count) for count in expected])
+    single_counts = array.array("i", [0] * len(singles))
+    single_seconds = min(timeit.repeat(lambda: decode_into(singles, single_counts), number=1, repeat=3))
+
+    print(" {:8d} | {:10d} | {:11.0f} | {:12.0f} | {:12.0f} | {:>7}".format(
+        channels,
+        frame_layout(channels)[1],
+        FRAMES / seconds,
+        FRAMES * channels / seconds,
+        len(singles) / single_seconds,
+        str(correct),
+    ))
+
+loads = [(1000 * (i + 1), 2000 * (i + 1), 3000 * (i + 1), 4000 * (i + 1)) for i in range(200)]
+bank = fakes.HX711BankModel(clock, channels=4, sps=80, counts=iter(loads))
+hx = HX711_PIO_Multi(bank, fakes.Pin("D24"), channels=4)
+counts = array.array("i", [0] * 4)
+hx.read_raw_into(counts)
+print("HX711_PIO_Multi via fake SM: {} (bank's last conversion {})".format(list(counts), bank.last_count))
@@ -0,0 +1,130 @@
+# Cycle counts, sample rate ceiling and FIFO use of the HX711 PIO programs
+#
+# Assembles hx711_read_code, hx711_sched_read_code and hx711_multi_read_code
+# (for each channel count HX711_PIO_Multi accepts) with adafruit_pioasm, then runs them in `pio_sim` against
+# simulated HX711s at each `pio_freq` for a few seconds of 80 SPS. Reports
+#
+#   * cycles/conv: cycles spent per conversion outside `wait` and FIFO stalls
+#   * readout: how long SCK is busy per conversion at that frequency
+#   * max SPS: conversions/s the program could keep up with, frequency / cycles
+#   * FIFO max/mean: RX FIFO words with the CPU draining it every `drain` ms
+#   * stalls: cycles stalled on autopush into a full FIFO, conversions missed
+#
+# and checks the decoded counts against what the chips clocked out, plus the shortest SCK high/low seen against
+# what `captures.PioTiming` reads off the program text. Counts are BAD if any
+# decode wrong, or if conversions were missed because the FIFO wasn't drained
+# in time.
+#
+# Then HX711_PIO_Multi itself reads from the simulated state machine after
+# leaving it alone for a while, long enough for the FIFO to fill and the SM to
+# stall partway through a frame. Each read_raw_into() should get the newest
+# conversion of every chip, not words from two different frames.
+#
+# Usage: python bench_pio.py [seconds] [drain ms] [pio_freq MHz, ...]
+
+import array
+import random
+import sys
+
+import adafruit_pioasm
+
+import captures
+import fakes
+import pio_sim
+
+clock = fakes.install()
+
+from hx711.decode import decode_word, demux_into, frame_layout  # pylint: disable=wrong-import-position
+from hx711.hx711_pio import hx711_read_code  # pylint: disable=wrong-import-position
+from hx711.hx711_pio_multi import HX_CHANNEL_COUNTS, HX711_PIO_Multi, hx711_multi_read_code  # pylint: disable=wrong-import-position
+from hx711.hx711_pio_sched import hx711_sched_read_code  # pylint: disable=wrong-import-position
+
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+DRAIN = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+FREQS = [int(float(f) * 1000000) for f in sys.argv[3:]] or [1000000, 4000000, 10000000]
+SPS = 80
+
+
+def multi_code(channels):
+    pad, words = frame_layout(channels)
+    pad_code = "in null, {}".format(pad) if pad else ""
+    wait_code = "\n".join("wait 0 pin {}".format(pin) for pin in range(channels))
+    return hx711_multi_read_code.format(0, 23, pad_code, wait_code, channels)
+
+
+PROGRAMS = (
+    ("hx711_read_code", hx711_read_code.format(0, 23), 1),
+    ("hx711_sched_read_code", hx711_sched_read_code.format(0, 23), 1),
+) + tuple(("hx711_multi_read_code x{}".format(channels), multi_code(channels), channels)
+          for channels in HX_CHANNEL_COUNTS)
+
+
+def decode(words, channels):
+    if channels == 1:
+        return [[decode_word(word) for word in words]]
+    frame_words = frame_layout(channels)[1]
+    frames = len(words) // frame_words
+    counts = array.array('i', [0] * frames * channels)
+    demux_into(array.array('I', words[:frames * frame_words]), counts, channels, frames)
+    return [counts[channel::channels].tolist() for channel in range(channels)]
+
+
+def pulse_widths(edges):
+    """Shortest SCK high and low, in seconds"""
+    highs = [edges[i + 1][0] - edges[i][0] for i in range(1, len(edges) - 1) if edges[i][1]]
+    lows = [edges[i + 1][0] - edges[i][0] for i in range(1, len(edges) - 1) if not edges[i][1]]
+    return min(highs), min(lows)
+
+
+rng = random.Random(5)
+print("{} s at {} SPS per run, RX FIFO drained every {:.0f} ms".format(SECONDS, SPS, DRAIN * 1000))
+print()
+print(" {:24} | {:>8} | {:>11} | {:>10} | {:>8} | {:>8} | {:>9} | {:>20} | {:>6} | {:>6}".format(
+    "program", "pio_freq", "cycles/conv", "readout us", "max SPS", "FIFO max", "FIFO mean", "stalls", "counts", "timing"))
+
+for name, code, channels in PROGRAMS:
+    program = adafruit_pioasm.assemble(code)
+    for freq in FREQS:
+        counts = [[rng.randint(-0x800000, 0x7FFFFF) for i in range(int(SECONDS * SPS) + 10)]
+                  for channel in range(channels)]
+        chips = [pio_sim.HX711Chip(counts[channel], sps=SPS) for channel in range(channels)]
+        sm = pio_sim.StateMachine(program, freq, chips)
+        words = sm.run(SECONDS, drain=DRAIN)
+
+        conversions = chips[0].read
+        cycles = sm.active_cycles() / conversions
+        missed = sum(chip.missed for chip in chips)
+        decoded = decode(words, channels)
+        ok = all(decoded[c] == chips[c].sent[:len(decoded[c])] for c in range(channels)) and decoded[0] \
+            and not missed
+
+        timing = captures.PioTiming(code, freq, gain_pulses=1)
+        high, low = pulse_widths(sm.sck_edges)
+        timing_ok = abs(high - timing.t3()[0]) < timing.cycle / 2 and abs(low - timing.t4()) < timing.cycle / 2
+
+        print(" {:24} | {:>8} | {:11.1f} | {:10.1f} | {:8.0f} | {:8} | {:9.2f} | {:>20} | {:>6} | {:>6}".format(
+            name, freq, cycles, cycles / freq * 1000000, freq / cycles, sm.max_rx, sm.mean_rx(),
+            "{}, {} missed".format(sm.stall_cycles, missed), "ok" if ok else "BAD", "ok" if timing_ok else "BAD"))
+
+
+GAPS = (0.01, 0.05, 0.2, 1.0)
+
+print()
+print("HX711_PIO_Multi.read_raw_into() on the simulator, {} Hz, after a gap with no reads".format(FREQS[0]))
+print(" {:>8} | {}".format("channels", " | ".join("{:>7}".format("{:.0f} ms".format(gap * 1000)) for gap in GAPS)))
+for channels in HX_CHANNEL_COUNTS:
+    bank = fakes.HX711BankModel(clock, channels=channels)
+    hx = HX711_PIO_Multi(bank, fakes.Pin("D24"), channels=channels, pio_freq=FREQS[0])
+    chips = [pio_sim.HX711Chip(iter(lambda: rng.randint(-0x800000, 0x7FFFFF), None), sps=SPS)
+             for channel in range(channels)]
+    hx._sm = pio_sim.StateMachine(hx._pioasm_read, FREQS[0], chips)  # pylint: disable=protected-access
+    counts = array.array('i', [0] * channels)
+    results = []
+    for gap in GAPS:
+        hx._sm.idle(gap)  # pylint: disable=protected-access
+        hx.read_raw_into(counts)
+        ok = list(counts) == [chip.sent[-1] for chip in chips]
+        hx.read_raw_into(counts, clear_fifo=False)
+        ok = ok and list(counts) == [chip.sent[-1] for chip in chips]
+        results.append("ok" if ok else "BAD")
+    print(" {:8} | {}".format(channels, " | ".join("{:>7}".format(result) for result in results)))
@@ -0,0 +1,87 @@
+# DOUT ready-detection latency for HX711_GPIO, on a simulated pin pair
+#
+# Latency is the time from DOUT falling to the first SCK rise. Pin reads per
+# sample show how much CPU the wait spends spinning instead of sleeping.
+#
+#   * sleep-10ms: the old `while dout: time.sleep(0.01)` loop
+#   * spin: tight spin on DOUT for the whole conversion period
+#   * predictive: `wait_ready()`, sleeps through the learned period then spins
+#
+# Then a fresh driver sits idle for a while before a read_average(). The pause
+# mustn't be learned as the conversion period, or every read after it sleeps
+# far too long.
+#
+# Usage: python bench_ready.py [seconds] [sps] [ui_ms]
+
+import sys
+
+import fakes
+
+clock = fakes.install()
+
+import hx711.hx711_gpio as hx711_gpio  # pylint: disable=wrong-import-position
+from hx711.hx711_gpio import HX711_GPIO  # pylint: disable=wrong-import-position
+
+clock.patch(hx711_gpio)
+
+RUN_SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+SPS = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+UI_WORK = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.004
+
+
+class SleepPoll(HX711_GPIO):
+
+    def wait_ready(self, timeout=None):
+        while self._pin_data.value:
+            clock.sleep(0.01)
+
+
+class Spin(HX711_GPIO):
+
+    def wait_ready(self, timeout=None):
+        self._period_ns = None  # Never learn the period, so never sleep
+        super().wait_ready(timeout)
+
+
+print("{:.0f} s at {} SPS, {:.0f} ms of other work between reads".format(RUN_SECONDS, SPS, UI_WORK * 1000))
+print(" {:10} | {:>8} | {:>8} | {:>8} | {:>10} | {:>7}".format(
+    "wait", "mean us", "max us", "eff SPS", "reads/smpl", "missed"))
+
+for name, driver in (("sleep-10ms", SleepPoll), ("spin", Spin), ("predictive", HX711_GPIO)):
+    cell = fakes.HX711GPIOModel(clock, sps=SPS, counts=iter(range(1000000)))
+    hx = driver(cell.dout_pin(), cell.sck_pin())
+    cell.latencies.clear()
+    cell.pin_reads = 0
+    missed = cell.missed
+
+    start = clock.now
+    samples = 0
+    while clock.now - start < RUN_SECONDS:
+        hx.read_raw()
+        samples += 1
+        clock.sleep(UI_WORK)
+
+    latencies = cell.latencies
+    print(" {:10} | {:8.0f} | {:8.0f} | {:8.1f} | {:10.0f} | {:7d}".format(
+        name,
+        sum(latencies) / len(latencies) * 1000000,
+        max(latencies) * 1000000,
+        samples / RUN_SECONDS,
+        cell.pin_reads / samples,
+        cell.missed - missed,
+    ))
+
+print()
+print("Fresh HX711_GPIO, idle, then read_average(count), at {} SPS".format(SPS))
+print(" {:>7} | {:>5} | {:>8} | {:>12} | {:>9}".format("idle ms", "count", "took s", "expected s", "period ms"))
+for pause in (0.0, 0.05, 0.5, 2.0):
+    for count in (10, 50):
+        cell = fakes.HX711GPIOModel(clock, sps=SPS, counts=iter(range(1000000)))
+        hx = HX711_GPIO(cell.dout_pin(), cell.sck_pin())
+        clock.sleep(pause)
+        start = clock.now
+        hx.read_average(count)
+        period = hx._period_ns  # pylint: disable=protected-access
+        print(" {:7.0f} | {:5} | {:8.2f} | {:12.2f} | {:>9}".format(
+            pause * 1000, count, clock.now - start, count / SPS,
+            "-" if period is None else "{:.2f}".format(period / 1000000)))
@@ -0,0 +1,138 @@
+# Session logging cost, and deterministic replay of what was logged
+#
+#   * logging: cost per reading of the text line code.py used to print, written
+#     and flushed to a file, vs. `SessionRecorder` flushing every 1, 8 and 64
+#     readings. Wall-clock time on this host, so only the ratios carry over.
+#   * replay: every step-response fixture is read live (fake HX711_PIO on the
+#     virtual clock) while recording, then replayed twice through
+#     `backends.create("replay", ...)`. The counts have to match the live run
+#     exactly, and so does the weight `read_stable()` settles on.
+#   * realtime: a session with gaps of up to 3 s between readings, longer than
+#     `ready_timeout`, replayed with `realtime=True` on the virtual clock. Every
+#     reading has to come back on its recorded time.
+#
+# Usage: python bench_recorder.py [readings]
+
+import os
+import sys
+import tempfile
+import time
+
+import fakes
+import fixtures
+
+clock = fakes.install()
+
+from hx711 import backends  # pylint: disable=wrong-import-position
+from hx711.hx711_pio import HX711_PIO  # pylint: disable=wrong-import-position
+from hx711.recorder import SessionRecorder, read_session  # pylint: disable=wrong-import-position
+from hx711.stability import StabilityDetector  # pylint: disable=wrong-import-position
+
+READINGS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+OFFSET = -81234
+SCALE = 395.513
+
+out_dir = tempfile.mkdtemp()
+counts, _ = fixtures.fixture("spool-drop")
+counts = (counts * (READINGS // len(counts) + 1))[:READINGS]
+
+
+def log_text(path):
+    with open(path, "w") as log_file:
+        for raw in counts:
+            log_file.write("Weighed: [{: 8.2f} g] [{: 8} raw] offset: {}, scale: {}\n".format(
+                (raw - OFFSET) / SCALE, raw, OFFSET, SCALE))
+            log_file.flush()
+    return READINGS
+
+
+def log_binary(path, flush_every):
+    with SessionRecorder(path, flush_every=flush_every) as recorder:
+        for i, raw in enumerate(counts):
+            recorder.record(raw, OFFSET, SCALE, i * 12)
+    return recorder.flushes
+
+
+print("{} readings".format(READINGS))
+print(" {:22} | {:>11} | {:>9} | {:>6}".format("logging", "us/reading", "bytes", "writes"))
+for name, log in (
+        ("text line + flush", log_text),
+        ("recorder, flush 1", lambda path: log_binary(path, 1)),
+        ("recorder, flush 8", lambda path: log_binary(path, 8)),
+        ("recorder, flush 64", lambda path: log_binary(path, 64))):
+    path = os.path.join(out_dir, "cost.log")
+    if os.path.exists(path):
+        os.remove(path)
+    start = time.perf_counter()
+    writes = log(path)
+    elapsed = time.perf_counter() - start
+    print(" {:22} | {:11.2f} | {:9} | {:6}".format(
+        name, elapsed / READINGS * 1000000, os.path.getsize(path), writes))
+
+print()
+print(" {:15} | {:>8} | {:>8} | {:>10} | {:>10} | {:>10} | {:>12}".format(
+    "fixture", "readings", "counts", "live g", "replay 1 g", "replay 2 g", "replay/s"))
+
+
+def settled(hx, readings):
+    """read_stable()'s weight from when the load lands, None if it never settles"""
+    for i in range(fixtures.STEP_AT):
+        hx.read_raw(clear_fifo=False)
+    try:
+        return round(hx.read_stable(max_count=readings - fixtures.STEP_AT), 3)
+    except RuntimeError:
+        return None
+
+
+for name in fixtures.FIXTURES:
+    path = os.path.join(out_dir, "{}.hxl".format(name))
+    fixture_counts = fixtures.fixture(name)[0]
+    cell = fakes.HX711Model(clock, sps=fixtures.SPS, counts=fixture_counts)
+    hx = HX711_PIO(cell, fakes.Pin("D24"), offset=OFFSET, scale=SCALE)
+
+    # Live: every conversion the load produces goes to the log as it's read
+    detector = StabilityDetector()
+    live = None
+    with SessionRecorder(path, flush_every=64) as recorder:
+        live_counts = []
+        for i in range(len(fixture_counts)):
+            raw = hx.read_raw(clear_fifo=False)
+            recorder.record_reading(hx, raw)
+            live_counts.append(raw)
+            if i >= fixtures.STEP_AT and detector.update(raw) and live is None:  # Weigh once the load lands
+                live = round(hx.to_weight(detector.mean), 3)
+
+    replays = []
+    for run in range(2):
+        replay = backends.create("replay", path=path)
+        start = time.perf_counter()
+        replayed = [replay.read_raw(clear_fifo=False) for i in range(len(fixture_counts))]
+        elapsed = time.perf_counter() - start
+        replay.rewind()
+        replays.append((replayed, settled(replay, len(fixture_counts))))
+
+    print(" {:15} | {:8} | {:>8} | {:>10} | {:>10} | {:>10} | {:12.0f}".format(
+        name, len(read_session(path)), "ok" if replays[0][0] == live_counts == replays[1][0] else "BAD",
+        str(live), str(replays[0][1]), str(replays[1][1]), len(fixture_counts) / elapsed))
+
+print()
+gaps_ms = [12, 13, 12, 1500, 13, 3000, 12, 13, 2500, 12]
+path = os.path.join(out_dir, "gaps.hxl")
+with SessionRecorder(path) as recorder:
+    t_ms = 1000
+    for i, gap in enumerate([0] + gaps_ms):
+        t_ms += gap
+        recorder.record(1000 + i, OFFSET, SCALE, t_ms=t_ms)
+replay = backends.create("replay", path=path, realtime=True)
+start = clock.now
+late = []
+try:
+    for i in range(len(gaps_ms) + 1):
+        replay.read_raw(clear_fifo=False)
+        due = sum(gaps_ms[:i]) / 1000
+        late.append(clock.now - start - due)
+    result = "ok" if max(late) < 0.005 else "BAD"
+except RuntimeError as error:
+    result = "BAD, {}".format(error)
+print("realtime replay, {} readings over {:.1f} s, gaps up to {:.1f} s: {}, worst {:.1f} ms late".format(
+    len(gaps_ms) + 1, sum(gaps_ms) / 1000, max(gaps_ms) / 1000, result, max(late or [0]) * 1000))
@@ -0,0 +1,84 @@
+# Channel A/B round-robin with HX711_PIO_Sched on the fake state machine
+#
+# Channel A carries the load cell, channel B a slow "temperature" signal. Each
+# source counts up in its own range so every usable reading can be checked for
+# the right channel, and against half-settled switch conversions sneaking in.
+#
+# Usage: python bench_sched.py [seconds] [a_count] [b_count] [discard]
+
+import sys
+
+import fakes
+
+clock = fakes.install()
+
+from hx711.hx711_pio_sched import HX711_PIO_Sched, CHANNEL_A_128, CHANNEL_B_32  # pylint: disable=wrong-import-position
+
+RUN_SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+A_COUNT = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+B_COUNT = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+DISCARD = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+SPS = 80
+POLL_EVERY = 0.030  # UI loop period, must stay under the 4-word RX FIFO (50 ms)
+
+A_BASE = 1000000
+B_BASE = -1000000
+
+cell = fakes.HX711ChannelModel(
+    clock, sps=SPS,
+    channel_a=(A_BASE + i for i in range(10000000)),
+    channel_b=(B_BASE - i for i in range(10000000)))
+
+hx = HX711_PIO_Sched(
+    cell, fakes.Pin("D24"),
+    schedule=((CHANNEL_A_128, A_COUNT), (CHANNEL_B_32, B_COUNT)),
+    discard=DISCARD)
+
+readings = []
+hx.on_reading = lambda channel, count: readings.append((channel, count))
+
+start = clock.now
+while clock.now - start < RUN_SECONDS:
+    clock.sleep(POLL_EVERY)
+    hx.poll()
+
+wrong_channel = 0
+unsettled = 0
+for channel, count in readings:
+    if (channel == CHANNEL_A_128) != (count >= A_BASE // 2):
+        wrong_channel += 1
+    elif not A_BASE // 2 < abs(count) < A_BASE * 2:
+        unsettled += 1
+
+usable_a = sum(1 for channel, _ in readings if channel == CHANNEL_A_128)
+usable_b = len(readings) - usable_a
+
+print("{:.0f} s at {} SPS, schedule A x{} / B x{}, discard {}".format(
+    RUN_SECONDS, SPS, A_COUNT, B_COUNT, DISCARD))
+print(" conversions:       {}".format(cell.conversions))
+print(" channel A usable:  {} ({:.1f} SPS)".format(usable_a, usable_a / RUN_SECONDS))
+print(" channel B usable:  {} ({:.1f} SPS)".format(usable_b, usable_b / RUN_SECONDS))
+print(" discarded:         {}".format(hx.discarded))
+print(" dropped (RX full): {}".format(hx._sm.dropped))  # pylint: disable=protected-access
+print(" wrong channel:     {}".format(wrong_channel))
+print(" half-settled kept: {}".format(unsettled))
+
+# Switching with the legacy driver's `channel` setter throws away a conversion
+# and blocks for it, and re-assembling the PIO program costs a restart on top
+switches = 2 * cell.conversions / (A_COUNT + B_COUNT + 2 * DISCARD)
+print(" legacy equivalent: ~{:.0f} extra blocked conversions for {:.0f} switches".format(
+    switches, switches))
+
+# A dead cell has to time out, not block in readinto() forever
+hx.power_off()
+t0 = clock.now
+try:
+    hx.read_raw()
+    print(" powered-off read:  returned")
+except RuntimeError as error:
+    print(" powered-off read:  {} after {:.2f} s".format(error, clock.now - t0))
+try:
+    hx.stream_start()
+    print(" stream_start():    started")
+except NotImplementedError as error:
+    print(" stream_start():    {}".format(error))
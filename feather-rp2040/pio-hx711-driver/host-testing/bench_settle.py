@@ -0,0 +1,60 @@
+# Time-to-stable benchmark: StabilityDetector vs. the fixed `read(50)` burst
+#
+# Replays the step-response fixtures through a fake HX711_PIO. The "weigh"
+# button is pressed the moment the load lands, then:
+#
+#   * fixed: `read_average(50)`, however settled the load happens to be
+#   * stable: `read_stable()`, returns as soon as the window settles
+#
+# Usage: python bench_settle.py [sps] [window] [tolerance]
+
+import sys
+
+import fakes
+import fixtures
+
+clock = fakes.install()
+
+from hx711.hx711_pio import HX711_PIO  # pylint: disable=wrong-import-position
+from hx711.stability import StabilityDetector  # pylint: disable=wrong-import-position
+
+SPS = int(sys.argv[1]) if len(sys.argv) > 1 else 80
+WINDOW = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+TOLERANCE = int(sys.argv[3]) if len(sys.argv) > 3 else 60
+FIXED_COUNT = 50
+
+
+def replay(counts):
+    cell = fakes.HX711Model(clock, sps=SPS, counts=counts)
+    hx = HX711_PIO(cell, fakes.Pin("D24"))
+    # Skip ahead to the moment the load lands, dropping the empty platform
+    clock.advance_to(clock.now + fixtures.STEP_AT / SPS)
+    hx.read_raw()
+    return hx
+
+
+print("{} SPS, window {}, tolerance {} counts".format(SPS, WINDOW, TOLERANCE))
+print(" {:15} | {:>9} | {:>9} | {:>9} | {:>9}".format(
+    "fixture", "fixed s", "fixed err", "stable s", "stable err"))
+
+for name in fixtures.FIXTURES:
+    counts, load = fixtures.fixture(name, SPS)
+
+    hx = replay(counts)
+    start = clock.now
+    fixed = hx.read_average(FIXED_COUNT)
+    fixed_time = clock.now - start
+
+    hx = replay(counts)
+    hx.stability = StabilityDetector(WINDOW, TOLERANCE)
+    start = clock.now
+    try:
+        stable = hx.read_stable()
+        stable_time = "{:9.3f}".format(clock.now - start)
+        stable_err = "{:9.0f}".format(stable - load)
+    except RuntimeError:
+        stable_time = "{:>9}".format("timeout")
+        stable_err = "{:>9}".format("-")
+
+    print(" {:15} | {:9.3f} | {:9.0f} | {} | {}".format(
+        name, fixed_time, fixed - load, stable_time, stable_err))
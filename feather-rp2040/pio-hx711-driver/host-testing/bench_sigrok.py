@@ -0,0 +1,83 @@
+# Frames per second: offline NumPy decoder vs. the pd.py state machine
+#
+# Synthesizes a capture of `frames` readouts at 80 SPS, then decodes it with
+#
+#   * offline: pulseview_decoder/offline.py on the packed samples in memory
+#   * offline .sr: the same, reading back a sigrok session file
+#   * pd.py: the sigrok decoder, stepped through `srd_fake`'s wait()
+#
+# and checks the ADC counts against what was synthesized. Annotation totals
+# per class are printed for both decoders.
+#
+# Usage: python bench_sigrok.py [frames] [samplerate MHz]
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import captures
+import srd_fake
+
+sys.path.insert(0, srd_fake.DECODER_ROOT)
+
+import offline  # pylint: disable=wrong-import-position
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+SAMPLERATE = int(float(sys.argv[2]) * 1000000) if len(sys.argv) > 2 else 24000000
+
+rng = random.Random(1)
+counts = [rng.randint(-0x800000, 0x7FFFFF) for i in range(FRAMES)]
+samples = captures.synthesize(counts, samplerate=SAMPLERATE)
+print("{} frames, {:.1f} s at {} MHz, {:.1f} M samples".format(
+    FRAMES, len(samples) / SAMPLERATE, SAMPLERATE / 1000000, len(samples) / 1000000))
+
+path = os.path.join(tempfile.mkdtemp(), "synthetic.sr")
+captures.write_sr(path, samples, SAMPLERATE)
+
+
+def chunked():
+    for start in range(0, len(samples), offline.CHUNK_SAMPLES):
+        yield samples[start:start + offline.CHUNK_SAMPLES]
+
+
+def tally(annotations):
+    totals = [0] * len(offline.ANNOTATIONS)
+    for annotation in annotations:
+        totals[annotation[2]] += 1
+    return totals
+
+
+def best_of(runs, decode):
+    best = None
+    for i in range(runs):
+        start = time.perf_counter()
+        result = decode()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+decoder = srd_fake.load_decoder()
+
+elapsed, frames = best_of(3, lambda: offline.decode(chunked(), SAMPLERATE))
+results = [("offline", elapsed, frames.count.tolist(), frames.annotations())]
+
+elapsed, frames = best_of(3, lambda: offline.decode_file(path))
+results.append(("offline .sr", elapsed, frames.count.tolist(), None))
+
+elapsed, annotations = best_of(3, lambda: srd_fake.run(decoder, samples, SAMPLERATE))
+pd_counts = [int(texts[0]) for s, e, cls, texts in annotations if cls == offline.ANN_COUNT]
+results.append(("pd.py", elapsed, pd_counts, annotations))
+
+print(" {:12} | {:>9} | {:>11} | {:>8} | {:>14}".format("decoder", "seconds", "frames/s", "frames", "counts match"))
+for name, elapsed, decoded, annotations in results:
+    print(" {:12} | {:9.3f} | {:11.0f} | {:8} | {:>14}".format(
+        name, elapsed, len(decoded) / elapsed, len(decoded), str(decoded == counts)))
+
+print()
+print(" {:12} | {}".format("annotations", " ".join("{:>9}".format(name) for name, desc in offline.ANNOTATIONS)))
+for name, elapsed, decoded, annotations in results:
+    if annotations is not None:
+        print(" {:12} | {}".format(name, " ".join("{:9}".format(total) for total in tally(annotations))))
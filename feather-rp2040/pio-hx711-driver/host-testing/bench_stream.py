@@ -0,0 +1,88 @@
+# Streaming vs. blocking HX711_PIO acquisition, run on a Linux host
+#
+# A UI loop spends `ui_work` seconds per iteration on other things (display,
+# keys, etc.) then collects readings. Compares blocking `read_average()` bursts
+# against the free-running `stream_start()` ring.
+#
+# Usage: python bench_stream.py [seconds] [sps]
+
+import sys
+import time
+import array
+import random
+
+import fakes
+
+clock = fakes.install()
+
+from hx711.hx711_pio import HX711_PIO  # pylint: disable=wrong-import-position
+
+RUN_SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+SPS = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+UI_WORK = (0.010, 0.050, 0.090, 0.200)
+
+
+def noisy_counts(seed=711):
+    rng = random.Random(seed)
+    while True:
+        yield 120000 + int(rng.gauss(0, 40))
+
+
+def new_driver():
+    cell = fakes.HX711Model(clock, sps=SPS, counts=noisy_counts())
+    hx = HX711_PIO(cell, fakes.Pin("D24"))
+    return cell, hx
+
+
+def run_blocking(ui_work):
+    cell, hx = new_driver()
+    start = clock.now
+    conversions_start = cell.conversions
+    consumed = 0
+    blocked = 0.0
+    cpu = time.perf_counter()
+    while clock.now - start < RUN_SECONDS:
+        clock.sleep(ui_work)
+        t0 = clock.now
+        hx.read_average(10)
+        blocked += clock.now - t0
+        consumed += 10
+    cpu = time.perf_counter() - cpu
+    return consumed, cell.conversions - conversions_start, blocked, 0, cpu
+
+
+def run_streaming(ui_work):
+    cell, hx = new_driver()
+    buf = array.array("I", [0] * 64)
+    hx.stream_start(64)
+    start = clock.now
+    conversions_start = cell.conversions
+    consumed = 0
+    blocked = 0.0
+    cpu = time.perf_counter()
+    while clock.now - start < RUN_SECONDS:
+        clock.sleep(ui_work)
+        t0 = clock.now
+        consumed += hx.read_into(buf)
+        blocked += clock.now - t0
+    cpu = time.perf_counter() - cpu
+    return consumed, cell.conversions - conversions_start, blocked, hx.stream_overflows, cpu
+
+
+print("HX711_PIO acquisition, {:.0f} s at {} SPS".format(RUN_SECONDS, SPS))
+print(" {:9} | {:7} | {:>8} | {:>8} | {:>7} | {:>9} | {:>9} | {:>10}".format(
+    "mode", "ui (ms)", "samples", "dropped", "eff SPS", "blocked s", "overflows", "us/sample"))
+
+for ui_work in UI_WORK:
+    for name, runner in (("blocking", run_blocking), ("streaming", run_streaming)):
+        consumed, conversions, blocked, overflows, cpu = runner(ui_work)
+        print(" {:9} | {:7.0f} | {:8d} | {:8d} | {:7.1f} | {:9.2f} | {:9d} | {:10.1f}".format(
+            name,
+            ui_work * 1000,
+            consumed,
+            conversions - consumed,
+            consumed / RUN_SECONDS,
+            blocked,
+            overflows,
+            cpu * 1000000 / max(consumed, 1),
+        ))
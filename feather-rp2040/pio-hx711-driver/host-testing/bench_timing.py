@@ -0,0 +1,89 @@
+# Timing conformance of hx711_read_code across candidate PIO frequencies
+#
+# For each `pio_freq`, `captures.PioTiming` reads the SCK timing off the
+# program text and checks it against the HX711 datasheet:
+#
+#   * T1: DOUT falling to the first SCK rise, >= 0.1 us
+#   * T2: SCK rise to DOUT valid, <= 0.1 us, so `in` must sample later than that
+#   * T3: SCK high, 0.2 - 50 us, and under 60 us or the chip powers down
+#   * T4: SCK low, >= 0.2 us
+#
+# then `captures.session()` plays a PIO master at that timing against a
+# simulated HX711, powering it down halfway through, and checks the counts
+# the PIO sampled, and what pd.py and offline.py decode from the capture,
+# against what went onto the wire.
+#
+# Usage: python bench_timing.py [sps] [gain pulses] [samplerate MHz]
+
+import random
+import sys
+
+import captures
+import fakes
+import srd_fake
+
+fakes.install()
+sys.path.insert(0, srd_fake.DECODER_ROOT)
+
+import offline  # pylint: disable=wrong-import-position
+from hx711.hx711_pio import hx711_read_code  # pylint: disable=wrong-import-position
+
+SPS = int(sys.argv[1]) if len(sys.argv) > 1 else 80
+GAIN = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+SAMPLERATE = int(float(sys.argv[3]) * 1000000) if len(sys.argv) > 3 else 100000000
+FRAMES = 12
+
+FREQS = (
+    50000, 100000, 250000, 500000, 1000000, 2000000, 4000000, 5000000,
+    8000000, 10000000, 12500000, 20000000, 25000000, 62500000, 125000000)
+
+code = hx711_read_code.format(GAIN - 1, 23)
+rng = random.Random(3)
+counts = [rng.randint(-0x800000, 0x7FFFFF) for i in range(FRAMES)]
+decoder = srd_fake.load_decoder()
+
+
+def pd_result(samples, wire):
+    try:
+        annotations = srd_fake.run(decoder, samples, SAMPLERATE)
+    except RuntimeError:  # pd.py gives up on a clock stuck high mid-frame
+        return "err"
+    return "ok" if [int(texts[0]) for start, end, cls, texts in annotations if cls == offline.ANN_COUNT] == wire else "BAD"
+
+
+def us(seconds):
+    return "{:.3f}".format(seconds * 1000000)
+
+
+timing = captures.PioTiming(code, 1)
+print("hx711_read_code, gain pulses {}: wait->rise {} cycles, bit {}+{} (in at +{}), gain {}+{}".format(
+    GAIN, timing.latency, timing.bit_high, timing.bit_low, timing.bit_sample,
+    timing.gain_high, timing.gain_low))
+print("{} SPS, {} frames per run, {} MHz capture, power-down after frame {}".format(
+    SPS, FRAMES, SAMPLERATE / 1000000, FRAMES // 2))
+print()
+print(" {:>9} | {:>7} | {:>7} | {:>15} | {:>7} | {:>8} | {:18} | {:>5} | {:>5} | {:>7}".format(
+    "pio_freq", "T1 us", "T2 us", "T3 us", "T4 us", "frame us", "datasheet", "pio", "pd.py", "offline"))
+
+for freq in FREQS:
+    timing = captures.PioTiming(code, freq, GAIN)
+    t3_min, t3_max = timing.t3()
+    broken = timing.violations()
+
+    if timing.frame_s > 1 / SPS:
+        results = ["-", "-", "-"]
+        broken.append("frame > period")
+    else:
+        samples, wire, read = captures.session(
+            counts, timing, samplerate=SAMPLERATE, sps=SPS, rate_error=0.01,
+            jitter=0.00001, sleep_after=FRAMES // 2)
+        results = ["ok" if read == counts else "BAD"]
+        if min(t3_min, timing.t4()) * SAMPLERATE < 2:  # Logic analyzer can't resolve the pulses
+            results += ["-", "-"]
+        else:
+            results.append(pd_result(samples, wire))
+            results.append("ok" if offline.decode([samples], SAMPLERATE).count.tolist() == wire else "BAD")
+
+    print(" {:>9} | {:>7} | {:>7} | {:>7}-{:>7} | {:>7} | {:>8} | {:18} | {:>5} | {:>5} | {:>7}".format(
+        freq, us(timing.t1()), us(timing.sample_delay()), us(t3_min), us(t3_max), us(timing.t4()),
+        "{:.0f}".format(timing.frame_s * 1000000), ", ".join(broken) or "ok", *results))
@@ -0,0 +1,315 @@
+"""
+Synthetic HX711 logic captures, packed the way a logic analyzer stores them:
+one sample per byte, DOUT in bit 0 and SCK in bit 1 (sigrok's probe1/probe2
+in the captures under `research/`).
+
+    samples = captures.synthesize([1000, -2000, 3000], samplerate=24000000)
+    captures.write_sr("synthetic.sr", samples, 24000000)
+
+Timing defaults follow `hx711_read_code` at the default 4 MHz `pio_freq`:
+SCK high for 4 cycles, low for 2 + the `in`/`jmp` pair, first clock one
+cycle after DOUT falls.
+
+`session()` goes further and plays both ends of the wire: `PioTiming` clocks
+frames the way a PIO program would at a given `pio_freq`, read off the
+program text, and a simulated HX711 answers with conversions at `sps`, its
+DOUT lagging SCK by the datasheet maximum and powering down whenever SCK
+stays high past 60 us. `PioTiming.violations()` checks the program against
+the datasheet's pulse-width limits.
+
+    timing = captures.PioTiming(hx711_read_code.format(0, 23), 4000000)
+    samples, wire, read = captures.session(counts, timing, samplerate=100000000)
+"""
+
+import random
+import zipfile
+
+import numpy
+
+DOUT_BIT = 0
+SCK_BIT = 1
+
+# HX711 datasheet timing, in seconds
+HX_T1_MIN = 0.0000001  # DOUT falling to the first SCK rising edge
+HX_T2_MAX = 0.0000001  # SCK rising edge to DOUT valid
+HX_T3_MIN = 0.0000002  # SCK high
+HX_T3_MAX = 0.00005
+HX_T4_MIN = 0.0000002  # SCK low
+HX_POWER_DOWN_S = 0.00006  # SCK high this long powers the chip down
+HX_SETTLE_CONVERSIONS = 4  # Conversion periods from wake to the first DOUT fall
+
+PIO_SYNC_S = 2 / 125000000  # GPIO input synchronizer, two 125 MHz system clocks
+
+
+def frame_edges(
+        count: int, gain_pulses: int, ready: float, sck_high: float, sck_low: float, latency: float,
+        jitter: float = 0.0, rng: random.Random = None):
+    """Edge times of one readout as ([(t, dout)], [(t, sck)]). With `jitter`,
+    every SCK high and low time is off by up to +/- that many seconds."""
+    value = count & 0xFFFFFF
+    dout = [(ready, 0)]
+    sck = []
+    t = ready + latency
+    for pulse in range(24 + gain_pulses):
+        sck.append((t, 1))
+        if pulse < 24:
+            dout.append((t, (value >> (23 - pulse)) & 1))  # Shifted out on the rising edge
+        elif pulse == 24:
+            dout.append((t, 1))  # 25th pulse pulls DOUT high until the next conversion
+        t += sck_high + (rng.uniform(-jitter, jitter) if jitter else 0)
+        sck.append((t, 0))
+        t += sck_low + (rng.uniform(-jitter, jitter) if jitter else 0)
+    return dout, sck
+
+
+def levels(edges: list, length: int, initial: int) -> numpy.ndarray:
+    """Sample array from (sample index, level) edges, in order"""
+    out = numpy.empty(length, dtype=numpy.uint8)
+    position, level = 0, initial
+    for index, new_level in edges:
+        index = min(max(index, position), length)
+        out[position:index] = level
+        position, level = index, new_level
+    out[position:] = level
+    return out
+
+
+def synthesize(
+    counts,
+    samplerate: int = 24000000,
+    sps: int = 80,
+    gain_pulses: int = 1,
+    sck_high: float = 0.000001,
+    sck_low: float = 0.000001,
+    latency: float = 0.00000025,
+    lead: float = 0.0001,
+    jitter: float = 0.0,
+    seed: int = 1,
+) -> numpy.ndarray:
+    """Packed samples for one readout per conversion of `counts`, every 1/sps s"""
+    rng = random.Random(seed)
+    dout_edges, sck_edges = [], []
+    ready = lead
+    for count in counts:
+        dout, sck = frame_edges(count, gain_pulses, ready, sck_high, sck_low, latency, jitter, rng)
+        dout_edges += dout
+        sck_edges += sck
+        ready += 1 / sps
+
+    length = int((ready - 1 / sps + lead) * samplerate) + int(samplerate * (24 + gain_pulses) * (sck_high + sck_low))
+    dout = levels([(int(t * samplerate), v) for t, v in dout_edges], length, 1)
+    sck = levels([(int(t * samplerate), v) for t, v in sck_edges], length, 0)
+    return dout << DOUT_BIT | sck << SCK_BIT
+
+
+def program_cycles(code: str) -> list:
+    """(instruction, cycles) for each instruction of a PIO program, with
+    comments and labels dropped and operands normalized to "set pins 1" """
+    program = []
+    for line in code.splitlines():
+        line = line.split(";")[0].strip()
+        if not line or line.endswith(":"):
+            continue
+        delay = 0
+        if line.endswith("]"):
+            line, delay = line[:-1].split("[")
+            delay = int(delay)
+        program.append((" ".join(line.replace(",", " ").split()), 1 + delay))
+    return program
+
+
+def _clock_loop(program: list, start: int) -> tuple:
+    """High cycles, low cycles and the cycle after the rise `in` samples on
+    (None if it doesn't) of the SCK loop whose `set pins 1` is at `program[start]`"""
+    high = low = 0
+    sample = None
+    i = start
+    while program[i][0] != "set pins 0":
+        high += program[i][1]
+        i += 1
+    while True:
+        op, cycles = program[i]
+        if op.startswith("in "):
+            sample = high + low
+        low += cycles
+        i += 1
+        if op.startswith("jmp"):
+            return high, low, sample
+
+
+class PioTiming:
+    """SCK timing of an HX711 readout program at `pio_freq`: cycles from
+    `wait` to the first rising edge, then the high and low times of the bit
+    and gain loops and where in the bit loop `in` samples DOUT. Needs a
+    `wait`, then a bit loop and a gain loop each opened by `set pins, 1`."""
+
+    def __init__(self, code: str, pio_freq: int, gain_pulses: int = 1):
+        program = program_cycles(code)
+        ops = [op for op, cycles in program]
+        wait = [i for i, op in enumerate(ops) if op.startswith("wait ")][0]
+        rises = [i for i, op in enumerate(ops) if op == "set pins 1" and i > wait]
+
+        self.pio_freq = pio_freq
+        self.cycle = 1 / pio_freq
+        self.gain_pulses = gain_pulses
+        self.latency = sum(cycles for op, cycles in program[wait:rises[0]])
+        self.bit_high, self.bit_low, self.bit_sample = _clock_loop(program, rises[0])
+        self.gain_high, self.gain_low, _ = _clock_loop(program, rises[1])
+
+    @property
+    def frame_cycles(self) -> int:
+        return self.latency + 24 * (self.bit_high + self.bit_low) + self.gain_pulses * (self.gain_high + self.gain_low)
+
+    @property
+    def frame_s(self) -> float:
+        return self.frame_cycles * self.cycle
+
+    def t1(self) -> float:
+        """Shortest DOUT fall to SCK rise, the wait seeing DOUT right on a cycle edge"""
+        return PIO_SYNC_S + self.latency * self.cycle
+
+    def t3(self) -> tuple:
+        return min(self.bit_high, self.gain_high) * self.cycle, max(self.bit_high, self.gain_high) * self.cycle
+
+    def t4(self) -> float:
+        """Shortest SCK low. The gain loop's only counts between gain pulses,
+        after the last one SCK stays low until the next conversion."""
+        if self.gain_pulses > 1:
+            return min(self.bit_low, self.gain_low) * self.cycle
+        return self.bit_low * self.cycle
+
+    def sample_delay(self) -> float:
+        """SCK rise to the DOUT level `in` sees, through the input synchronizer"""
+        return self.bit_sample * self.cycle - PIO_SYNC_S
+
+    def violations(self) -> list:
+        """Datasheet limits this timing breaks, as short descriptions"""
+        broken = []
+        t3_min, t3_max = self.t3()
+        if self.t1() < HX_T1_MIN:
+            broken.append("T1")
+        if self.sample_delay() < HX_T2_MAX:
+            broken.append("T2")
+        if t3_min < HX_T3_MIN:
+            broken.append("T3 min")
+        if t3_max > HX_T3_MAX:
+            broken.append("T3 max")
+        if t3_max > HX_POWER_DOWN_S:
+            broken.append("power-down")
+        if self.t4() < HX_T4_MIN:
+            broken.append("T4")
+        return broken
+
+    def frame(self, ready: float, rng: random.Random = None) -> tuple:
+        """SCK pulses [(rise, fall)] and the times `in` samples DOUT for a
+        readout of a conversion that pulls DOUT low at `ready`. With `rng`,
+        the wait lands anywhere in the cycle DOUT is seen in."""
+        cycle = self.cycle
+        t = ready + PIO_SYNC_S + (rng.uniform(0, cycle) if rng else 0) + self.latency * cycle
+        pulses, samples = [], []
+        for pulse in range(24):
+            pulses.append((t, t + self.bit_high * cycle))
+            samples.append(t + self.bit_sample * cycle - PIO_SYNC_S)
+            t += (self.bit_high + self.bit_low) * cycle
+        for pulse in range(self.gain_pulses):
+            pulses.append((t, t + self.gain_high * cycle))
+            t += (self.gain_high + self.gain_low) * cycle
+        return pulses, samples
+
+
+def _level_at(edges: list, t: float, initial: int) -> int:
+    level = initial
+    for when, new_level in edges:
+        if when > t:
+            break
+        level = new_level
+    return level
+
+
+def _signed(word: int) -> int:
+    return word - 0x1000000 if word & 0x800000 else word
+
+
+def session(
+    counts,
+    timing: PioTiming,
+    samplerate: int = 24000000,
+    sps: int = 80,
+    rate_error: float = 0.0,
+    jitter: float = 0.0,
+    sleep_after: int = None,
+    sleep_s: float = 0.001,
+    lead: float = 0.0001,
+    seed: int = 1,
+) -> tuple:
+    """A PIO master clocking `counts` out of a simulated HX711, as
+    (samples, wire, read): the packed capture, the signed count DOUT actually
+    carried in each frame and the count the PIO sampled from it.
+
+    The chip converts every (1 + rate_error) / sps s, each conversion up to
+    `jitter` s early or late, and changes DOUT `HX_T2_MAX` after each SCK
+    rise. SCK high for `HX_POWER_DOWN_S` powers it down with DOUT high for
+    the rest of the frame; it wakes when SCK falls and settles for
+    `HX_SETTLE_CONVERSIONS` periods. `sleep_after` powers it down on purpose
+    for `sleep_s` after that frame, the way `HX711.power_off()` does."""
+    rng = random.Random(seed)
+    period = (1 + rate_error) / sps
+    dout_edges, sck_edges = [], []
+    wire, read = [], []
+    base, conversion, free = lead, 0, 0.0
+
+    for index, count in enumerate(counts):
+        ready = base + conversion * period + (rng.uniform(-jitter, jitter) if jitter else 0)
+        while ready < free:  # Still busy with the last frame, that conversion is missed
+            conversion += 1
+            ready = base + conversion * period
+        pulses, sample_times = timing.frame(ready, rng)
+
+        frame = [(ready, 0)]
+        value = count & 0xFFFFFF
+        asleep = False
+        for pulse, (rise, fall) in enumerate(pulses):
+            if not asleep:
+                level = (value >> (23 - pulse)) & 1 if pulse < 24 else 1
+                frame.append((rise + HX_T2_MAX, level))
+                if fall - rise >= HX_POWER_DOWN_S:
+                    frame.append((rise + HX_POWER_DOWN_S, 1))
+                    asleep = True
+            sck_edges += [(rise, 1), (fall, 0)]
+
+        wire_word = pio_word = 0
+        for pulse in range(24):
+            rise = pulses[pulse][0]
+            wire_word = wire_word << 1 | _level_at(frame, rise + HX_T2_MAX, 1)
+            pio_word = pio_word << 1 | _level_at(frame, sample_times[pulse], 1)
+        wire.append(_signed(wire_word))
+        read.append(_signed(pio_word))
+        dout_edges += frame
+        free = pulses[-1][1]
+
+        if sleep_after == index:
+            start = free + timing.cycle
+            sck_edges += [(start, 1), (start + sleep_s, 0)]
+            asleep, free = True, start + sleep_s
+        if asleep:  # Wakes on SCK falling, reset to A128 and settling
+            base, conversion = free, HX_SETTLE_CONVERSIONS
+        else:
+            conversion += 1
+
+    length = int((free + lead) * samplerate)
+    dout = levels([(int(t * samplerate), v) for t, v in dout_edges], length, 1)
+    sck = levels([(int(t * samplerate), v) for t, v in sck_edges], length, 0)
+    return dout << DOUT_BIT | sck << SCK_BIT, wire, read
+
+
+def write_sr(path: str, samples: numpy.ndarray, samplerate: int, chunk: int = 4 * 1024 * 1024) -> None:
+    """Write packed samples as a sigrok session file PulseView can open"""
+    metadata = (
+        "[global]\nsigrok version=0.5.2\n\n[device 1]\ncapturefile=logic-1\ntotal probes=8\n"
+        "samplerate={} Hz\ntotal analog=0\nprobe1=DOUT\nprobe2=SCK\nunitsize=1\n".format(samplerate))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as session:
+        session.writestr("version", "2")
+        session.writestr("metadata", metadata)
+        for number, start in enumerate(range(0, len(samples), chunk)):
+            session.writestr("logic-1-{}".format(number + 1), samples[start:start + chunk].tobytes())
+
@@ -0,0 +1,90 @@
+# Regression check for both capture decoders on synthetic waveforms
+#
+# Every case is synthesized with `captures.synthesize()`, decoded by pd.py
+# (through srd_fake) and by offline.py, and each frame's ADC count, gain
+# pulses, mean bit length and bit-length jitter are checked against what went
+# into the waveform. Exits non-zero if anything is off.
+#
+# Usage: python check_decoders.py [samplerate MHz]
+
+import random
+import sys
+
+import captures
+import srd_fake
+
+sys.path.insert(0, srd_fake.DECODER_ROOT)
+
+import offline  # pylint: disable=wrong-import-position
+
+SAMPLERATE = int(float(sys.argv[1]) * 1000000) if len(sys.argv) > 1 else 24000000
+EXTREMES = [0, -1, 1, 0x7FFFFF, -0x800000, 0x555555, -0x2AAAAB]
+
+
+def pio_timing(pio_freq):
+    """SCK high/low for hx711_read_code's bit loop: `set pins, 1 [3]` high,
+    `set pins, 0 [1]` + `in` + `jmp` low"""
+    return 4 / pio_freq, 4 / pio_freq
+
+
+CASES = [
+    # name, gain pulses, sck high, sck low, jitter
+    ("pio 4 MHz, A128", 1) + pio_timing(4000000) + (0,),
+    ("pio 4 MHz, B32", 2) + pio_timing(4000000) + (0,),
+    ("pio 4 MHz, A64", 3) + pio_timing(4000000) + (0,),
+    ("pio 1 MHz", 1) + pio_timing(1000000) + (0,),
+    ("pio 2.5 MHz", 1) + pio_timing(2500000) + (0,),
+    ("bit-bang, jittery", 1, 0.00001, 0.00004, 0.000005),
+    ("bit-bang, A64", 3, 0.000009, 0.00003, 0.000002),
+]
+
+
+def pd_frames(samples):
+    """(count, gain, jitter) per frame from pd.py's annotations"""
+    counts, gains, jitters = [], [], []
+    for start, end, cls, texts in srd_fake.run(decoder, samples, SAMPLERATE):
+        if cls == offline.ANN_COUNT:
+            counts.append(int(texts[0]))
+        elif cls == offline.ANN_GAIN:
+            gains.append(int(texts[0]))
+        elif cls == offline.ANN_JITTER:
+            jitters.append(int(texts[1].split()[1]))
+    return counts, gains, jitters
+
+
+def offline_frames(samples):
+    frames = offline.decode([samples], SAMPLERATE)
+    return frames.count.tolist(), frames.gain.tolist(), frames.jitter.tolist()
+
+
+decoder = srd_fake.load_decoder()
+rng = random.Random(7)
+failures = 0
+
+print("{} MHz sampling".format(SAMPLERATE / 1000000))
+print(" {:20} | {:8} | {:>6} | {:>5} | {:>6} | {:>10} | {}".format(
+    "case", "decoder", "frames", "gain", "counts", "jitter max", "result"))
+
+for name, gain, high, low, jitter in CASES:
+    counts = EXTREMES + [rng.randint(-0x800000, 0x7FFFFF) for i in range(13)]
+    samples = captures.synthesize(
+        counts, samplerate=SAMPLERATE, gain_pulses=gain, sck_high=high, sck_low=low, jitter=jitter)
+    # Each edge lands up to a sample early, and jitter moves each by up to `jitter`
+    jitter_limit = int(4 * jitter * SAMPLERATE) + 2
+
+    for label, decode in (("pd.py", pd_frames), ("offline", offline_frames)):
+        decoded, gains, jitters = decode(samples)
+        problems = []
+        if decoded != counts:
+            problems.append("counts")
+        if gains != [gain] * len(counts):
+            problems.append("gain")
+        if len(jitters) != len(counts) or max(jitters) > jitter_limit:
+            problems.append("jitter")
+        failures += bool(problems)
+        print(" {:20} | {:8} | {:6} | {:>5} | {:>6} | {:>10} | {}".format(
+            name, label, len(decoded), "ok" if "gain" not in problems else "BAD",
+            "ok" if "counts" not in problems else "BAD", max(jitters) if jitters else "-",
+            "FAIL " + ", ".join(problems) if problems else "pass"))
+
+sys.exit(1 if failures else 0)
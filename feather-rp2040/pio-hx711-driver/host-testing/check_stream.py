@@ -0,0 +1,85 @@
+# Regression check for HX711_PIO's streaming mode on the fake state machine
+#
+#   * read_average() while streaming waits for the ring to fill and averages it
+#   * asking for more samples than the ring holds is a ValueError up front
+#   * a cell that stops converting times out with RuntimeError after
+#     `ready_timeout`, rather than spinning forever
+#   * read_into() and read_raw() still see every conversion, in order
+#
+# Exits non-zero if anything is off.
+#
+# Usage: python check_stream.py [sps]
+
+import array
+import sys
+
+import fakes
+
+clock = fakes.install()
+
+from hx711.decode import decode_word  # pylint: disable=wrong-import-position
+from hx711.hx711_pio import HX711_PIO  # pylint: disable=wrong-import-position
+
+SPS = int(sys.argv[1]) if len(sys.argv) > 1 else 80
+RING = 16
+
+failures = 0
+
+
+def check(name, ok, detail=""):
+    global failures  # pylint: disable=global-statement
+    failures += not ok
+    print(" {:44} | {:>4} | {}".format(name, "ok" if ok else "BAD", detail))
+
+
+def new_driver(counts):
+    cell = fakes.HX711Model(clock, sps=SPS, counts=counts)
+    hx = HX711_PIO(cell, fakes.Pin("D24"))
+    hx.stream_start(RING)
+    return cell, hx
+
+
+print("HX711_PIO streaming, {} SPS, {} word ring".format(SPS, RING))
+
+for count in (1, 8, RING):
+    cell, hx = new_driver(range(1000, 1000 + 10 * 200, 10))
+    hx.discard_pending()
+    first = cell.conversions + 1
+    t0 = clock.now
+    average = hx.read_average(count)
+    expected = sum(1000 + 10 * (first + i - 1) for i in range(count)) // count
+    waited = clock.now - t0
+    check("read_average({}) from an empty ring".format(count), average == expected,
+          "{} (expected {}), waited {:.1f} ms".format(average, expected, waited * 1000))
+
+cell, hx = new_driver(iter(lambda: 500, None))
+try:
+    hx.read_average(RING + 1)
+    check("read_average() past the ring size", False, "returned")
+except ValueError as error:
+    check("read_average() past the ring size", True, "ValueError: {}".format(error))
+
+cell, hx = new_driver(iter(lambda: 500, None))
+hx.read_average(4)
+hx.power_off()
+t0 = clock.now
+try:
+    hx.read_average(8)
+    check("read_average() on a dead cell", False, "returned")
+except RuntimeError as error:
+    waited = clock.now - t0
+    check("read_average() on a dead cell", abs(waited - hx.ready_timeout) < 0.1,
+          "RuntimeError after {:.2f} s".format(waited))
+
+cell, hx = new_driver(range(0, 100000, 3))
+buf = array.array('I', [0] * RING)
+seen = []
+while len(seen) < 200:
+    clock.sleep(0.05)
+    got = hx.read_into(buf)
+    seen.extend(decode_word(word) for word in buf[:got])
+seen.append(hx.read_raw(clear_fifo=False))
+check("read_into() then read_raw() keep order", all(b - a == 3 for a, b in zip(seen, seen[1:])),
+      "{} conversions".format(len(seen)))
+
+sys.exit(1 if failures else 0)
@@ -0,0 +1,513 @@
+"""
+Host-side stand-ins for the CircuitPython modules the `hx711` package imports,
+so the driver can be exercised and benchmarked under CPython on a Linux box.
+
+Everything runs on a `VirtualClock`, so results are deterministic and a minute
+of 80 SPS sampling replays in a fraction of a second.
+
+    import fakes
+    clock = fakes.install()
+
+    from hx711.hx711_pio import HX711_PIO
+
+    cell = fakes.HX711Model(clock, sps=80, counts=my_recorded_counts)
+    hx = HX711_PIO(cell, fakes.Pin("D24"))
+"""
+
+import os
+import sys
+import types
+import array
+import asyncio
+import selectors
+
+DRIVER_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HX_PAD_BITS = 0xFF000000  # DOUT idles high while the PIO program clocks in its pad bits
+HX_RX_FIFO_DEPTH = 8
+HX_POWER_DOWN_S = 0.00006  # SCK high this long powers the chip down
+HX_SETTLE_CONVERSIONS = 4  # Conversion periods from reset to the first DOUT fall
+
+DRIVER_MODULES = ("hx711", "hx711.hx711_gpio", "hx711.hx711_pio", "hx711.hx711_pio_multi", "hx711.hx711_pio_sched",
+                  "hx711.hx711_sim", "hx711.duty", "hx711.recorder", "hx711.hx711_replay")
+
+
+class VirtualClock:
+    """Each read of the clock costs `tick` seconds, roughly a CircuitPython
+    `time.monotonic()` call, so loops spinning on the clock still move it along"""
+
+    def __init__(self, start: float = 0.0, tick: float = 0.000002):
+        self.now = start
+        self.tick = tick
+
+    def monotonic(self) -> float:
+        self.now += self.tick
+        return self.now
+
+    def monotonic_ns(self) -> int:
+        self.now += self.tick
+        return int(self.now * 1000000000)
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+    def advance_to(self, when: float) -> None:
+        if when > self.now:
+            self.now = when
+
+    def patch(self, module) -> None:
+        """Point a driver module's `time` at this clock"""
+        module.time = types.SimpleNamespace(
+            monotonic=self.monotonic, monotonic_ns=self.monotonic_ns, sleep=self.sleep)
+
+
+class _VirtualSelector(selectors.SelectSelector):
+    """Instead of blocking for I/O, jumps the clock ahead to the next timer"""
+
+    def __init__(self, clock: VirtualClock, step: float):
+        super().__init__()
+        self.clock = clock
+        self.step = step
+
+    def select(self, timeout=None):
+        # Every loop pass costs `step`, so busy tasks can't freeze virtual time
+        self.clock.now += max(timeout or 0, self.step)
+        return []
+
+
+def event_loop(clock: VirtualClock, step: float = 0.00005) -> asyncio.AbstractEventLoop:
+    """asyncio loop running on the virtual clock, each pass through it costing
+    `step` seconds, roughly a CircuitPython asyncio task switch"""
+    loop = asyncio.SelectorEventLoop(_VirtualSelector(clock, step))
+    loop.time = clock.monotonic
+    return loop
+
+
+class Pin:
+    """A `board` pin, and `DigitalInOut` on one when the driver wraps it"""
+
+    value = False
+
+    def __init__(self, name: str = "D0"):
+        self.name = name
+
+    def __repr__(self):
+        return "board.{}".format(self.name)
+
+    def switch_to_output(self, value: bool = False, drive_mode=None) -> None:
+        self.value = value
+
+    def switch_to_input(self, pull=None) -> None:
+        pass
+
+    def deinit(self) -> None:
+        pass
+
+
+class HX711Model(Pin):
+    """Free-running HX711 that finishes a conversion every 1/sps seconds.
+
+    Pass it where the driver expects the data pin. `counts` is any iterable of
+    signed 24-bit readings (a recorded capture, a generator...), the last value
+    is held once it runs out.
+
+    SCK held high for 60 us powers it down. Once SCK falls again the first
+    conversion takes HX711_SETTLE_CONVERSIONS periods, and is `wake_error`
+    counts off while the output settles. `asleep_s` and `wakes` tally it up."""
+
+    def __init__(self, clock: VirtualClock, sps: int = 80, counts=None, name: str = "D25", wake_error: int = 5000):
+        super().__init__(name)
+        self.clock = clock
+        self.sps = sps
+        self.period = 1 / sps
+        self._counts = iter(counts) if counts is not None else None
+        self._next = clock.now + self.period
+        self.conversions = 0
+        self.last_count = 0
+        self.wake_error = wake_error
+        self.started = clock.now
+        self.asleep_s = 0.0
+        self.wakes = 0
+        self.unsettled = 0  # Conversions still to come out `wake_error` off
+        self._sck_high_since = None
+
+    def asleep(self) -> bool:
+        since = self._sck_high_since
+        return since is not None and self.clock.now - since >= HX_POWER_DOWN_S
+
+    def sck_level(self, high: bool) -> None:
+        """SCK as the power-down logic sees it"""
+        now = self.clock.now
+        if high:
+            if self._sck_high_since is None:
+                self._sck_high_since = now
+            return
+
+        if self.asleep():
+            self.asleep_s += now - self._sck_high_since - HX_POWER_DOWN_S
+            self.wakes += 1
+            self._wake()
+        self._sck_high_since = None
+
+    def _wake(self) -> None:
+        self._next = self.clock.now + HX_SETTLE_CONVERSIONS * self.period
+        self.unsettled = 1
+
+    def awake_s(self) -> float:
+        asleep = self.asleep_s
+        if self.asleep():
+            asleep += self.clock.now - self._sck_high_since - HX_POWER_DOWN_S
+        return self.clock.now - self.started - asleep
+
+    def next_ready(self) -> float:
+        if self.asleep():
+            return float("inf")
+        return self._next
+
+    def convert(self) -> int:
+        """Complete the pending conversion and return its signed count"""
+        self._next += self.period
+        self.conversions += 1
+        if self._counts is not None:
+            self.last_count = next(self._counts, self.last_count)
+        if self.unsettled:
+            self.unsettled -= 1
+            return self._unsettled(self.last_count)
+        return self.last_count
+
+    def _unsettled(self, count):
+        return count + self.wake_error
+
+    @staticmethod
+    def word(count: int) -> int:
+        """The padded 32-bit word `hx711_read_code` autopushes for a count"""
+        return HX_PAD_BITS | (count & 0xFFFFFF)
+
+    frame_size = 1
+
+    def frame_words(self, sm=None) -> list:
+        """Complete the pending conversion, returns the words the SM pushes for it"""
+        return [self.word(self.convert())]
+
+
+class HX711GPIOModel(HX711Model):
+    """HX711 DOUT/SCK pin behaviour for the bit-banged `HX711_GPIO` driver.
+
+    DOUT falls when a conversion is ready, each SCK rising edge shifts out the
+    next bit, MSB first, and the 25th takes DOUT high again. Every pin access
+    advances the clock by `access_cost` seconds, roughly what a `DigitalInOut`
+    attribute access costs in CircuitPython, so spin loops burn virtual time."""
+
+    def __init__(self, clock: VirtualClock, sps: int = 80, counts=None, access_cost: float = 0.000005):
+        super().__init__(clock, sps, counts)
+        self.access_cost = access_cost
+        self._shift = 0
+        self._pulses = 25  # Nothing latched yet
+        self._sck = False
+        self.ready_at = None
+        self.latencies = []  # Seconds from DOUT falling to the first SCK rise, per read
+        self.missed = 0
+        self.pin_reads = 0
+        self.gain_pulses = 0
+
+    def _update(self) -> None:
+        clock = self.clock
+        clock.now += self.access_cost
+        while self.next_ready() <= clock.now:
+            ready_at = self._next
+            count = self.convert()
+            if 0 < self._pulses < 25:
+                continue  # Mid-readout, this conversion never makes it out
+            if self._pulses == 0:
+                self.missed += 1
+            else:
+                self.gain_pulses = self._pulses - 24
+            self._shift = count & 0xFFFFFF
+            self._pulses = 0
+            self.ready_at = ready_at
+
+    def dout(self) -> int:
+        self._update()
+        self.pin_reads += 1
+        pulses = self._pulses
+        if pulses == 0:
+            return 0
+        if pulses <= 24:
+            return (self._shift >> (24 - pulses)) & 1
+        return 1
+
+    def sck(self, value: bool) -> None:
+        self._update()
+        if value and not self._sck:
+            if self._pulses == 0:
+                self.latencies.append(self.clock.now - self.ready_at)
+            self._pulses += 1
+        self._sck = value
+        self.sck_level(value)
+
+    def _wake(self) -> None:
+        super()._wake()
+        self._pulses = 25  # Reset, nothing latched and DOUT high
+
+    def dout_pin(self):
+        return SimPin(self, "D5")
+
+    def sck_pin(self):
+        return SimPin(self, "D6")
+
+
+class SimPin(Pin):
+    """`DigitalInOut` wired to one of an `HX711GPIOModel`'s pins"""
+
+    def __init__(self, model: HX711GPIOModel, name: str):
+        super().__init__(name)
+        self.model = model
+        self.output = False
+
+    def switch_to_input(self, pull=None) -> None:
+        self.output = False
+
+    def switch_to_output(self, value: bool = False, drive_mode=None) -> None:
+        self.output = True
+        self.model.sck(value)
+
+    @property
+    def value(self) -> bool:
+        return bool(self.model.dout())
+
+    @value.setter
+    def value(self, value: bool) -> None:
+        self.model.sck(value)
+
+
+def interleave(counts: list) -> list:
+    """The words `hx711_multi_read_code` pushes for one frame: a zero front pad,
+    then per bit one N-bit chunk with channel 0 in its lowest bit"""
+    channels = len(counts)
+    data_bits = 24 * channels
+    pad = (32 - data_bits % 32) % 32
+
+    stream = 0
+    for bit in range(23, -1, -1):
+        for channel in range(channels - 1, -1, -1):
+            stream = (stream << 1) | ((counts[channel] >> bit) & 1)
+
+    total_bits = data_bits + pad
+    return [(stream >> (total_bits - 32 * (i + 1))) & 0xFFFFFFFF for i in range(total_bits // 32)]
+
+
+class HX711BankModel(HX711Model):
+    """Several free-running HX711s on a shared SCK, for `HX711_PIO_Multi`.
+    `counts` yields one tuple of signed readings per conversion."""
+
+    def __init__(self, clock: VirtualClock, channels: int = 4, sps: int = 80, counts=None, name: str = "D10"):
+        super().__init__(clock, sps, counts, name)
+        self.channels = channels
+        self.last_count = (0,) * channels
+        self.frame_size = (24 * channels + 31) // 32
+
+    def _unsettled(self, counts):
+        return tuple(count + self.wake_error for count in counts)
+
+    def frame_words(self, sm=None) -> list:
+        return interleave(self.convert())
+
+
+class HX711ChannelModel(HX711Model):
+    """HX711 with both inputs wired, for `HX711_PIO_Sched`.
+
+    Each conversion uses the setting picked by the previous readout's gain
+    pulses, which the SM pulls from its TX FIFO. The first conversion after a
+    switch is only half-settled, landing between the old and new input."""
+
+    def __init__(self, clock: VirtualClock, sps: int = 80, channel_a=None, channel_b=None, name: str = "D25"):
+        super().__init__(clock, sps, None, name)
+        self._sources = {0: iter(channel_a or ()), 1: iter(channel_b or ()), 2: iter(channel_a or ())}
+        self.last = {0: 0, 1: 0, 2: 0}
+        self.setting = 0  # Gain pulses - 1, A128 after power-on
+        self.settled = True
+        self.history = []  # (setting, count, settled) for every conversion
+
+    def _wake(self) -> None:
+        super()._wake()
+        self.setting = 0
+
+    def convert(self) -> int:
+        self._next += self.period
+        self.conversions += 1
+        for setting, source in self._sources.items():
+            self.last[setting] = next(source, self.last[setting])
+        count = self.last[self.setting]
+        if not self.settled:
+            previous = self.history[-1][0] if self.history else 0
+            count = (count + self.last[previous]) // 2
+        self.history.append((self.setting, count, self.settled))
+        self.last_count = count
+        return count
+
+    def frame_words(self, sm=None) -> list:
+        tag = self.setting
+        count = self.convert()
+        pulled = sm.pull_noblock(tag)
+        self.settled = pulled == self.setting
+        self.setting = pulled
+        return [(tag << 24) | (count & 0xFFFFFF)]
+
+
+class StateMachine:
+    """Just enough of `rp2pio.StateMachine` to stand in for `hx711_read_code`.
+
+    The program itself isn't executed: every conversion the `HX711Model` on
+    `first_in_pin` completes is pushed as its padded word(s). Conversions finishing
+    while the RX FIFO is full are counted in `dropped` and set `rxstall`, just
+    like the real SM stalling on autopush."""
+
+    def __init__(
+        self,
+        program,
+        frequency: int,
+        *,
+        first_in_pin=None,
+        fifo_depth: int = None,
+        **kwargs
+    ):
+        if not isinstance(first_in_pin, HX711Model):
+            raise TypeError("first_in_pin must be a fakes.HX711Model")
+
+        self.program = program
+        self.frequency = frequency
+        self.kwargs = kwargs
+        self.model = first_in_pin
+        self.clock = first_in_pin.clock
+        if fifo_depth is None:  # FIFOs are only joined for programs that don't use TX
+            fifo_depth = HX_RX_FIFO_DEPTH if "pull_threshold" not in kwargs else HX_RX_FIFO_DEPTH // 2
+        self.fifo_depth = fifo_depth
+
+        self._fifo = []
+        self._tx = []
+        self.running = True
+        self.rxstall = False
+        self.pushed = 0
+        self.dropped = 0
+        self.deinited = False
+
+    def _update(self) -> None:
+        model = self.model
+        fifo = self._fifo
+        now = self.clock.now
+        while model.next_ready() <= now:
+            if not self.running:
+                model.convert()  # Nobody clocks it out, the next one replaces it
+            elif len(fifo) + model.frame_size <= self.fifo_depth:
+                words = model.frame_words(self)
+                fifo.extend(words)
+                self.pushed += len(words)
+            else:
+                model.convert()
+                self.dropped += 1
+                self.rxstall = True
+
+    @property
+    def in_waiting(self) -> int:
+        self._update()
+        return len(self._fifo)
+
+    def readinto(self, buffer, *, start: int = 0, end: int = None, swap: bool = False) -> None:
+        """Blocking, advances the virtual clock until enough words arrived"""
+        if end is None:
+            end = len(buffer)
+        fifo = self._fifo
+        self._update()
+        for i in range(start, end):
+            while not fifo:
+                if not self.running or self.model.asleep():
+                    raise RuntimeError("readinto() would block forever, SM stopped or HX711 powered down")
+                self.clock.advance_to(self.model.next_ready())
+                self._update()
+            buffer[i] = fifo.pop(0)
+
+    def write(self, buffer, *, start: int = 0, end: int = None, swap: bool = False) -> None:
+        if end is None:
+            end = len(buffer)
+        if len(self._tx) + end - start > HX_RX_FIFO_DEPTH // 2:
+            raise RuntimeError("TX FIFO overrun, a real write() would block here")
+        self._tx.extend(buffer[start:end])
+
+    def pull_noblock(self, x: int) -> int:
+        """`pull noblock` + `mov x, osr`: next TX word, or x if the TX FIFO is empty"""
+        return self._tx.pop(0) if self._tx else x
+
+    def clear_rxfifo(self) -> None:
+        self._update()
+        self._fifo.clear()
+        self.rxstall = False
+
+    def stop(self) -> None:
+        self._update()
+        self.running = False
+
+    def restart(self) -> None:
+        self._update()
+        self.running = True
+
+    def run(self, instructions) -> None:
+        """Only `set pins, n` on the SCK pin is understood"""
+        self._update()
+        for instruction in instructions:
+            if instruction & 0xFFE0 == 0xE000:
+                self.model.sck_level(bool(instruction & 1))
+            else:
+                raise NotImplementedError("fake run() only does set pins, n")
+
+    def deinit(self) -> None:
+        self.deinited = True
+
+
+def _fake_const(value):
+    return value
+
+
+def _fake_assemble(text: str) -> array.array:
+    lines = []
+    for line in text.splitlines():
+        line = line.split(";")[0].strip()
+        if line and not line.endswith(":"):
+            lines.append(line)
+    # Only `set pins, n` is encoded properly, for StateMachine.run()
+    return array.array("H", [
+        0xE000 | int(line.split(",")[1]) if line.startswith("set pins,") else 0 for line in lines])
+
+
+def install(clock: VirtualClock = None) -> VirtualClock:
+    """Register the fake modules and put the driver package on `sys.path`"""
+    if clock is None:
+        clock = VirtualClock()
+
+    micropython = types.ModuleType("micropython")
+    micropython.const = _fake_const
+    sys.modules["micropython"] = micropython
+
+    rp2pio = types.ModuleType("rp2pio")
+    rp2pio.StateMachine = StateMachine
+    sys.modules["rp2pio"] = rp2pio
+
+    digitalio = types.ModuleType("digitalio")
+    digitalio.DigitalInOut = Pin
+    sys.modules["digitalio"] = digitalio
+
+    try:
+        import adafruit_pioasm  # pylint: disable=unused-import,import-outside-toplevel
+    except ImportError:
+        pioasm = types.ModuleType("adafruit_pioasm")
+        pioasm.assemble = _fake_assemble
+        sys.modules["adafruit_pioasm"] = pioasm
+
+    if DRIVER_ROOT not in sys.path:
+        sys.path.insert(0, DRIVER_ROOT)
+
+    # Drivers see the virtual clock for timeouts, sleeps and ready prediction
+    import importlib  # pylint: disable=import-outside-toplevel
+    for name in DRIVER_MODULES:
+        clock.patch(importlib.import_module(name))
+
+    return clock
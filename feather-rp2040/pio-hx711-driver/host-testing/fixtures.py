@@ -0,0 +1,66 @@
+"""
+Replayable synthetic HX711 step responses.
+
+Each fixture is a load placed on the platform at `STEP_AT` conversions in, with
+the mechanical settling of a damped spring-mass system plus ADC noise. They're
+seeded, so every run produces the exact same counts.
+
+    python fixtures.py out/  # Dump every fixture as one raw count per line
+"""
+
+import os
+import sys
+import math
+import random
+
+SPS = 80
+STEP_AT = 40  # Half a second of empty platform before the load goes on
+
+# name: (load counts, natural frequency Hz, damping ratio, noise counts, seconds after the step)
+FIXTURES = {
+    "light-set-down": (20000, 6.0, 0.7, 30, 4),
+    "spool-drop": (400000, 4.0, 0.15, 40, 6),
+    "wobbly-spool": (400000, 2.5, 0.05, 40, 10),
+    "slow-creep": (120000, 1.0, 1.5, 30, 8),
+    "noisy-bench": (120000, 5.0, 0.4, 120, 6),
+}
+
+
+def step_response(load, freq, damping, noise, seconds, sps=SPS, seed=711):
+    """Counts for a load placed at STEP_AT, returns (counts, settled level)"""
+    rng = random.Random(seed)
+    omega = 2 * math.pi * freq
+    counts = []
+
+    for i in range(STEP_AT + int(seconds * sps)):
+        if i < STEP_AT:
+            level = 0.0
+        else:
+            t = (i - STEP_AT) / sps
+            if damping < 1:
+                omega_d = omega * math.sqrt(1 - damping * damping)
+                decay = math.exp(-damping * omega * t)
+                level = load * (1 - decay * (
+                    math.cos(omega_d * t)
+                    + damping / math.sqrt(1 - damping * damping) * math.sin(omega_d * t)))
+            else:  # Overdamped, roughly a first-order creep towards the load
+                level = load * (1 - math.exp(-omega * t / (2 * damping)))
+        counts.append(int(level + rng.gauss(0, noise)))
+
+    return counts, load
+
+
+def fixture(name, sps=SPS):
+    load, freq, damping, noise, seconds = FIXTURES[name]
+    return step_response(load, freq, damping, noise, seconds, sps)
+
+
+if __name__ == "__main__":
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else "."
+    os.makedirs(out_dir, exist_ok=True)
+    for fixture_name in FIXTURES:
+        fixture_counts, _ = fixture(fixture_name)
+        path = os.path.join(out_dir, "{}.txt".format(fixture_name))
+        with open(path, "w") as capture:
+            capture.write("\n".join(str(count) for count in fixture_counts))
+        print("{}: {} samples".format(path, len(fixture_counts)))
@@ -0,0 +1,395 @@
+"""
+Cycle-accurate simulator for the RP2040 PIO instructions the HX711 programs
+use, running the words `adafruit_pioasm.assemble()` produces against
+simulated HX711s on DOUT/SCK. Unlike `fakes.StateMachine`, which just pushes
+finished words, the program really executes: `set`, `mov`, `in`, `pull`,
+`jmp` (always, !x, x--, !y, y--, x!=y), `wait` on a pin or GPIO, delay
+slots, autopush with FIFO stalls and wrapping at the end of the program.
+`in_waiting`, `readinto()` and `clear_rxfifo()` stand in for rp2pio's, so
+a driver can be pointed at it, with `idle()` for time between calls.
+
+    chip = pio_sim.HX711Chip(counts, sps=80)
+    sm = pio_sim.StateMachine(adafruit_pioasm.assemble(code), 4000000, [chip])
+    words = sm.run(1.0, drain=0.05)
+
+Time is cycles / `frequency` from the program's start. Pins read through
+the GPIO input synchronizer, `captures.PIO_SYNC_S` late. Side-set, `out`,
+`irq` and `mov` to pins aren't used by these programs and raise ValueError.
+"""
+
+import collections
+import math
+
+import captures
+
+HX_SETTLE_CONVERSIONS = 4  # Conversion periods from wake to the first DOUT fall
+
+
+class HX711Chip:
+    """DOUT of one HX711, converting `counts` in order every (1 + rate_error)
+    / sps s. Bits change `captures.HX_T2_MAX` after each SCK rise, the 25th
+    pulse pulls DOUT high and SCK held high for 60 us powers it down until
+    it falls. Conversions nobody reads in time are counted in `missed`."""
+
+    def __init__(self, counts, sps: int = 80, lead: float = 0.0001, rate_error: float = 0.0):
+        self._counts = iter(counts)
+        self.period = (1 + rate_error) / sps
+        self._base = lead  # Conversion grid, restarted on every wake
+        self._conversion = 0  # Next conversion on the grid nobody has read yet
+        self._level = 1
+        self._pending = collections.deque()  # DOUT changes still in flight
+        self._reading = False
+        self._pulses = 0
+        self._rise = None
+        self._word = 0
+        self.gain_pulses = 1
+        self.read = 0
+        self.sent = []  # Signed counts clocked out, in order
+        self.missed = 0
+        self.power_downs = 0
+        self.edges = [(0.0, 1)]  # (time, DOUT), for captures.levels()
+
+    def ready_at(self) -> float:
+        return self._base + self._conversion * self.period
+
+    def dout(self, t: float) -> int:
+        pending = self._pending
+        while pending and pending[0][0] <= t:
+            self._level = pending.popleft()[1]
+        if self._reading or pending:
+            return self._level
+        return 0 if t >= self.ready_at() else 1
+
+    def next_change(self, t: float):
+        """When DOUT will next change on its own after `t`, None if it won't"""
+        if self._pending:
+            return self._pending[0][0]
+        if not self._reading and t < self.ready_at():
+            return self.ready_at()
+        return None
+
+    def _shift(self, t: float, level: int) -> None:
+        self._pending.append((t, level))
+        self.edges.append((t, level))
+
+    def sck(self, level: int, t: float) -> None:
+        if level:
+            self._rise = t
+            if self._reading:
+                self._pulses += 1
+                if self._pulses <= 24:
+                    self._shift(t + captures.HX_T2_MAX, (self._word >> (24 - self._pulses)) & 1)
+                else:
+                    self._reading = False  # 25th pulse
+                    self._shift(t + captures.HX_T2_MAX, 1)
+                    self.gain_pulses = 1
+            elif self._pulses >= 25 and t < self.ready_at():
+                self._pulses += 1
+                self.gain_pulses = min(self._pulses - 24, 3)
+            elif t >= self.ready_at():
+                self._start(t)
+            return
+
+        rise, self._rise = self._rise, None
+        if rise is not None and t - rise >= captures.HX_POWER_DOWN_S:
+            self._pending.clear()
+            self._level = 1
+            self.edges.append((rise + captures.HX_POWER_DOWN_S, 1))
+            self._reading = False
+            self._pulses = 0
+            self.gain_pulses = 1
+            self.power_downs += 1
+            self._base, self._conversion = t, HX_SETTLE_CONVERSIONS
+
+    def _start(self, t: float) -> None:
+        """First SCK rise of a readout, takes the newest finished conversion"""
+        done = int((t - self._base) / self.period)
+        self.edges.append((self.ready_at(), 0))
+        for i in range(done - self._conversion + 1):
+            count = next(self._counts)
+        self.missed += done - self._conversion
+        self._conversion = done + 1
+        self._word = count & 0xFFFFFF
+        self._level = 0
+        self._reading = True
+        self._pulses = 1
+        self.read += 1
+        self.sent.append(count)
+        self._shift(t + captures.HX_T2_MAX, (self._word >> 23) & 1)
+
+
+class StateMachine:
+    """One state machine running `program` at `frequency`, `chips[i]` on
+    in pin i and every chip's SCK on set pin 0. The RX FIFO is 8 words deep
+    unless the program pulls, in which case it's 4, as rp2pio joins them."""
+
+    def __init__(
+        self,
+        program,
+        frequency: int,
+        chips: list,
+        *,
+        in_shift_right: bool = False,
+        push_threshold: int = 32,
+        auto_push: bool = True,
+    ):
+        self.program = [self._decode(word) for word in program]
+        self.frequency = frequency
+        self.cycle = 1 / frequency
+        self.chips = chips
+        self.in_shift_right = in_shift_right
+        self.push_threshold = push_threshold
+        self.auto_push = auto_push
+        pulls = any(op == "pull" for op, *args in self.program)
+        self.rx_depth = 4 if pulls else 8
+
+        self.pc = 0
+        self.x = self.y = 0
+        self.isr = self.osr = 0
+        self.isr_count = 0
+        self.sck = 0
+        self.rx = collections.deque()
+        self.tx = collections.deque()
+
+        self.cycles = 0
+        self.wait_cycles = 0  # Stalled on `wait`
+        self.stall_cycles = 0  # Stalled on autopush into a full RX FIFO
+        self.rxstall = False
+        self.stalled = False  # Waiting on the consumer, not on a pin
+        self.pushes = 0
+        self.max_rx = 0
+        self.rx_cycles = 0  # Sum of RX occupancy over cycles, for the mean
+        self.sck_edges = [(0.0, 0)]
+
+    @staticmethod
+    def _decode(word: int) -> tuple:
+        opcode = word >> 13
+        delay = (word >> 8) & 0x1F
+        if opcode == 0:
+            return ("jmp", (word >> 5) & 7, word & 0x1F, delay)
+        if opcode == 1:
+            source = (word >> 5) & 3
+            if source > 1:
+                raise ValueError("Unsupported wait source in 0x{:04x}".format(word))
+            return ("wait", (word >> 7) & 1, word & 0x1F, delay)
+        if opcode == 2:
+            return ("in", (word >> 5) & 7, word & 0x1F or 32, delay)
+        if opcode == 4:
+            if word & 0x80:
+                return ("pull", bool(word & 0x20), delay)
+            return ("push", bool(word & 0x20), delay)
+        if opcode == 5:
+            destination = (word >> 5) & 7
+            if destination in (0, 4):
+                raise ValueError("Unsupported mov destination in 0x{:04x}".format(word))
+            return ("mov", destination, (word >> 3) & 3, word & 7, delay)
+        if opcode == 7:
+            return ("set", (word >> 5) & 7, word & 0x1F, delay)
+        raise ValueError("Unsupported PIO instruction 0x{:04x}".format(word))
+
+    def _pins(self) -> int:
+        t = self.cycles * self.cycle - captures.PIO_SYNC_S
+        value = 0
+        for i, chip in enumerate(self.chips):
+            value |= chip.dout(t) << i
+        return value
+
+    def _source(self, source: int) -> int:
+        if source == 0:
+            return self._pins()
+        if source == 1:
+            return self.x
+        if source == 2:
+            return self.y
+        if source == 3:
+            return 0
+        if source == 6:
+            return self.isr
+        if source == 7:
+            return self.osr
+        raise ValueError("Unsupported source {}".format(source))
+
+    def _push(self) -> bool:
+        if len(self.rx) >= self.rx_depth:
+            self.rxstall = True
+            return False
+        self.rx.append(self.isr)
+        self.pushes += 1
+        self.max_rx = max(self.max_rx, len(self.rx))
+        self.isr = 0
+        self.isr_count = 0
+        return True
+
+    def _set_sck(self, level: int) -> None:
+        if level != self.sck:
+            t = self.cycles * self.cycle
+            self.sck = level
+            self.sck_edges.append((t, level))
+            for chip in self.chips:
+                chip.sck(level, t)
+
+    def _wait_skip(self, polarity: int, index: int) -> int:
+        """Cycles the `wait` can skip at once, up to the next DOUT change"""
+        t = self.cycles * self.cycle - captures.PIO_SYNC_S
+        change = self.chips[index].next_change(t)
+        if change is None:
+            return 1
+        return max(1, math.ceil((change - t) / self.cycle))
+
+    def step(self) -> int:
+        """Execute (or stall on) the instruction at `pc`, returns cycles taken"""
+        self.stalled = False
+        op, *args = self.program[self.pc]
+        delay = args[-1]
+        next_pc = self.pc + 1 if self.pc + 1 < len(self.program) else 0
+
+        if op == "jmp":
+            condition, address = args[0], args[1]
+            if condition == 0:
+                taken = True
+            elif condition == 1:
+                taken = self.x == 0
+            elif condition == 2:
+                taken = self.x != 0
+                self.x = (self.x - 1) & 0xFFFFFFFF
+            elif condition == 3:
+                taken = self.y == 0
+            elif condition == 4:
+                taken = self.y != 0
+                self.y = (self.y - 1) & 0xFFFFFFFF
+            elif condition == 5:
+                taken = self.x != self.y
+            else:
+                raise ValueError("Unsupported jmp condition {}".format(condition))
+            if taken:
+                next_pc = address
+
+        elif op == "wait":
+            polarity, index = args[0], args[1]
+            if (self._pins() >> index) & 1 != polarity:
+                skip = self._wait_skip(polarity, index)
+                self.wait_cycles += skip
+                return skip
+
+        elif op == "in":
+            source, count = args[0], args[1]
+            if self.auto_push and self.isr_count + count >= self.push_threshold and len(self.rx) >= self.rx_depth:
+                self.rxstall = self.stalled = True
+                return 1  # Autopush stalls the `in` until there's room
+            value = self._source(source) & ((1 << count) - 1)
+            if self.in_shift_right:
+                self.isr = (self.isr >> count | value << (32 - count)) & 0xFFFFFFFF
+            else:
+                self.isr = (self.isr << count | value) & 0xFFFFFFFF
+            self.isr_count = min(self.isr_count + count, 32)
+            if self.auto_push and self.isr_count >= self.push_threshold:
+                self._push()
+
+        elif op == "push":
+            if not self._push() and args[0]:
+                self.stalled = True
+                return 1
+
+        elif op == "pull":
+            if self.tx:
+                self.osr = self.tx.popleft()
+            elif args[0]:
+                self.stalled = True
+                return 1
+            else:
+                self.osr = self.x  # `pull noblock` on an empty TX FIFO copies X
+
+        elif op == "mov":
+            destination, operation, source = args[0], args[1], args[2]
+            value = self._source(source)
+            if operation == 1:
+                value = ~value & 0xFFFFFFFF
+            elif operation == 2:
+                value = int("{:032b}".format(value)[::-1], 2)
+            if destination == 1:
+                self.x = value
+            elif destination == 2:
+                self.y = value
+            elif destination == 5:
+                next_pc = value & 0x1F
+            elif destination == 6:
+                self.isr, self.isr_count = value, 0
+            else:
+                self.osr = value
+
+        elif op == "set":
+            destination, value = args[0], args[1]
+            if destination == 0:
+                self._set_sck(value & 1)
+            elif destination == 1:
+                self.x = value
+            elif destination == 2:
+                self.y = value
+            # pindirs: pins are already outputs here
+
+        self.pc = next_pc
+        return 1 + delay
+
+    def run(self, seconds: float, drain: float = None) -> list:
+        """Run for `seconds`, a consumer emptying the RX FIFO every `drain`
+        seconds (never, if None). Returns every word the consumer got."""
+        end = int(seconds * self.frequency)
+        drain_cycles = int(drain * self.frequency) if drain else None
+        next_drain = drain_cycles
+        words = []
+        while self.cycles < end:
+            taken = self.step()
+            if self.stalled:  # Nothing changes until the consumer drains the FIFO
+                taken = (next_drain if next_drain is not None else end) - self.cycles
+                self.stall_cycles += taken
+            self.rx_cycles += len(self.rx) * taken
+            self.cycles += taken
+            if next_drain is not None and self.cycles >= next_drain:
+                words.extend(self.rx)
+                self.rx.clear()
+                next_drain += drain_cycles
+        return words
+
+    def _advance(self, end: int) -> None:
+        """Run up to cycle `end` with nobody reading the RX FIFO"""
+        while self.cycles < end:
+            taken = self.step()
+            if self.stalled:
+                taken = end - self.cycles
+                self.stall_cycles += taken
+            self.rx_cycles += len(self.rx) * taken
+            self.cycles += taken
+
+    def idle(self, seconds: float) -> None:
+        """Let `seconds` pass without reading anything, e.g. between driver calls"""
+        self._advance(self.cycles + int(seconds * self.frequency))
+
+    # Enough of the consumer side of `rp2pio.StateMachine` for a driver to
+    # run on the simulator in place of its state machine
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.rx)
+
+    def clear_rxfifo(self) -> None:
+        self.rx.clear()
+        self.rxstall = False
+
+    def readinto(self, buffer, *, start: int = 0, end: int = None, swap: bool = False) -> None:
+        """Blocking, runs the program until enough words have been pushed"""
+        if end is None:
+            end = len(buffer)
+        for i in range(start, end):
+            limit = self.cycles + self.frequency  # A second without a word would block forever on the board
+            while not self.rx:
+                if self.cycles >= limit:
+                    raise RuntimeError("readinto() would block forever, no word pushed in 1 s")
+                self._advance(self.cycles + 1)
+            buffer[i] = self.rx.popleft()
+
+    def active_cycles(self) -> int:
+        """Cycles spent doing something rather than waiting on DOUT or the FIFO"""
+        return self.cycles - self.wait_cycles - self.stall_cycles
+
+    def mean_rx(self) -> float:
+        return self.rx_cycles / self.cycles if self.cycles else 0.0
@@ -0,0 +1,129 @@
+"""
+Just enough of libsigrokdecode's Python API to run `pulseview_decoder/pd.py`
+under CPython on an in-memory capture.
+
+`wait()` finds the next matching sample with NumPy lookups over precomputed
+edge positions, standing in for libsigrokdecode's C condition matching, so a
+benchmark measures the decoder's own per-edge Python work and not the fake's.
+
+    decoder = srd_fake.load_decoder()
+    annotations = srd_fake.run(decoder, samples, samplerate)  # Packed DOUT bit 0, SCK bit 1
+"""
+
+import importlib.util
+import os
+import sys
+import types
+
+import numpy
+
+DECODER_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pulseview_decoder")
+
+OUTPUT_ANN = 0
+SRD_CONF_SAMPLERATE = 1
+
+
+class _Channel:
+
+    def __init__(self, levels: numpy.ndarray):
+        self.levels = levels
+        step = numpy.diff(levels.astype(numpy.int8), prepend=levels[:1].astype(numpy.int8))
+        self.rises = numpy.flatnonzero(step > 0)
+        self.falls = numpy.flatnonzero(step < 0)
+        self.edges = numpy.flatnonzero(step)
+
+    @staticmethod
+    def _after(positions: numpy.ndarray, sample: int) -> int:
+        i = numpy.searchsorted(positions, sample, side="right")
+        return int(positions[i]) if i < len(positions) else sys.maxsize
+
+    def next_match(self, term: str, sample: int) -> int:
+        """First sample after `sample` matching `term`"""
+        if term == "r":
+            return self._after(self.rises, sample)
+        if term == "f":
+            return self._after(self.falls, sample)
+        if term == "e":
+            return self._after(self.edges, sample)
+        level = 0 if term == "l" else 1
+        start = sample + 1
+        if start < len(self.levels) and self.levels[start] == level:
+            return start
+        return self._after(self.rises if level else self.falls, sample)
+
+
+class Decoder:
+    """Base class pd.py's Decoder derives from"""
+
+    def register(self, output_type):
+        return output_type
+
+    def put(self, start, end, output, data):
+        self.annotations.append((start, end, data[0], data[1]))
+
+    def wait(self, conds=None):
+        if isinstance(conds, dict):
+            conds = [conds]
+        sample = self.samplenum
+        candidates = []
+        for cond in conds:
+            terms = [(key, value) for key, value in cond.items()]
+            if len(terms) != 1:
+                raise NotImplementedError("fake wait() only does single-term conditions")
+            key, value = terms[0]
+            if key == "skip":
+                candidates.append(sample + value)
+            else:
+                candidates.append(self._channels[key].next_match(value, sample))
+
+        best = min(candidates)
+        if best >= self._length:
+            raise EOFError()
+        self.samplenum = best
+        self.matched = tuple(candidate == best for candidate in candidates)
+        return tuple(int(channel.levels[best]) for channel in self._channels)
+
+
+def install() -> types.ModuleType:
+    srd = types.ModuleType("sigrokdecode")
+    srd.Decoder = Decoder
+    srd.OUTPUT_ANN = OUTPUT_ANN
+    srd.SRD_CONF_SAMPLERATE = SRD_CONF_SAMPLERATE
+    sys.modules["sigrokdecode"] = srd
+
+    common = types.ModuleType("common")
+    srdhelper = types.ModuleType("common.srdhelper")
+    srdhelper.bitpack = lambda bits: sum(bit << i for i, bit in enumerate(bits))
+    common.srdhelper = srdhelper
+    sys.modules["common"] = common
+    sys.modules["common.srdhelper"] = srdhelper
+    return srd
+
+
+def load_decoder(path: str = os.path.join(DECODER_ROOT, "pd.py")):
+    """pd.py's Decoder class, imported against the fake sigrokdecode"""
+    install()
+    spec = importlib.util.spec_from_file_location("hx711_pd", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Decoder
+
+
+def run(decoder_class, samples: numpy.ndarray, samplerate: int, dout_bit: int = 0, sck_bit: int = 1) -> list:
+    """Decode a packed capture to the end, returns [(start, end, class, [texts])]"""
+    decoder = decoder_class()
+    decoder.annotations = []
+    decoder._channels = [
+        _Channel((samples >> dout_bit) & 1),
+        _Channel((samples >> sck_bit) & 1),
+    ]
+    decoder._length = len(samples)
+    decoder.samplenum = -1
+    decoder.matched = ()
+    decoder.metadata(SRD_CONF_SAMPLERATE, samplerate)
+    decoder.start()
+    try:
+        decoder.decode()
+    except EOFError:
+        pass
+    return decoder.annotations
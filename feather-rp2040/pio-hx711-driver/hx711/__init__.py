@@ -13,17 +13,59 @@ Implementation Notes
 
 * `HX711_GPIO`, works with all boards but may be subject to timing issues
 * `HX711_PIO`, works with RP2040's PIO to provide more consistent pulse timing
+* `HX711_Sim`, simulated cell for developing without hardware
+* `HX711_Replay`, plays back a session logged by `hx711.recorder`
+
+Pick one by name with `hx711.backends.create("gpio" | "pio" | "sim" | "replay", ...)`.
 
 **Hardware:**
 
 * SparkFun `HX711 Load Cell Amplifier Breakout <https://www.sparkfun.com/products/13879>`_
 """
 
+import time
+from micropython import const
+from .fixed import mul_q16, q16_multiplier
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None  # Only needed for the *_async methods
+
 __version__ = "0.0.0-auto.0"
 __repo__ = "https://github.com/fivesixzero/CircuitPython_HX711"
 
+# Gain settings, by the number of extra SCK pulses after a reading
+CHANNEL_A_128 = const(1)
+CHANNEL_B_32 = const(2)
+CHANNEL_A_64 = const(3)
+
+class _SampleIterator:
+    """`async for count in hx.samples(n)`, yields to other tasks between readings"""
+
+    def __init__(self, hx, count: int = None):
+        self._hx = hx
+        self._remaining = count
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> int:
+        if self._remaining is not None:
+            if self._remaining <= 0:
+                raise StopAsyncIteration
+            self._remaining -= 1
+        return await self._hx.read_raw_async(clear_fifo=False)
+
+
 class HX711():
 
+    ready_timeout = 1.0
+    powered = True
+    wake_discard = 1  # Conversions power_on() drops while the output settles
+    temperature_interval = 1.0  # Seconds a temperature reading is reused for
+    fixed_drift_every = 80  # read_fixed() conversions between drift refreshes, ~1 s at 80 SPS
+
     def __init__(
         self,
         gain: int = 1,
@@ -35,6 +77,21 @@ class HX711():
         self.gain = gain
         self.offset = offset
         self.scale = scale
+        self.quadratic = 0.0  # Second-order term from a quadratic hx711.calibration fit
+        self.filters = None  # Optional hx711.filters stage or FilterChain
+        self.stability = None  # Optional hx711.stability.StabilityDetector
+        self.on_stable = None  # Called with the settled weight by poll_stable()
+        self.duty = None  # hx711.duty.DutyCycle, set up by duty_cycle()
+        self.drift = None  # hx711.drift.DriftModel, set up by compensate_drift()
+        self.temperature_source = None  # Callable returning degrees C
+        self.temperature = None  # Last reading from temperature_source
+        self.tare_temperature = None  # ...and the one the offset was taken at
+        self._temperature_at = None
+        self._drift_counts = 0  # drift_offset() as of the last temperature reading, for to_fixed()
+        self._fixed_conversions = 0  # read_fixed() conversions since the drift was refreshed
+        self.fixed_decimals = None  # Set by fixed_point()
+        self._fixed_scale = None  # The scale the multiplier was worked out for
+        self._multiplier = 0
 
         if tare:
             self.read_raw()  # Pull a reading to avoid first-read issues
@@ -51,9 +108,19 @@ class HX711():
         else:
             self._gain = gain
 
-    def tare(self) -> None:
-        self.offset = self.read_raw()
-        
+    def tare(self, offset: int = None) -> None:
+        """Zero on a fresh reading, or on `offset` if given (e.g. an average).
+        With a temperature source, also notes the temperature it was taken at
+        and teaches the drift model."""
+        self.offset = self.read_raw() if offset is None else offset
+
+        if self.temperature_source is not None:
+            self.tare_temperature = self.read_temperature(refresh=True)
+            if self.drift is not None:
+                self.drift.add(self.tare_temperature, self.offset)
+                self._update_drift_counts()
+
+
     def determine_scale(self, weight: float) -> float:
         if not self.offset:
             raise ValueError()
@@ -63,19 +130,241 @@ class HX711():
         self.scale = diff / weight
         return self.scale
 
+    def to_weight(self, raw: int) -> float:
+        d = raw - self.offset
+        if self.drift is not None:
+            d -= self.drift_offset()
+        if self.quadratic:
+            return d / self.scale + self.quadratic * d * d
+        return d / self.scale
+
+    def fixed_point(self, decimals: int = 2) -> int:
+        """Turn on `to_fixed()`/`read_fixed()`, which return integer
+        10**-decimals units without allocating, see `hx711.fixed`. Returns the
+        Q16.16 multiplier, worked out again whenever `scale` changes."""
+        self._multiplier = q16_multiplier(self.scale, decimals)
+        self._fixed_scale = self.scale
+        self.fixed_decimals = decimals
+        return self._multiplier
+
+    def to_fixed(self, raw: int) -> int:
+        """`to_weight()` in integer 10**-decimals units. Drift is applied as
+        of the last temperature reading, since reading the clock allocates.
+        `read_fixed()` keeps that current; call `read_temperature()` now and
+        then if you convert raw readings here yourself."""
+        if self.fixed_decimals is None:
+            raise RuntimeError("Call fixed_point() first")
+        if self.quadratic:
+            raise ValueError("Fixed point has no quadratic term")
+        if self.scale != self._fixed_scale:
+            self.fixed_point(self.fixed_decimals)
+
+        return mul_q16(raw - self.offset - self._drift_counts, self._multiplier)
+
+    def read_fixed(self, average_count: int = 1) -> int:
+        """`read()` in integer 10**-decimals units. With drift compensation on,
+        the temperature is checked every `fixed_drift_every` conversions
+        rather than on every call, so most calls allocate nothing."""
+        if self.drift is not None:
+            self._fixed_conversions += average_count
+            if self._fixed_conversions >= self.fixed_drift_every:
+                self._fixed_conversions = 0
+                self.read_temperature()
+
+        if average_count > 1:
+            return self.to_fixed(self.read_average(average_count))
+        else:
+            return self.to_fixed(self.read_raw())
+
     def read(self, average_count: int = 1) -> int:
         if average_count > 1:
-            return (self.read_average() - self.offset) / self.scale
+            return self.to_weight(self.read_average(average_count))
         else:
-            return (self.read_raw() - self.offset) / self.scale
+            return self.to_weight(self.read_raw())
 
-    def read_average(self, count: int = 10):
-        readings = []
+    def read_filtered(self, count: int = 1) -> float:
+        """Push `count` new readings through `filters` and scale the result.
+        Filter state carries over between calls, so a few conversions per call
+        are usually enough once it has warmed up."""
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        filters = self.filters
+        if filters is None:
+            return self.read(count)
 
         for i in range(count):
-            readings.append(self.read_raw(clear_fifo=False))
-        
-        return sum(readings) // len(readings)
+            value = filters.update(self.read_raw(clear_fifo=False))
+
+        return self.to_weight(value)
+
+    def _stability_detector(self):
+        if self.stability is None:
+            from .stability import StabilityDetector  # pylint: disable=import-outside-toplevel
+            self.stability = StabilityDetector()
+        return self.stability
+
+    def poll_stable(self, count: int = 1) -> bool:
+        """Feed `count` new readings to the stability detector, calling
+        `on_stable(weight)` when the load settles. Returns True while stable."""
+        detector = self._stability_detector()
+
+        for i in range(count):
+            was_stable = detector.stable
+            if detector.update(self.read_raw(clear_fifo=False)) and not was_stable:
+                if self.on_stable:
+                    self.on_stable(self.to_weight(detector.mean))
+
+        return detector.stable
+
+    def read_stable(self, max_count: int = 400) -> float:
+        """Read until the load settles and return the settled weight, taking
+        as many conversions as the physical settling needs, up to `max_count`"""
+        detector = self._stability_detector()
+        detector.reset()
+
+        for i in range(max_count):
+            if detector.update(self.read_raw(clear_fifo=False)):
+                return self.to_weight(detector.mean)
+
+        raise RuntimeError("Reading did not settle within {} conversions".format(max_count))
+
+    def read_average(self, count: int = 10) -> int:
+        total = 0
+
+        for i in range(count):
+            total += self.read_raw(clear_fifo=False)
 
-    def read_raw(self) -> int:
+        return total // count
+
+    def read_raw(self, clear_fifo: bool = True) -> int:
+        raise NotImplementedError()
+
+    def is_ready(self) -> bool:
+        """True if read_raw() would return without waiting on a conversion"""
         raise NotImplementedError()
+
+    def wait_ready(self, timeout: float = None) -> None:
+        if timeout is None:
+            timeout = self.ready_timeout
+
+        deadline = time.monotonic() + timeout
+        while not self.is_ready():
+            if time.monotonic() > deadline:
+                raise RuntimeError("HX711 not ready after {} s".format(timeout))
+
+    def power_off(self) -> None:
+        """Hold SCK high until the HX711 powers down. No conversions happen, and
+        reads time out, until `power_on()`."""
+        self._power_down()
+        self.powered = False
+
+    def power_on(self, discard: int = None) -> None:
+        """Release SCK and drop the first `discard` conversions, `wake_discard`
+        by default. The HX711 resets to channel A, gain 128, and the first
+        conversion is taken at that gain, so at least one is dropped otherwise.
+        With `discard=0` it returns at once and the caller drops them."""
+        self._power_up()
+        self.powered = True
+
+        if discard is None:
+            discard = self.wake_discard
+            if self.gain != CHANNEL_A_128:
+                discard = max(discard, 1)
+
+        for i in range(discard):
+            self.read_raw(clear_fifo=False)
+
+    def _power_down(self) -> None:
+        raise NotImplementedError()
+
+    def _power_up(self) -> None:
+        raise NotImplementedError()
+
+    def duty_cycle(self, interval: float, burst: int = 4, discard: int = 1):
+        """Power down between bursts of `burst` readings taken every `interval`
+        seconds, see `hx711.duty.DutyCycle`. Returns the running scheduler."""
+        from .duty import DutyCycle  # pylint: disable=import-outside-toplevel
+        self.duty = DutyCycle(self, interval, burst, discard)
+        self.duty.start()
+        return self.duty
+
+    def discard_pending(self) -> None:
+        """Drop readings already waiting, so the next one is fresh"""
+
+    def read_temperature(self, refresh: bool = False) -> float:
+        """Degrees C from `temperature_source`, re-read at most every
+        `temperature_interval` seconds unless `refresh`. None without a source."""
+        if self.temperature_source is None:
+            return None
+
+        now = time.monotonic()
+        if refresh or self._temperature_at is None or now - self._temperature_at >= self.temperature_interval:
+            self.temperature = self.temperature_source()
+            self._temperature_at = now
+            self._update_drift_counts()
+        return self.temperature
+
+    def _update_drift_counts(self) -> None:
+        if self.drift is not None and self.tare_temperature is not None:
+            self._drift_counts = round(self.drift.shift(self.tare_temperature, self.temperature))
+
+    def drift_offset(self) -> float:
+        """Counts the zero has moved by since the last tare, per the drift model"""
+        if self.drift is None or self.tare_temperature is None:
+            return 0.0
+        return self.drift.shift(self.tare_temperature, self.read_temperature())
+
+    def compensate_drift(self, source, order: int = 1, model=None):
+        """Correct readings for zero drift with temperature, read by calling
+        `source()`, see `hx711.drift.DriftModel`. The model learns from every
+        `tare()` from here on. Returns it."""
+        from .drift import DriftModel  # pylint: disable=import-outside-toplevel
+        self.temperature_source = source
+        self.drift = model if model is not None else DriftModel(order)
+        self.tare_temperature = self.read_temperature(refresh=True)  # The current offset is as good as any
+        self._drift_counts = 0
+        return self.drift
+
+    async def wait_ready_async(self, timeout: float = None) -> None:
+        if timeout is None:
+            timeout = self.ready_timeout
+
+        deadline = time.monotonic() + timeout
+        while not self.is_ready():
+            if time.monotonic() > deadline:
+                raise RuntimeError("HX711 not ready after {} s".format(timeout))
+            await asyncio.sleep(0)
+
+    async def read_raw_async(self, clear_fifo: bool = True) -> int:
+        if clear_fifo:
+            self.discard_pending()
+        await self.wait_ready_async()
+        return self.read_raw(clear_fifo=False)
+
+    async def read_average_async(self, count: int = 10) -> int:
+        total = 0
+
+        for i in range(count):
+            total += await self.read_raw_async(clear_fifo=False)
+
+        return total // count
+
+    async def read_async(self, average_count: int = 1) -> float:
+        if average_count > 1:
+            return self.to_weight(await self.read_average_async(average_count))
+        else:
+            return self.to_weight(await self.read_raw_async())
+
+    async def read_stable_async(self, max_count: int = 400) -> float:
+        detector = self._stability_detector()
+        detector.reset()
+
+        for i in range(max_count):
+            if detector.update(await self.read_raw_async(clear_fifo=False)):
+                return self.to_weight(detector.mean)
+
+        raise RuntimeError("Reading did not settle within {} conversions".format(max_count))
+
+    def samples(self, count: int = None) -> _SampleIterator:
+        """Async iterator over raw readings, endless unless `count` is given"""
+        return _SampleIterator(self, count)
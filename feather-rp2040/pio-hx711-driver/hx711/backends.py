@@ -0,0 +1,72 @@
+"""
+`hx711.backends`
+====================================================
+
+Backend registry, so code can pick a driver by name and one harness can
+run against all of them:
+
+.. code-block:: python
+
+    from hx711 import backends
+
+    hx = backends.create("pio", board.D5, board.D6, scale=416, tare=True)
+
+Every backend takes `gain`, `offset`, `scale` and `tare` keywords and has the
+same `read*()`, `tare()` and `power_off()`/`power_on()` behaviour. Backend
+modules are only imported when created, so `"pio"` costs nothing on boards
+without `rp2pio`.
+
+* Author(s): Erik Hess
+"""
+
+try:
+    # Only used for typing
+    from typing import Callable, List
+except ImportError:
+    pass
+
+
+def _gpio(pin_data, pin_clk, **kwargs):
+    from .hx711_gpio import HX711_GPIO  # pylint: disable=import-outside-toplevel
+    return HX711_GPIO(pin_data, pin_clk, **kwargs)
+
+
+def _pio(pin_data, pin_clk, **kwargs):
+    from .hx711_pio import HX711_PIO  # pylint: disable=import-outside-toplevel
+    return HX711_PIO(pin_data, pin_clk, **kwargs)
+
+
+def _sim(pin_data=None, pin_clk=None, **kwargs):
+    from .hx711_sim import HX711_Sim  # pylint: disable=import-outside-toplevel
+    return HX711_Sim(pin_data, pin_clk, **kwargs)
+
+
+def _replay(pin_data=None, pin_clk=None, **kwargs):
+    from .hx711_replay import HX711_Replay  # pylint: disable=import-outside-toplevel
+    return HX711_Replay(pin_data, pin_clk, **kwargs)
+
+
+_BACKENDS = {
+    "gpio": _gpio,  # DigitalInOut pins, bit-banged, any board
+    "pio": _pio,    # board pins, RP2040 PIO state machine
+    "sim": _sim,    # pins ignored, simulated cell
+    "replay": _replay,  # pins ignored, session logged by hx711.recorder
+}
+
+
+def register(name: str, factory: Callable) -> None:
+    """Add or replace a backend. `factory(pin_data, pin_clk, **kwargs)` returns an `HX711`."""
+    _BACKENDS[name] = factory
+
+
+def names() -> List[str]:
+    return sorted(_BACKENDS)
+
+
+def create(name: str, pin_data=None, pin_clk=None, **kwargs):
+    try:
+        factory = _BACKENDS[name]
+    except KeyError:
+        raise ValueError("Unknown HX711 backend '{}', choose from {}".format(
+            name, ", ".join(names()))) from None
+    return factory(pin_data, pin_clk, **kwargs)
@@ -0,0 +1,264 @@
+"""
+`hx711.calibration`
+====================================================
+
+Multi-point calibration for HX711 load cells, with profiles persisted to a
+compact fixed-record binary file so a board can boot straight into weighing.
+
+* Author(s): Erik Hess
+
+Usage:
+
+.. code-block:: python
+
+    cal = Calibration(hx)
+    cal.tare()                # Empty platform
+    cal.add(100.0)            # Reference weights, in whatever unit you weigh in
+    cal.add(500.0)
+    cal.add(1000.0)
+    profile = cal.fit(order=1)
+    print(profile.residuals)  # Fitted minus reference, per point
+
+    save_profile("/hx711.cal", profile, cell_id=0)
+
+    # ...and on the next boot
+    profile = load_profile("/hx711.cal", cell_id=0)
+    if profile:
+        profile.apply(hx)
+
+Writing the profile needs the filesystem to be writable from CircuitPython,
+e.g. `storage.remount("/", readonly=False)` in `boot.py`.
+"""
+
+import struct
+
+try:
+    # Only used for typing
+    from typing import List, Optional, Tuple
+except ImportError:
+    pass
+
+_MAGIC = b"HXCP"
+_FORMAT_VERSION = 1
+_HEADER = "<4sBBH"  # magic, format version, slots, record size
+_RECORD = "<8sBBHiffff"  # board id, order, points, revision, offset, scale, quadratic, rms, worst
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_RECORD_SIZE = struct.calcsize(_RECORD)
+_SLOTS = 8
+# CircuitPython's struct raises ValueError on a short buffer and has no struct.error
+_STRUCT_ERROR = getattr(struct, "error", ValueError)
+
+
+def board_id() -> bytes:
+    """8-byte ID of the board we're running on, zeros if it can't be read"""
+    try:
+        import microcontroller  # pylint: disable=import-outside-toplevel
+        uid = bytes(microcontroller.cpu.uid)
+    except (ImportError, AttributeError):
+        uid = b""
+    return (uid + bytes(8))[:8]
+
+
+def _solve(matrix: list, vector: list) -> list:
+    """Gaussian elimination with partial pivoting, for the tiny normal equations"""
+    size = len(vector)
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda row: abs(matrix[row][col]))
+        if matrix[pivot][col] == 0:
+            raise ValueError("Calibration points don't determine a fit, add more distinct weights")
+        matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+        vector[col], vector[pivot] = vector[pivot], vector[col]
+        for row in range(col + 1, size):
+            factor = matrix[row][col] / matrix[col][col]
+            for k in range(col, size):
+                matrix[row][k] -= factor * matrix[col][k]
+            vector[row] -= factor * vector[col]
+
+    result = [0.0] * size
+    for row in range(size - 1, -1, -1):
+        total = vector[row]
+        for k in range(row + 1, size):
+            total -= matrix[row][k] * result[k]
+        result[row] = total / matrix[row][row]
+    return result
+
+
+def fit_polynomial(points: List[Tuple[int, float]], order: int = 1) -> List[float]:
+    """Least-squares fit of weight = c0 + c1 * d + c2 * d**2 over (d, weight)
+    points, d being counts above the tare offset. Returns [c0, c1, c2].
+
+    Counts are normalized to +/-1 before fitting so the normal equations stay
+    well-conditioned in single-precision floats."""
+    if order not in (1, 2):
+        raise ValueError("Order must be 1 (line) or 2 (quadratic)")
+    if len(points) < order + 1:
+        raise ValueError("Need at least {} points for order {}".format(order + 1, order))
+
+    span = max(abs(d) for d, _ in points) or 1
+    terms = order + 1
+
+    matrix = [[0.0] * terms for _ in range(terms)]
+    vector = [0.0] * terms
+    for d, weight in points:
+        u = d / span
+        powers = [1.0, u, u * u][:terms]
+        for row in range(terms):
+            vector[row] += powers[row] * weight
+            for col in range(terms):
+                matrix[row][col] += powers[row] * powers[col]
+
+    coeffs = _solve(matrix, vector) + [0.0] * (3 - terms)
+    return [coeffs[0], coeffs[1] / span, coeffs[2] / (span * span)]
+
+
+class CalibrationProfile:
+    """Everything needed to turn raw counts into weight: weight = d / scale +
+    quadratic * d**2, with d = raw - offset"""
+
+    def __init__(
+        self,
+        offset: int,
+        scale: float,
+        quadratic: float = 0.0,
+        *,
+        order: int = 1,
+        residuals: Optional[List[float]] = None,
+        rms: float = 0.0,
+        worst: float = 0.0,
+        revision: int = 0
+    ):
+        self.offset = offset
+        self.scale = scale
+        self.quadratic = quadratic
+        self.order = order
+        self.residuals = residuals or []
+        self.rms = rms
+        self.worst = worst
+        self.revision = revision
+
+    def apply(self, hx) -> None:
+        hx.offset = self.offset
+        hx.scale = self.scale
+        hx.quadratic = self.quadratic
+
+    def to_weight(self, raw: int) -> float:
+        d = raw - self.offset
+        return d / self.scale + self.quadratic * d * d
+
+    def __repr__(self):
+        return "CalibrationProfile(offset={}, scale={}, quadratic={}, order={}, rms={}, rev={})".format(
+            self.offset, self.scale, self.quadratic, self.order, self.rms, self.revision)
+
+
+class Calibration:
+    """Collects (counts, weight) points from a driver and fits a profile"""
+
+    def __init__(self, hx, count: int = 50):
+        self.hx = hx
+        self.count = count
+        self.offset = hx.offset
+        self.points = []  # (counts above offset, reference weight)
+
+    def tare(self, count: int = None) -> int:
+        self.offset = self.hx.read_average(count or self.count)
+        return self.offset
+
+    def add(self, weight: float, count: int = None) -> int:
+        """Read the reference weight currently on the platform"""
+        raw = self.hx.read_average(count or self.count)
+        self.points.append((raw - self.offset, weight))
+        return raw
+
+    def fit(self, order: int = 1) -> CalibrationProfile:
+        # The empty platform is a point like any other
+        points = [(0, 0.0)] + self.points
+        c0, c1, c2 = fit_polynomial(points, order)
+
+        # Fold the intercept into the offset: shift d by the root of the fit nearest zero
+        if c2:
+            disc = c1 * c1 - 4 * c2 * c0
+            if disc < 0:
+                raise ValueError("Quadratic fit never crosses zero weight, check the reference weights")
+            root = disc ** 0.5
+            # 2*c0 / (-c1 -+ root) rather than (-c1 +- root) / (2*c2): with c2 tiny the
+            # latter cancels down to noise in single-precision floats
+            den = -c1 - root if c1 >= 0 else -c1 + root
+            shift = 2 * c0 / den if den else 0.0
+        elif c1:
+            shift = -c0 / c1
+        else:
+            raise ValueError("Fit doesn't change with load, check the reference weights")
+        offset = self.offset + round(shift)
+        shift = offset - self.offset
+        c1 += 2 * c2 * shift
+
+        profile = CalibrationProfile(offset, 1 / c1, c2, order=order)
+        profile.residuals = [profile.to_weight(d + self.offset) - weight for d, weight in points]
+        profile.rms = (sum(r * r for r in profile.residuals) / len(points)) ** 0.5
+        profile.worst = max(abs(r) for r in profile.residuals)
+        return profile
+
+
+def save_profile(path: str, profile: CalibrationProfile, cell_id: int = 0, board: bytes = None) -> None:
+    """Write the profile into `cell_id`'s fixed slot, creating the file if needed,
+    or starting it over if it's corrupt or truncated. The slot's revision counter
+    goes up by one on every save."""
+    if not 0 <= cell_id < _SLOTS:
+        raise ValueError("cell_id must be 0-{}".format(_SLOTS - 1))
+    if board is None:
+        board = board_id()
+
+    size = _HEADER_SIZE + _SLOTS * _RECORD_SIZE
+    try:
+        with open(path, "rb") as cal_file:
+            data = bytearray(cal_file.read())
+        _check_header(data)
+        if len(data) != size:
+            raise ValueError("Truncated HX711 calibration file")
+    except (OSError, ValueError, _STRUCT_ERROR):  # Missing or damaged, which load_profile() can't read either
+        data = bytearray(size)
+        struct.pack_into(_HEADER, data, 0, _MAGIC, _FORMAT_VERSION, _SLOTS, _RECORD_SIZE)
+
+    pos = _HEADER_SIZE + cell_id * _RECORD_SIZE
+    revision = struct.unpack_from(_RECORD, data, pos)[3]
+    profile.revision = (revision + 1) & 0xFFFF or 1
+    struct.pack_into(
+        _RECORD, data, pos,
+        board, profile.order, len(profile.residuals), profile.revision, profile.offset,
+        profile.scale, profile.quadratic, profile.rms, profile.worst)
+
+    with open(path, "wb") as cal_file:
+        cal_file.write(data)
+
+
+def load_profile(path: str, cell_id: int = 0, board: bytes = None) -> Optional[CalibrationProfile]:
+    """Read `cell_id`'s slot with one seek and one read. Returns None if there's
+    no file, it's corrupt or truncated, the slot was never written, or it was
+    written by another board."""
+    if not 0 <= cell_id < _SLOTS:
+        raise ValueError("cell_id must be 0-{}".format(_SLOTS - 1))
+    if board is None:
+        board = board_id()
+
+    try:
+        with open(path, "rb") as cal_file:
+            header = cal_file.read(_HEADER_SIZE)
+            _check_header(header)
+            cal_file.seek(_HEADER_SIZE + cell_id * _RECORD_SIZE)
+            record = cal_file.read(_RECORD_SIZE)
+        saved_board, order, points, revision, offset, scale, quadratic, rms, worst = struct.unpack(
+            _RECORD, record)
+    except (OSError, ValueError, _STRUCT_ERROR):
+        return None
+
+    if not revision or saved_board != board:
+        return None
+
+    return CalibrationProfile(
+        offset, scale, quadratic, order=order, rms=rms, worst=worst, revision=revision)
+
+
+def _check_header(data: bytes) -> None:
+    magic, version, slots, record_size = struct.unpack_from(_HEADER, data, 0)
+    if magic != _MAGIC or version != _FORMAT_VERSION or slots != _SLOTS or record_size != _RECORD_SIZE:
+        raise ValueError("Not a version {} HX711 calibration file".format(_FORMAT_VERSION))
@@ -0,0 +1,96 @@
+"""
+`hx711.decode`
+====================================================
+
+Conversion of the padded 32-bit words `hx711_read_code` pushes out of the
+PIO RX FIFO into signed 24-bit ADC counts.
+
+* Author(s): Erik Hess
+"""
+
+from micropython import const
+
+try:
+    # Only used for typing
+    from array import array
+except ImportError:
+    pass
+
+HX_MAX_VALUE = const(0x7FFFFF)
+PAD_MASK = const(0x00FFFFFF)
+COMPLMENT_MASK = const(0x1000000)
+
+
+def decode_word(word: int) -> int:
+    reading = word & PAD_MASK       # Mask out our pad bits
+
+    if reading > HX_MAX_VALUE:      # Handle two's compliment negative numbers
+        reading -= COMPLMENT_MASK
+
+    return reading
+
+
+def decode_into(words: array, counts: array, count: int = None) -> int:
+    """Decode `count` padded words from an array('I') into the caller's array('i')
+    in a single pass, returns the sum of the decoded counts.
+
+    Nothing is allocated per word, so averaging a burst costs one call."""
+    if count is None:
+        count = min(len(words), len(counts))
+
+    total = 0
+    for i in range(count):
+        reading = words[i] & PAD_MASK
+        if reading > HX_MAX_VALUE:
+            reading -= COMPLMENT_MASK
+        counts[i] = reading
+        total += reading
+
+    return total
+
+
+def decode_numpy(words):
+    """Host-side decode of a whole capture, returns an int32 ndarray.
+    Requires NumPy, so not for use on-device."""
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    aligned = numpy.asarray(words, dtype=numpy.uint32) & PAD_MASK
+    return (aligned ^ (HX_MAX_VALUE + 1)).astype(numpy.int32) - (HX_MAX_VALUE + 1)
+
+
+def frame_layout(channels: int) -> tuple:
+    """(pad bits, words per frame) for `channels` interleaved 24-bit readings,
+    front-padded so every frame fills a whole number of 32-bit words"""
+    data_bits = 24 * channels
+    pad = (32 - data_bits % 32) % 32
+    return pad, (data_bits + pad) // 32
+
+
+def demux_into(words: array, counts: array, channels: int, frames: int = 1) -> None:
+    """Split frames of the interleaved `in pins, N` bitstream back into signed
+    counts, counts[frame * channels + channel]. Each N-bit chunk holds one bit
+    per channel with the first data pin in its lowest bit, MSB-first per reading.
+
+    Pure index arithmetic over the caller's arrays, nothing is allocated."""
+    pad, frame_words = frame_layout(channels)
+    top = channels - 1
+
+    for frame in range(frames):
+        base = frame * frame_words
+        out = frame * channels
+
+        for channel in range(channels):
+            counts[out + channel] = 0
+
+        pos = pad
+        word = words[base]
+        for bit in range(24):
+            for channel in range(top, -1, -1):
+                if not pos & 31:
+                    word = words[base + (pos >> 5)]
+                counts[out + channel] = (counts[out + channel] << 1) | ((word >> (31 - (pos & 31))) & 1)
+                pos += 1
+
+        for channel in range(out, out + channels):
+            if counts[channel] > HX_MAX_VALUE:
+                counts[channel] -= COMPLMENT_MASK
@@ -0,0 +1,165 @@
+"""
+`hx711.drift`
+====================================================
+
+Temperature compensation for the zero offset. A load cell's zero (and the
+HX711's front end with it) moves with temperature, so a tare taken in a cold
+room is off by the time it warms up. `DriftModel` learns offset vs.
+temperature from the tares it's shown. `HX711.to_weight()` then shifts the
+offset by the drift fitted between the last tare's temperature and now, so
+fewer re-tares are needed to hold zero.
+
+.. code-block:: python
+
+    import microcontroller
+
+    hx.compensate_drift(lambda: microcontroller.cpu.temperature)
+    hx.tare()  # Every tare is also a point for the model
+
+    # ...hours later, a few degrees warmer
+    print(hx.read(10), hx.drift_offset())
+
+Only empty-platform tares should teach the model, since a tare with a load
+on looks like a huge drift. The RP2040's die sensor reads the chip rather
+than the cell, lagging the room and running a little warm, but it's already
+on the board. Anything callable returning degrees C will do.
+
+The model is fitted on a host the same way, from a recorded session:
+
+.. code-block:: python
+
+    session = recorder.read_session("session.hxl")
+    model = drift.fit_session(session)  # From the tares logged in it
+    print(model.slope(), model.residuals())
+
+* Author(s): Erik Hess
+"""
+
+from .calibration import fit_polynomial
+
+try:
+    # Only used for typing
+    from typing import List, Tuple
+except ImportError:
+    pass
+
+
+class DriftModel:
+    """Least-squares fit of offset = c0 + c1 * u + c2 * u**2, with u the
+    temperature less the mean of the points, over the last `max_points`
+    (temperature, offset) points. Old points age out, so slow creep of the
+    cell doesn't get mistaken for temperature drift.
+
+    Until the points span `min_span` degrees the model isn't `fitted` and
+    predicts no drift at all."""
+
+    def __init__(self, order: int = 1, max_points: int = 16, min_span: float = 2.0):
+        if order not in (1, 2):
+            raise ValueError("Order must be 1 (line) or 2 (quadratic)")
+        if max_points < order + 1:
+            raise ValueError("max_points must be at least {} for order {}".format(order + 1, order))
+
+        self.order = order
+        self.max_points = max_points
+        self.min_span = min_span
+        self.points = []  # (degrees C, offset counts), oldest first
+        self.center = 0.0
+        self.coeffs = [0.0, 0.0, 0.0]
+        self.fitted = False
+
+    def add(self, temperature: float, offset: int) -> bool:
+        """Add a tare taken at `temperature` and refit. Returns `fitted`."""
+        self.points.append((temperature, offset))
+        if len(self.points) > self.max_points:
+            self.points.pop(0)
+        return self.fit()
+
+    def reset(self) -> None:
+        self.points = []
+        self.coeffs = [0.0, 0.0, 0.0]
+        self.fitted = False
+
+    def span(self) -> float:
+        """Degrees between the coldest and warmest point"""
+        if not self.points:
+            return 0.0
+        temperatures = [temperature for temperature, _ in self.points]
+        return max(temperatures) - min(temperatures)
+
+    def fit(self) -> bool:
+        points = self.points
+        self.fitted = len(points) > self.order and self.span() >= self.min_span
+        if not self.fitted:
+            self.coeffs = [0.0, 0.0, 0.0]
+            return False
+
+        self.center = sum(temperature for temperature, _ in points) / len(points)
+        self.coeffs = fit_polynomial(
+            [(temperature - self.center, offset) for temperature, offset in points], self.order)
+        return True
+
+    def offset_at(self, temperature: float) -> float:
+        """Fitted zero at `temperature`, counts"""
+        c0, c1, c2 = self.coeffs
+        u = temperature - self.center
+        return c0 + c1 * u + c2 * u * u
+
+    def shift(self, from_temperature: float, to_temperature: float) -> float:
+        """Counts the zero moves by between the two temperatures, 0 until fitted"""
+        if not self.fitted or from_temperature is None or to_temperature is None:
+            return 0.0
+        if from_temperature != from_temperature or to_temperature != to_temperature:
+            return 0.0  # NaN, e.g. replaying a log without temperatures
+        return self.offset_at(to_temperature) - self.offset_at(from_temperature)
+
+    def slope(self, temperature: float = None) -> float:
+        """Drift in counts per degree, at the points' mean temperature by default"""
+        _, c1, c2 = self.coeffs
+        u = 0.0 if temperature is None else temperature - self.center
+        return c1 + 2 * c2 * u
+
+    def residuals(self) -> List[float]:
+        """Fitted minus tared offset, per point"""
+        return [self.offset_at(temperature) - offset for temperature, offset in self.points]
+
+
+def tare_points(session) -> List[Tuple[float, int]]:
+    """(temperature, offset) for every tare in a `recorder.Session`, found
+    where the logged offset changes. Readings without a temperature are skipped."""
+    points = []
+    offsets = session.offsets
+    temperatures = session.temperatures
+    last = None
+    for i in range(len(session)):
+        offset = offsets[i]
+        if offset != last and temperatures[i] == temperatures[i]:  # NaN when none was logged
+            points.append((temperatures[i], offset))
+        last = offset
+    return points
+
+
+def empty_points(session, step: float = 0.5) -> List[Tuple[float, int]]:
+    """(temperature, mean count) per `step` degree bin of a session logged
+    with nothing on the platform, e.g. left overnight to characterize a cell"""
+    bins = {}
+    counts = session.counts
+    temperatures = session.temperatures
+    for i in range(len(session)):
+        temperature = temperatures[i]
+        if temperature != temperature:
+            continue
+        key = round(temperature / step)
+        total, n = bins.get(key, (0, 0))
+        bins[key] = (total + counts[i], n + 1)
+    return [(key * step, total // n) for key, (total, n) in sorted(bins.items())]
+
+
+def fit_session(session, order: int = 1, empty: bool = False, min_span: float = 2.0) -> DriftModel:
+    """Fit a model to a recorded session: from its tares, or with `empty`
+    from every reading of an empty-platform session"""
+    points = empty_points(session) if empty else tare_points(session)
+    model = DriftModel(order, max_points=max(len(points), order + 1), min_span=min_span)
+    for temperature, offset in points:
+        model.points.append((temperature, offset))
+    model.fit()
+    return model
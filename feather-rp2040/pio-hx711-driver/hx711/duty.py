@@ -0,0 +1,176 @@
+"""
+`hx711.duty`
+====================================================
+
+Duty-cycled sampling for battery-powered scales: the HX711 is powered down
+between short bursts of readings, instead of converting (and drawing ~1.5 mA)
+all the time.
+
+.. code-block:: python
+
+    duty = hx.duty_cycle(interval=30, burst=4)
+
+    while True:
+        if duty.poll():
+            print(hx.to_weight(duty.reading))
+        # ...other work, or light sleep for duty.time_to_wake()
+
+* Author(s): Erik Hess
+"""
+
+import time
+from micropython import const
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None  # Only needed for read_async()
+
+HX_ACTIVE_MA = 1.5  # Supply current while converting, per the datasheet
+HX_POWER_DOWN_MA = 0.001  # ...and powered down
+
+_ASLEEP = const(0)
+_AWAKE = const(1)
+_STOPPED = const(2)
+
+
+class DutyCycle:
+    """Wakes the HX711 every `interval` seconds, drops the first `discard`
+    conversions while its output settles, averages the next `burst` into
+    `reading` and powers it down again.
+
+    `poll()` never blocks, so it can share a loop with a UI. Between bursts the
+    driver's `read*()` methods time out, the chip is off."""
+
+    def __init__(self, hx, interval: float, burst: int = 4, discard: int = 1):
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.hx = hx
+        self.interval = interval
+        self.burst = burst
+        self.discard = discard
+
+        self.reading = None  # Average raw count of the latest burst
+        self.bursts = 0
+        self.conversions = 0  # Everything read while awake, discards included
+        self.discarded = 0
+        self.awake_ns = 0
+
+        self._state = _STOPPED
+        self._interval_ns = int(interval * 1000000000)
+        self._next_wake_ns = 0
+        self._woke_ns = 0
+        self._started_ns = 0
+        self._skip = 0
+        self._total = 0
+        self._taken = 0
+
+    def start(self) -> None:
+        """Power down now, first burst right away"""
+        if self.hx.powered:
+            self.hx.power_off()
+        self._started_ns = self._next_wake_ns = time.monotonic_ns()
+        self._state = _ASLEEP
+
+    def stop(self) -> None:
+        """Leave the HX711 powered and converting, as before `start()`"""
+        if self._state == _AWAKE:
+            self.awake_ns += time.monotonic_ns() - self._woke_ns
+        if not self.hx.powered:
+            self.hx.power_on()
+        self._state = _STOPPED
+
+    def time_to_wake(self) -> float:
+        """Seconds until the next burst starts, 0 while one is running"""
+        if self._state != _ASLEEP:
+            return 0
+        return max(0, self._next_wake_ns - time.monotonic_ns()) / 1000000000
+
+    def poll(self) -> bool:
+        """Move the burst along without blocking, True when `reading` is new"""
+        hx = self.hx
+        now = time.monotonic_ns()
+
+        if self._state == _ASLEEP:
+            if now < self._next_wake_ns:
+                return False
+            hx.power_on(discard=0)
+            self._woke_ns = now
+            self._skip = self.discard
+            self._total = 0
+            self._taken = 0
+            self._state = _AWAKE
+        elif self._state == _STOPPED:
+            return False
+
+        while hx.is_ready():
+            raw = hx.read_raw(clear_fifo=False)
+            self.conversions += 1
+            if self._skip:
+                self._skip -= 1
+                self.discarded += 1
+                continue
+
+            self._total += raw
+            self._taken += 1
+            if self._taken == self.burst:
+                return self._finish()
+
+        return False
+
+    def _finish(self) -> bool:
+        self.hx.power_off()
+        now = time.monotonic_ns()
+        self.awake_ns += now - self._woke_ns
+        self.reading = self._total // self.burst
+        self.bursts += 1
+
+        # Keep to the interval grid, skipping slots if a burst overran one
+        next_wake = self._next_wake_ns + self._interval_ns
+        if next_wake <= now:
+            next_wake += (now - next_wake) // self._interval_ns * self._interval_ns + self._interval_ns
+        self._next_wake_ns = next_wake
+        self._state = _ASLEEP
+        return True
+
+    def read(self) -> float:
+        """Sleep until the next burst, run it and return the weight"""
+        while not self.poll():
+            wait = self.time_to_wake()
+            if wait:
+                time.sleep(wait)
+        return self.hx.to_weight(self.reading)
+
+    async def read_async(self) -> float:
+        while not self.poll():
+            await asyncio.sleep(self.time_to_wake())
+        return self.hx.to_weight(self.reading)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since `start()`"""
+        return (time.monotonic_ns() - self._started_ns) / 1000000000
+
+    @property
+    def awake(self) -> float:
+        """Seconds the HX711 has been powered since `start()`"""
+        awake_ns = self.awake_ns
+        if self._state == _AWAKE:
+            awake_ns += time.monotonic_ns() - self._woke_ns
+        return awake_ns / 1000000000
+
+    @property
+    def awake_fraction(self) -> float:
+        elapsed = self.elapsed
+        return self.awake / elapsed if elapsed else 1.0
+
+    @property
+    def conversions_per_hour(self) -> float:
+        elapsed = self.elapsed
+        return self.conversions * 3600 / elapsed if elapsed else 0.0
+
+    def average_current_ma(self, active_ma: float = HX_ACTIVE_MA, sleep_ma: float = HX_POWER_DOWN_MA) -> float:
+        """The HX711's average supply current so far, the rest of the board not included"""
+        awake = self.awake_fraction
+        return awake * active_ma + (1 - awake) * sleep_ma
@@ -0,0 +1,195 @@
+"""
+`hx711.filters`
+====================================================
+
+Streaming filters for HX711 readings. Every stage works on raw integer counts
+one sample at a time, keeps its history in fixed-size arrays allocated up
+front, and can be chained with `FilterChain`.
+
+* Author(s): Erik Hess
+
+Usage:
+
+.. code-block:: python
+
+    hx.filters = FilterChain(OutlierFilter(9), MedianFilter(5), EMAFilter(2))
+    weight = hx.read_filtered(8)
+"""
+
+import array
+
+
+class _SortedWindow:
+    """Ring of the last `size` samples plus a sorted copy of them, so the median
+    and MAD are available without sorting. Cost per sample is bounded by `size`."""
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("Window size must be at least 1")
+
+        self.size = size
+        self._ring = array.array('i', [0] * size)
+        self._sorted = array.array('i', [0] * size)
+        self._head = 0
+        self.count = 0
+
+    def reset(self) -> None:
+        self._head = 0
+        self.count = 0
+
+    def _bisect(self, value: int) -> int:
+        ordered = self._sorted
+        low = 0
+        high = self.count
+        while low < high:
+            mid = (low + high) >> 1
+            if ordered[mid] < value:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def push(self, value: int) -> None:
+        ordered = self._sorted
+        count = self.count
+
+        if count == self.size:  # Drop the oldest sample from the sorted copy
+            idx = self._bisect(self._ring[self._head])
+            for i in range(idx, count - 1):
+                ordered[i] = ordered[i + 1]
+            count -= 1
+
+        self.count = count
+        idx = self._bisect(value)
+        for i in range(count, idx, -1):
+            ordered[i] = ordered[i - 1]
+        ordered[idx] = value
+        self.count = count + 1
+
+        self._ring[self._head] = value
+        self._head = (self._head + 1) % self.size
+
+    def median(self) -> int:
+        return self._sorted[self.count >> 1]
+
+    def mad(self) -> int:
+        """Median absolute deviation, merged outward from the median in O(size)"""
+        ordered = self._sorted
+        count = self.count
+        mid = count >> 1
+        med = ordered[mid]
+
+        left = mid - 1
+        right = mid + 1
+        deviation = 0
+        for i in range(mid):  # The mid-th smallest deviation (the first one is zero)
+            if left < 0:
+                deviation = ordered[right] - med
+                right += 1
+            elif right >= count or med - ordered[left] <= ordered[right] - med:
+                deviation = med - ordered[left]
+                left -= 1
+            else:
+                deviation = ordered[right] - med
+                right += 1
+        return deviation
+
+
+class MedianFilter:
+    """Running median over the last `window` samples, odd windows work best"""
+
+    def __init__(self, window: int = 5):
+        self._window = _SortedWindow(window)
+        self.value = None
+
+    def reset(self) -> None:
+        self._window.reset()
+        self.value = None
+
+    def update(self, value: int) -> int:
+        self._window.push(value)
+        self.value = self._window.median()
+        return self.value
+
+
+class EMAFilter:
+    """Exponential moving average with alpha = 1 / 2**shift, integer math only.
+    The state keeps `shift` extra fractional bits so small steps aren't lost."""
+
+    def __init__(self, shift: int = 2):
+        if shift < 0:
+            raise ValueError("Shift must be positive")
+
+        self.shift = shift
+        self._state = None
+        self.value = None
+
+    def reset(self) -> None:
+        self._state = None
+        self.value = None
+
+    def update(self, value: int) -> int:
+        if self._state is None:
+            self._state = value << self.shift
+        else:
+            self._state += value - (self._state >> self.shift)
+        self.value = self._state >> self.shift
+        return self.value
+
+
+class OutlierFilter:
+    """Rejects samples further than `threshold` MADs from the running median of the
+    last `window` samples and passes that median on instead. Every sample still
+    enters the window, so a real load change is accepted once it makes up half of it.
+
+    `min_deviation` keeps a perfectly quiet signal (MAD of 0) from rejecting
+    every single count of noise."""
+
+    def __init__(self, window: int = 9, threshold: int = 5, min_deviation: int = 8):
+        self._window = _SortedWindow(window)
+        self.threshold = threshold
+        self.min_deviation = min_deviation
+        self.rejected = 0
+        self.value = None
+
+    def reset(self) -> None:
+        self._window.reset()
+        self.rejected = 0
+        self.value = None
+
+    def update(self, value: int) -> int:
+        window = self._window
+        if window.count < 3:
+            window.push(value)
+            self.value = value
+            return value
+
+        med = window.median()
+        limit = max(window.mad(), self.min_deviation) * self.threshold
+        window.push(value)
+
+        if abs(value - med) > limit:
+            self.rejected += 1
+            self.value = med
+        else:
+            self.value = value
+        return self.value
+
+
+class FilterChain:
+    """Feeds each sample through every stage in order"""
+
+    def __init__(self, *stages):
+        self.stages = stages
+        self.value = None
+
+    def reset(self) -> None:
+        for stage in self.stages:
+            stage.reset()
+        self.value = None
+
+    def update(self, value: int) -> int:
+        for stage in self.stages:
+            value = stage.update(value)
+        self.value = value
+        return value
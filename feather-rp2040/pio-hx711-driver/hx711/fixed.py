@@ -0,0 +1,68 @@
+"""
+`hx711.fixed`
+====================================================
+
+Integer-only scale conversion for boards without an FPU (SAMD21, RP2040).
+On CircuitPython every float is a heap object, so `(raw - offset) / scale`
+allocates on every reading. Here the scale is a Q16.16 multiplier turning
+counts into hundredths (or 10**-decimals) of a unit. The multiply is split
+so no intermediate leaves the 31-bit small-int range, and nothing is
+allocated until the value is formatted for display.
+
+.. code-block:: python
+
+    hx.fixed_point(decimals=2)
+    centigrams = hx.read_fixed(10)
+    label.text = format_fixed(centigrams, 2) + " g"
+
+* Author(s): Erik Hess
+"""
+
+from micropython import const
+
+Q16_ONE = const(0x10000)
+MAX_MULTIPLIER = const(0x20000)  # Keeps both partial products under 2**29
+MAX_COUNTS = const(0xFFFFFF)  # |raw - offset| for 24-bit readings
+
+
+def q16_multiplier(scale: float, decimals: int = 2) -> int:
+    """Q16.16 multiplier from counts to 10**-decimals units, for counts-per-unit `scale`"""
+    if decimals < 0:
+        raise ValueError("decimals can't be negative")
+    if not scale:
+        raise ValueError("scale can't be zero")
+
+    multiplier = round(10 ** decimals * Q16_ONE / abs(scale))
+    if multiplier >= MAX_MULTIPLIER:
+        raise ValueError("Scale {} is too small for {} decimals in fixed point".format(scale, decimals))
+    if multiplier == 0:
+        raise ValueError("Scale {} is too large for {} decimals in fixed point".format(scale, decimals))
+    return -multiplier if scale < 0 else multiplier
+
+
+def mul_q16(counts: int, multiplier: int) -> int:
+    """round(counts * multiplier / 65536), half away from zero. Every
+    intermediate stays a small int for |counts| <= MAX_COUNTS and
+    |multiplier| < MAX_MULTIPLIER."""
+    negative = (counts < 0) != (multiplier < 0)
+    if counts < 0:
+        counts = -counts
+    if multiplier < 0:
+        multiplier = -multiplier
+
+    # counts * multiplier = high * 2**12 + low, and high * 2**12 = (high >> 4) * 2**16 + (high & 0xF) * 2**12
+    high = (counts >> 12) * multiplier
+    low = (counts & 0xFFF) * multiplier
+    result = (high >> 4) + ((((high & 0xF) << 12) + low + 0x8000) >> 16)
+    return -result if negative else result
+
+
+def format_fixed(value: int, decimals: int = 2) -> str:
+    """`value` 10**-decimals units as a decimal string, e.g. -1234 -> "-12.34" """
+    if not decimals:
+        return str(value)
+    sign = "-" if value < 0 else ""
+    if value < 0:
+        value = -value
+    unit = 10 ** decimals
+    return "{}{}.{}".format(sign, value // unit, str(value % unit + unit)[1:])
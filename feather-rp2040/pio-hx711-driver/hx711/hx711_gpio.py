@@ -1,9 +1,13 @@
 import time
 from digitalio import DigitalInOut
 from micropython import const
-from . import HX711
+from . import HX711, asyncio
+from .decode import decode_word
 
 HX_DATA_BITS = const(24)
+HX_POWER_DOWN_S = 0.0001  # SCK high for more than 60 us powers the HX711 down
+HX_SPIN_GUARD_NS = const(2000000)  # Stop sleeping this long before DOUT is predicted to fall
+HX_PERIODS_NS = (12500000, 100000000)  # 80 and 10 SPS, the only rates RATE can pick
 
 class HX711_GPIO(HX711):
 
@@ -16,8 +20,12 @@ class HX711_GPIO(HX711):
             offset: int = 0,
             scale: int = 1,
             tare: bool = False,
+            ready_timeout: float = 1.0,
         ):
 
+        self.ready_timeout = ready_timeout
+        self._last_ready_ns = None  # When DOUT was last seen falling
+        self._period_ns = None      # Conversion period, learned from DOUT falling edges
 
         self._pin_data = pin_data
         self._pin_data.switch_to_input()
@@ -36,9 +44,98 @@ class HX711_GPIO(HX711):
             self._pin_clk.value = True
             self._pin_clk.value = False
 
-    def read_raw(self) -> int:
-        while self._pin_data.value:
-            time.sleep(0.01)
+    def is_ready(self) -> bool:
+        return not self._pin_data.value
+
+    def _power_down(self) -> None:
+        self._pin_clk.value = True
+        time.sleep(HX_POWER_DOWN_S)
+
+    def _power_up(self) -> None:
+        self._pin_clk.value = False
+        self._last_ready_ns = None  # Conversions restart on a new phase
+        self._period_ns = None
+
+    def _predicted_wake_ns(self, now: int):
+        """When to stop sleeping and start watching DOUT, None if not known yet"""
+        last = self._last_ready_ns
+        period = self._period_ns
+        if last is None or period is None:
+            return None
+        return last + period * ((now - last) // period + 1) - HX_SPIN_GUARD_NS
+
+    def _saw_ready(self, ready: int) -> None:
+        """Record a falling edge seen by spinning on DOUT"""
+        last = self._last_ready_ns
+        period = self._period_ns
+        if last is not None:
+            interval = ready - last
+            if period is None:
+                # The first interval could span a pause between reads, so only
+                # take it if it looks like one conversion at 10 or 80 SPS
+                for nominal in HX_PERIODS_NS:
+                    if abs(interval - nominal) < nominal >> 2:
+                        self._period_ns = interval
+            elif interval < period:  # Intervals spanning missed conversions only run long
+                self._period_ns = interval
+            elif interval < period + (period >> 2):
+                self._period_ns = (3 * period + interval) >> 2
+        self._last_ready_ns = ready
+
+    def wait_ready(self, timeout: float = None) -> None:
+        """Block until DOUT falls. Sleeps through most of the conversion period
+        predicted from previous edges, then spins on the pin for the last couple
+        of milliseconds, so a read starts within one pin poll of the edge."""
+        pin = self._pin_data
+        if not pin.value:
+            self._last_ready_ns = None  # Already waiting for us, we can't know when it fell
+            return
+
+        if timeout is None:
+            timeout = self.ready_timeout
+
+        now = time.monotonic_ns()
+        deadline = now + int(timeout * 1000000000)
+
+        wake = self._predicted_wake_ns(now)
+        if wake is not None and now < wake < deadline:
+            time.sleep((wake - now) / 1000000000)
+            if not pin.value:
+                self._last_ready_ns = None  # Woke late, it fell somewhere in the sleep
+                return
+
+        while pin.value:
+            if time.monotonic_ns() > deadline:
+                raise RuntimeError("HX711 not ready after {} s".format(timeout))
+
+        self._saw_ready(time.monotonic_ns())
+
+    async def wait_ready_async(self, timeout: float = None) -> None:
+        pin = self._pin_data
+        if not pin.value:
+            self._last_ready_ns = None
+            return
+
+        now = time.monotonic_ns()
+        wake = self._predicted_wake_ns(now)
+        if wake is not None and wake > now:
+            await asyncio.sleep((wake - now) / 1000000000)
+            if not pin.value:
+                self._last_ready_ns = None
+                return
+
+        await super().wait_ready_async(timeout)
+        # Pinned down to one pass of the event loop, which yields between polls
+        self._saw_ready(time.monotonic_ns())
+
+    def read_raw_if_ready(self):
+        """Reading if a conversion is waiting, otherwise None right away"""
+        if self._pin_data.value:
+            return None
+        return self.read_raw()
+
+    def read_raw(self, clear_fifo: bool = True) -> int:  # No FIFO to clear when bit-banging
+        self.wait_ready()
 
         raw_reading = 0
         for i in range(HX_DATA_BITS):
@@ -48,5 +145,5 @@ class HX711_GPIO(HX711):
         
         self._gain_pulse(self.gain)
 
-        return raw_reading
-        
+        return decode_word(raw_reading)
+
@@ -1,9 +1,11 @@
+import time
 import rp2pio
 import adafruit_pioasm
 import array
 from digitalio import DigitalInOut
 from micropython import const
 from . import HX711
+from .decode import decode_word, decode_into, HX_MAX_VALUE, PAD_MASK, COMPLMENT_MASK
 
 hx711_read_code = """
 set x, {0}      ; number of cycles for post-readout gain setting
@@ -33,10 +35,8 @@ gainloop:       ; gain set, 1 pulse for default gain
 
 HX_DATA_BITS = const(24)
 HX_INIT_DELAY = const(10)
-
-HX_MAX_VALUE = const(0x7FFFFF)
-PAD_MASK = const(0x00FFFFFF)
-COMPLMENT_MASK = const(0x1000000)
+HX_RX_FIFO_DEPTH = const(8)  # RX-only programs get a joined 8-word FIFO
+HX_POWER_DOWN_S = 0.0001  # SCK high for more than 60 us powers the HX711 down
 
 class HX711_PIO(HX711):
 
@@ -53,10 +53,20 @@ class HX711_PIO(HX711):
         ):
 
         self._buffer = array.array('I', [0])
+        self._words = None   # Burst buffers for read_average(), sized on first use
+        self._counts = None
+
+        self._ring = None  # Streaming ring buffer, only allocated by stream_start()
+        self._ring_head = 0
+        self._ring_count = 0
+        self.stream_dropped = 0
+        self.stream_overflows = 0
 
         self._pin_data = pin_data
         self._pin_clk = pin_clk
         self._pio_freq = pio_freq
+        self._pioasm_clk_high = adafruit_pioasm.assemble("set pins, 1")  # For power_off()/power_on()
+        self._pioasm_clk_low = adafruit_pioasm.assemble("set pins, 0")
 
         self.sm_init(gain)
 
@@ -79,16 +89,157 @@ class HX711_PIO(HX711):
         )
 
     def sm_deinit(self) -> None:
+        self.stream_stop()
         self._sm.deinit()
 
-    def read_raw(self, clear_fifo = True) -> int:
-        if clear_fifo:
+    def _power_down(self) -> None:
+        """Stop the state machine where it is, then have it raise SCK. Nothing
+        is re-assembled or re-allocated, and a running stream keeps its ring."""
+        sm = self._sm
+        sm.stop()
+        sm.run(self._pioasm_clk_high)
+        time.sleep(HX_POWER_DOWN_S)
+
+    def _power_up(self) -> None:
+        sm = self._sm
+        sm.run(self._pioasm_clk_low)
+        sm.clear_rxfifo()
+        sm.restart()  # Back to the top of the program, a half-shifted word is dropped
+
+    @property
+    def streaming(self) -> bool:
+        return self._ring is not None
+
+    def stream_start(self, size: int = 64) -> None:
+        """Keep the state machine free-running and buffer every reading in a ring
+        of `size` raw words. Call `samples_available()` or `stream_poll()` at least
+        once per FIFO's worth of conversions (100 ms at 80 SPS) to avoid stalls."""
+        if size < HX_RX_FIFO_DEPTH:
+            raise ValueError("Ring size must be at least {}".format(HX_RX_FIFO_DEPTH))
+
+        self._ring = array.array('I', [0] * size)
+        self._ring_head = 0
+        self._ring_count = 0
+        self.stream_dropped = 0
+        self.stream_overflows = 0
+        self._sm.clear_rxfifo()
+
+    def stream_stop(self) -> None:
+        self._ring = None
+        self._ring_head = 0
+        self._ring_count = 0
+
+    def stream_poll(self) -> int:
+        """Drain the RX FIFO into the ring without blocking, returns words drained"""
+        ring = self._ring
+        sm = self._sm
+        size = len(ring)
+
+        waiting = sm.in_waiting
+        if waiting:
+            head = self._ring_head
+            end = head + waiting
+            if end > size:
+                sm.readinto(ring, start=head, end=size)
+                end -= size
+                sm.readinto(ring, start=0, end=end)
+            else:
+                sm.readinto(ring, start=head, end=end)
+            self._ring_head = end % size
+
+            count = self._ring_count + waiting
+            if count > size:                           # Consumer fell behind, oldest words overwritten
+                self.stream_dropped += count - size
+                count = size
+            self._ring_count = count
+
+        if sm.rxstall:                                 # FIFO filled up and the SM missed conversions
+            self.stream_overflows += 1
+            sm.clear_rxfifo()
+
+        return waiting
+
+    def samples_available(self) -> int:
+        self.stream_poll()
+        return self._ring_count
+
+    def _wait_samples(self, count: int) -> None:
+        """Wait for `count` words in the ring, giving up if no new conversion
+        turns up for `ready_timeout` seconds"""
+        if count > len(self._ring):
+            raise ValueError("Can't wait for {} samples in a ring of {}".format(count, len(self._ring)))
+
+        timeout = self.ready_timeout
+        available = self.samples_available()
+        deadline = time.monotonic() + timeout
+        while available < count:
+            now = time.monotonic()
+            waiting = self.samples_available()
+            if waiting > available:
+                available = waiting
+                deadline = now + timeout
+            elif now > deadline:
+                raise RuntimeError("HX711 not ready after {} s".format(timeout))
+
+    def read_into(self, buf: array.array, end: int = None) -> int:
+        """Move up to len(buf) (or end) buffered raw words into buf, oldest first,
+        without blocking. Use `decode_into()` to turn them into signed counts."""
+        self.stream_poll()
+
+        ring = self._ring
+        size = len(ring)
+        if end is None:
+            end = len(buf)
+        count = min(end, self._ring_count)
+        tail = (self._ring_head - self._ring_count) % size
+
+        for i in range(count):
+            buf[i] = ring[tail]
+            tail += 1
+            if tail == size:
+                tail = 0
+
+        self._ring_count -= count
+        return count
+
+    def is_ready(self) -> bool:
+        if self._ring is not None:
+            return self.samples_available() > 0
+        return self._sm.in_waiting > 0
+
+    def discard_pending(self) -> None:
+        if self._ring is not None:
+            self.stream_poll()
+            self._ring_count = 0
+        else:
             self._sm.clear_rxfifo()
 
-        self._sm.readinto(self._buffer)
-        reading_aligned = self._buffer[0] & PAD_MASK   # Mask out our pad bits
-        
-        if reading_aligned > HX_MAX_VALUE:             # Handle two's compliment negative numbers
-            reading_aligned -= COMPLMENT_MASK
-
-        return reading_aligned
\ No newline at end of file
+    def read_raw(self, clear_fifo = True) -> int:
+        if clear_fifo:
+            self.discard_pending()
+
+        if self._ring is not None:
+            self.wait_ready()
+            self.read_into(self._buffer)
+        else:
+            if not self._sm.in_waiting:
+                self.wait_ready()
+            self._sm.readinto(self._buffer)
+
+        return decode_word(self._buffer[0])
+
+    def read_average(self, count: int = 10) -> int:
+        words = self._words
+        if words is None or len(words) < count:
+            words = self._words = array.array('I', [0] * count)
+            self._counts = array.array('i', [0] * count)
+
+        if self._ring is not None:
+            self._wait_samples(count)
+            self.read_into(words, count)
+        else:
+            if not self._sm.in_waiting:
+                self.wait_ready()  # Don't block forever in readinto() on a dead cell
+            self._sm.readinto(words, end=count)
+
+        return decode_into(words, self._counts, count) // count
\ No newline at end of file
@@ -0,0 +1,173 @@
+import time
+import rp2pio
+import adafruit_pioasm
+import array
+from digitalio import DigitalInOut
+from micropython import const
+from .decode import frame_layout, demux_into
+from .hx711_pio import HX_POWER_DOWN_S
+
+hx711_multi_read_code = """
+set x, {0}      ; number of cycles for post-readout gain setting
+mov osr, x      ; put the gain into osr for safe keeping
+set y, {1}      ; number of data bits, 0-start
+{2}
+{3}
+mov x, osr      ; set up our gain loop counter, also delays first clock edge by a full cycle
+
+bitloop:        ; read in one bit from every channel at once
+    set pins, 1 [3]
+    set pins, 0 [1]
+    in pins, {4}
+    jmp y-- bitloop
+
+gainloop:       ; gain set, 1 pulse for default gain
+    set pins, 1 [3]
+    set pins, 0
+    jmp x-- gainloop
+"""
+
+HX_DATA_BITS = const(24)
+# `in pins, N` autopushes at 32 bits, so N has to divide 32 or the ISR shift
+# count saturates partway through a chunk and drops bits
+HX_CHANNEL_COUNTS = (1, 2, 4, 8)
+
+
+class HX711_PIO_Multi:
+    """Several HX711s sharing one SCK pin, read by a single state machine.
+
+    DOUT pins must be consecutive GPIOs starting at `first_pin_data`, and there
+    can be 1, 2, 4 or 8 of them. Every
+    conversion clocks all channels in lock-step, so readings from the same frame
+    were sampled at the same instant."""
+
+    def __init__(
+            self,
+            first_pin_data: DigitalInOut,
+            pin_clk: DigitalInOut,
+            *,
+            channels: int = 4,
+            gain: int = 1,
+            offsets: list = None,
+            scales: list = None,
+            tare: bool = False,
+            pio_freq: int = 4000000
+        ):
+
+        if channels not in HX_CHANNEL_COUNTS:
+            raise ValueError("channels must be 1, 2, 4 or 8")
+        if gain < 1 or gain > 3:
+            raise ValueError()
+
+        self.channels = channels
+        self.gain = gain
+        self.offsets = offsets if offsets else [0] * channels
+        self.scales = scales if scales else [1] * channels
+
+        self._pad, self._frame_words = frame_layout(channels)
+        self._words = array.array('I', [0] * self._frame_words)
+        self._counts = array.array('i', [0] * channels)
+
+        self._pin_data = first_pin_data
+        self._pin_clk = pin_clk
+        self._pio_freq = pio_freq
+        self._pioasm_clk_high = adafruit_pioasm.assemble("set pins, 1")  # For power_off()/power_on()
+        self._pioasm_clk_low = adafruit_pioasm.assemble("set pins, 0")
+        self.powered = True
+
+        self.sm_init(gain)
+
+        if tare:
+            self.read_raw_into(self._counts)  # Pull a reading to avoid first-read issues
+            self.tare()
+
+    def sm_init(self, gain: int) -> None:
+        pad_code = "in null, {}   ; front-pad so frames end on a word boundary".format(
+            self._pad) if self._pad else ""
+        wait_code = "\n".join(
+            "wait 0 pin {}".format(pin) for pin in range(self.channels))
+
+        self._pioasm_read = adafruit_pioasm.assemble(
+            hx711_multi_read_code.format(
+                gain - 1, HX_DATA_BITS - 1, pad_code, wait_code, self.channels))
+
+        self._sm = rp2pio.StateMachine(
+            self._pioasm_read,
+            frequency=self._pio_freq,
+            first_in_pin=self._pin_data,
+            in_pin_count=self.channels,
+            first_set_pin=self._pin_clk,
+            set_pin_count=1,
+            in_shift_right=False,
+            push_threshold=32,
+            auto_push=True
+        )
+
+    def sm_deinit(self) -> None:
+        self._sm.deinit()
+
+    def power_off(self) -> None:
+        """Power down every HX711 on the shared SCK"""
+        sm = self._sm
+        sm.stop()
+        sm.run(self._pioasm_clk_high)
+        time.sleep(HX_POWER_DOWN_S)
+        self.powered = False
+
+    def power_on(self) -> None:
+        """Wake every HX711 and drop the first frame, taken while the outputs
+        settle (and at the reset gain)"""
+        sm = self._sm
+        sm.run(self._pioasm_clk_low)
+        sm.clear_rxfifo()
+        sm.restart()
+        self.powered = True
+        self.read_raw_into(self._counts, clear_fifo=False)
+
+    def read_frames_into(self, words: array.array, counts: array.array, frames: int = 1) -> None:
+        """Read `frames` conversions into `words` (frames * words-per-frame long)
+        and demultiplex them into `counts` (frames * channels long)"""
+        self._sm.readinto(words, end=frames * self._frame_words)
+        demux_into(words, counts, self.channels, frames)
+
+    def discard_pending(self) -> None:
+        """Drop the frames waiting in the RX FIFO, so the next read is a fresh one.
+
+        `clear_rxfifo()` isn't enough once a frame is more than one word: after
+        an autopush stall the SM is partway through a frame, and the next words
+        it pushes are that frame's tail. Reads only ever take whole frames, so
+        the FIFO starts on a frame boundary, and reading it out along with the
+        rest of the stalled frame leaves the next read aligned."""
+        sm = self._sm
+        words = self._words
+        frame_words = self._frame_words
+        dropped = 0
+        waiting = sm.in_waiting
+        while waiting:
+            chunk = min(waiting, frame_words)
+            sm.readinto(words, end=chunk)
+            waiting -= chunk
+            dropped += chunk
+        tail = -dropped % frame_words
+        if tail:
+            sm.readinto(words, end=tail)  # Already being clocked out, so this doesn't wait long
+
+    def read_raw_into(self, counts: array.array, clear_fifo: bool = True) -> array.array:
+        if clear_fifo:
+            self.discard_pending()
+
+        self.read_frames_into(self._words, counts)
+        return counts
+
+    def tare(self) -> None:
+        counts = self.read_raw_into(self._counts)
+        for channel in range(self.channels):
+            self.offsets[channel] = counts[channel]
+
+    def read_total(self) -> float:
+        """Sum of all channels' scaled readings, e.g. a platform on four cells"""
+        counts = self.read_raw_into(self._counts)
+        total = 0
+        for channel in range(self.channels):
+            total += (counts[channel] - self.offsets[channel]) / self.scales[channel]
+        return total
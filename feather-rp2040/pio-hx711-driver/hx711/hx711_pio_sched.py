@@ -0,0 +1,224 @@
+import time
+import rp2pio
+import adafruit_pioasm
+import array
+from digitalio import DigitalInOut
+from micropython import const
+from . import CHANNEL_A_128, CHANNEL_B_32, CHANNEL_A_64
+from .hx711_pio import HX711_PIO, HX_DATA_BITS
+from .decode import decode_word
+
+hx711_sched_read_code = """
+set x, {0}      ; gain pulses for the first conversion, 0-start
+mov osr, x      ; keep the current gain setting in osr
+
+top:
+    mov x, osr      ; gain setting this conversion was taken with
+    in x, 8         ; tag the pad byte with it, so every word says which channel it's from
+    pull noblock    ; next conversion's gain from the TX FIFO, or x again if it's empty
+    set y, {1}      ; number of data bits, 0-start
+
+wait 0 pin 0        ; wait for the hx711 DAC's cycle-complete signal
+
+    mov x, osr      ; set up our gain loop counter
+
+bitloop:            ; read in those bits!
+    set pins, 1 [3]
+    set pins, 0 [1]
+    in pins, 1
+    jmp y-- bitloop
+
+gainloop:           ; gain pulses select channel and gain for the next conversion
+    set pins, 1 [3]
+    set pins, 0
+    jmp x-- gainloop
+
+jmp top
+"""
+
+HX_TX_FIFO_DEPTH = const(4)
+
+
+class HX711_PIO_Sched(HX711_PIO):
+    """HX711_PIO that interleaves channel/gain settings per conversion.
+
+    The state machine pulls the gain pulse count for every conversion from its
+    TX FIFO, so switching channels never re-assembles or restarts it, and tags
+    each word's pad byte with the setting its data was converted at.
+
+    `schedule` is a sequence of (channel, count) pairs run round-robin, e.g.
+    `((CHANNEL_A_128, 15), (CHANNEL_B_32, 1))` for a temperature reading on
+    channel B every 16 load cell readings. `discard` conversions after every
+    switch are dropped while the input settles. The first entry is the primary
+    channel served by `read_raw()` and everything built on it."""
+
+    def __init__(
+            self,
+            pin_data: DigitalInOut,
+            pin_clk: DigitalInOut,
+            *,
+            schedule: tuple = ((CHANNEL_A_128, 1),),
+            discard: int = 1,
+            offset: int = 0,
+            scale: int = 1,
+            tare: bool = False,
+            pio_freq: int = 4000000
+        ):
+
+        self.discard = discard
+        self.readings = array.array('i', [0] * 4)  # Latest usable count, indexed by channel
+        self.sequence = array.array('I', [0] * 4)  # Usable counts seen, indexed by channel
+        self.discarded = 0
+        self.on_reading = None  # Called with (channel, count) for every usable reading
+
+        self._gain_word = array.array('I', [0])
+        self._last_tag = -1
+        self._settling = 0
+        self._pending = False  # A primary channel reading read_raw() hasn't returned yet
+        self.schedule = schedule
+
+        super().__init__(
+            pin_data, pin_clk,
+            gain=schedule[0][0], offset=offset, scale=scale, tare=tare, pio_freq=pio_freq)
+
+    @property
+    def schedule(self) -> tuple:
+        return self._schedule
+
+    @schedule.setter
+    def schedule(self, schedule: tuple) -> None:
+        # Expand to one gain per conversion, including the settling conversions to drop
+        plan = []
+        for i, (channel, count) in enumerate(schedule):
+            if channel < CHANNEL_A_128 or channel > CHANNEL_A_64 or count < 1:
+                raise ValueError("Schedule entries are (CHANNEL_*, count >= 1)")
+            switching = len(schedule) > 1 and schedule[i - 1][0] != channel
+            plan.extend([channel - 1] * (count + (self.discard if switching else 0)))
+
+        self._schedule = schedule
+        self._plan = array.array('I', plan)
+        self._plan_idx = 0
+
+    def sm_init(self, gain: int) -> None:
+        self._pioasm_read = adafruit_pioasm.assemble(
+            hx711_sched_read_code.format(gain - 1, HX_DATA_BITS - 1))
+
+        self._sm = rp2pio.StateMachine(
+            self._pioasm_read,
+            frequency=self._pio_freq,
+            first_in_pin=self._pin_data,
+            in_pin_count=1,
+            first_set_pin=self._pin_clk,
+            set_pin_count=1,
+            in_shift_right=False,
+            push_threshold=32,
+            auto_push=True,
+            out_shift_right=False,
+            pull_threshold=32
+        )
+
+        self._last_tag = -1
+        for i in range(HX_TX_FIFO_DEPTH):  # Prime the TX FIFO, then top up one per word read
+            self._feed()
+
+    def _power_up(self) -> None:
+        super()._power_up()
+        self._last_tag = -1  # The chip reset to A/128 whatever the first tag says
+
+    def _feed(self) -> None:
+        plan = self._plan
+        self._gain_word[0] = plan[self._plan_idx]
+        self._plan_idx = (self._plan_idx + 1) % len(plan)
+        self._sm.write(self._gain_word)
+
+    def poll(self) -> int:
+        """Process every word waiting in the RX FIFO without blocking, returns the
+        number of usable readings. Call at least every 4 conversions."""
+        usable = 0
+        while self._sm.in_waiting:
+            usable += self._process()
+        return usable
+
+    def _process(self) -> int:
+        sm = self._sm
+        buffer = self._buffer
+        sm.readinto(buffer)
+        self._feed()
+
+        word = buffer[0]
+        tag = word >> 24
+        if tag != self._last_tag:  # Channel switched, input is still settling
+            # The very first word's setting is unknown to the chip, always drop it
+            self._settling = max(self.discard, 1) if self._last_tag < 0 else self.discard
+            self._last_tag = tag
+        if self._settling:
+            self._settling -= 1
+            self.discarded += 1
+            return 0
+
+        channel = tag + 1
+        count = decode_word(word)
+        self.readings[channel] = count
+        self.sequence[channel] += 1
+        if channel == self._schedule[0][0]:
+            self._pending = True
+        if self.on_reading:
+            self.on_reading(channel, count)
+        return 1
+
+    def reading(self, channel: int) -> int:
+        """Latest usable count from `channel`, without blocking"""
+        self.poll()
+        return self.readings[channel]
+
+    def is_ready(self) -> bool:
+        sm = self._sm
+        while not self._pending and sm.in_waiting:
+            self._process()
+        return self._pending
+
+    def discard_pending(self) -> None:
+        self.poll()
+        self._pending = False
+
+    def _wait_pending(self) -> None:
+        """Process words until a primary channel reading turns up, giving up if
+        no new conversion does for `ready_timeout` seconds"""
+        sm = self._sm
+        timeout = self.ready_timeout
+        deadline = time.monotonic() + timeout
+        while not self._pending:
+            if sm.in_waiting:
+                self._process()
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() > deadline:
+                raise RuntimeError("HX711 not ready after {} s".format(timeout))
+
+    def read_raw(self, clear_fifo: bool = True) -> int:
+        if clear_fifo:
+            self.discard_pending()
+
+        self._wait_pending()
+
+        self._pending = False
+        return self.readings[self._schedule[0][0]]
+
+    def read_average(self, count: int = 10) -> int:
+        total = 0
+
+        for i in range(count):
+            total += self.read_raw(clear_fifo=False)
+
+        return total // count
+
+    # HX711_PIO's streaming ring reads words without feeding the schedule, and
+    # assumes a joined 8-word RX FIFO. poll() and on_reading cover the same ground.
+
+    def stream_start(self, size: int = 64) -> None:
+        raise NotImplementedError("HX711_PIO_Sched doesn't stream, use poll() and on_reading")
+
+    def stream_poll(self) -> int:
+        raise NotImplementedError("HX711_PIO_Sched doesn't stream, use poll() and on_reading")
+
+    def read_into(self, buf: array.array, end: int = None) -> int:
+        raise NotImplementedError("HX711_PIO_Sched doesn't stream, use poll() and on_reading")
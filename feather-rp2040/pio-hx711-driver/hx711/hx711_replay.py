@@ -0,0 +1,120 @@
+import time
+from . import HX711
+from .recorder import read_session
+
+
+class HX711_Replay(HX711):
+    """Plays a session logged by `hx711.recorder.SessionRecorder` back as if
+    it were a live cell, so filters, settling and calibration can be run
+    against real readings, the same ones every time.
+
+    `read_raw()` returns the recorded counts in order. With `realtime`, each
+    only becomes ready at its recorded time after the replay started,
+    otherwise they're all ready at once. `offset` and `scale` start as
+    recorded unless given, and with `follow` track any tare or rescale made
+    during the session. Running out raises RuntimeError, unless `loop`.
+
+    `recorded_temperature` can be handed to `compensate_drift()` to replay
+    the temperatures logged alongside the readings."""
+
+    def __init__(
+            self,
+            pin_data=None,
+            pin_clk=None,
+            *,
+            path: str = None,
+            session=-1,
+            gain: int = 1,
+            offset: int = None,
+            scale: float = None,
+            tare: bool = False,
+            realtime: bool = False,
+            loop: bool = False,
+            follow: bool = False
+        ):
+
+        if isinstance(session, int):
+            if path is None:
+                raise ValueError("Replay needs a path or a recorder.Session")
+            session = read_session(path, session)
+        if not len(session):
+            raise ValueError("Nothing to replay")
+
+        self.session = session
+        self.realtime = realtime
+        self.loop = loop
+        self.follow = follow
+        self.position = 0
+        self._start_ns = time.monotonic_ns()
+
+        if offset is None:
+            offset = session.offsets[0]
+        if scale is None:
+            scale = session.scales[0]
+
+        super().__init__(gain, offset, scale, tare)
+
+    def rewind(self) -> None:
+        self.position = 0
+        self._start_ns = time.monotonic_ns()
+
+    def recorded_temperature(self) -> float:
+        """Degrees C logged with the last reading returned, NaN if none was"""
+        return self.session.temperatures[max(self.position - 1, 0)]
+
+    def _due_ns(self, position: int) -> int:
+        times = self.session.times
+        return self._start_ns + (times[position] - times[0]) * 1000000
+
+    def _ready_timeout(self) -> float:
+        """`ready_timeout` counted from when the next reading is due, so
+        recorded gaps longer than it don't time out"""
+        timeout = self.ready_timeout
+        if self.realtime and self.position < len(self.session):
+            timeout += max(self._due_ns(self.position) - time.monotonic_ns(), 0) / 1000000000
+        return timeout
+
+    def wait_ready(self, timeout: float = None) -> None:
+        super().wait_ready(self._ready_timeout() if timeout is None else timeout)
+
+    async def wait_ready_async(self, timeout: float = None) -> None:
+        await super().wait_ready_async(self._ready_timeout() if timeout is None else timeout)
+
+    def is_ready(self) -> bool:
+        if self.position >= len(self.session):
+            return self.loop
+        return not self.realtime or time.monotonic_ns() >= self._due_ns(self.position)
+
+    def discard_pending(self) -> None:
+        if self.realtime:  # Skip whatever would have been converted by now
+            now = time.monotonic_ns()
+            last = len(self.session) - 1
+            while self.position < last and self._due_ns(self.position + 1) <= now:
+                self.position += 1
+
+    def _power_down(self) -> None:
+        pass
+
+    def _power_up(self) -> None:
+        pass
+
+    def read_raw(self, clear_fifo: bool = True) -> int:
+        session = self.session
+        if self.position >= len(session):
+            if not self.loop:
+                raise RuntimeError("Replay finished after {} readings".format(len(session)))
+            self.rewind()
+
+        if clear_fifo:
+            self.discard_pending()
+        if self.realtime:  # Sleep through the recorded gap, however long it was
+            wait = self._due_ns(self.position) - time.monotonic_ns()
+            if wait > 0:
+                time.sleep(wait / 1000000000)
+
+        position = self.position
+        self.position = position + 1
+        if self.follow:
+            self.offset = session.offsets[position]
+            self.scale = session.scales[position]
+        return session.counts[position]
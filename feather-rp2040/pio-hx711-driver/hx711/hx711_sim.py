@@ -0,0 +1,83 @@
+import time
+try:
+    import random
+except ImportError:
+    random = None  # Noise needs it, plain replay doesn't
+from micropython import const
+from . import HX711, CHANNEL_B_32
+
+HX_SETTLE_CONVERSIONS = const(4)  # Conversions lost to settling after power-on, per the datasheet
+
+
+class HX711_Sim(HX711):
+    """Simulated HX711 with the same timing as the real thing: conversions
+    finish every 1/sps seconds whether read or not, and none happen while
+    powered off. Handy for UI work and for running benchmarks without a cell.
+
+    `counts` is any iterable of signed 24-bit readings, one used per read and
+    the last held once it runs out. Channel B readings are `counts_b`."""
+
+    def __init__(
+            self,
+            pin_data=None,
+            pin_clk=None,
+            *,
+            gain: int = 1,
+            offset: int = 0,
+            scale: float = 1,
+            tare: bool = False,
+            sps: int = 10,
+            counts=None,
+            counts_b=None,
+            noise: int = 0
+        ):
+
+        self.sps = sps
+        self.noise = noise
+        self.conversions = 0
+        self._period_ns = 1000000000 // sps
+        self._counts = iter(counts) if counts is not None else None
+        self._counts_b = iter(counts_b) if counts_b is not None else None
+        self._last = 0
+        self._last_b = 0
+        self._start_ns = time.monotonic_ns()
+        self._taken = 0  # Conversions completed as of the last read
+
+        super().__init__(gain, offset, scale, tare)
+
+    def _completed(self) -> int:
+        return (time.monotonic_ns() - self._start_ns) // self._period_ns
+
+    def is_ready(self) -> bool:
+        return self.powered and self._completed() > self._taken
+
+    def discard_pending(self) -> None:
+        if self.powered:
+            self._taken = self._completed()
+
+    def _power_down(self) -> None:
+        pass
+
+    def _power_up(self) -> None:
+        # Output settles over the first few conversions after reset
+        self._start_ns = time.monotonic_ns() + (HX_SETTLE_CONVERSIONS - 1) * self._period_ns
+        self._taken = 0
+
+    def read_raw(self, clear_fifo: bool = True) -> int:
+        self.wait_ready()
+        self._taken = self._completed()
+        self.conversions += 1
+
+        if self.gain == CHANNEL_B_32:
+            if self._counts_b is not None:
+                self._last_b = next(self._counts_b, self._last_b)
+            count = self._last_b
+        else:
+            if self._counts is not None:
+                self._last = next(self._counts, self._last)
+            count = self._last
+
+        if self.noise and random:
+            count += random.randint(-self.noise, self.noise)
+
+        return count
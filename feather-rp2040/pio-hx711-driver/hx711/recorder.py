@@ -0,0 +1,167 @@
+"""
+`hx711.recorder`
+====================================================
+
+Weighing sessions logged to a compact fixed-record binary file: a small
+header, then 20 bytes per reading (milliseconds, raw count, offset, scale,
+temperature).
+Records are packed into a preallocated buffer and written out once per
+`flush_every` readings, so the weighing loop neither formats text nor
+touches flash on every conversion.
+
+.. code-block:: python
+
+    recorder = SessionRecorder("/session.hxl", flush_every=64)
+    for i in range(50):
+        recorder.record_reading(hx, hx.read_raw(clear_fifo=False))
+    recorder.close()
+
+    # ...later, on a host or the board
+    hx = backends.create("replay", path="/session.hxl")
+
+A log holds every session appended to it. A new one starts wherever the
+timestamp goes backwards, i.e. the board rebooted. Writing needs the
+filesystem to be writable from CircuitPython, e.g.
+`storage.remount("/", readonly=False)` in `boot.py`.
+
+* Author(s): Erik Hess
+"""
+
+import array
+import struct
+import time
+
+try:
+    # Only used for typing
+    from typing import List, Tuple
+except ImportError:
+    pass
+
+_MAGIC = b"HXLG"
+_FORMAT_VERSION = 1
+_HEADER = "<4sBBH"  # magic, format version, reserved, record size
+_RECORD = "<Iiiff"  # ms since boot, raw count, offset, scale, degrees C (NaN without a temperature source)
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_RECORD_SIZE = struct.calcsize(_RECORD)
+_NAN = float("nan")
+
+
+class SessionRecorder:
+    """Appends readings to the log at `path`, creating it if needed. Records
+    collect in a `flush_every` x 20 byte buffer and reach the file in one
+    write when it fills, on `flush()` or on `close()`; readings still in the
+    buffer are lost if power goes first."""
+
+    def __init__(self, path: str, flush_every: int = 64):
+        if flush_every < 1:
+            raise ValueError("flush_every must be at least 1")
+
+        self._buffer = bytearray(flush_every * _RECORD_SIZE)
+        self._view = memoryview(self._buffer)
+        self._pos = 0
+        self.records = 0
+        self.flushes = 0
+
+        try:
+            with open(path, "rb") as log_file:
+                _check_header(log_file.read(_HEADER_SIZE))
+            self._file = open(path, "ab")
+        except OSError:
+            self._file = open(path, "wb")
+            self._file.write(struct.pack(_HEADER, _MAGIC, _FORMAT_VERSION, 0, _RECORD_SIZE))
+
+    def record(self, raw: int, offset: int, scale: float, t_ms: int = None, temperature: float = None) -> None:
+        """Buffer one reading, timestamped now unless `t_ms` is given"""
+        if t_ms is None:
+            t_ms = time.monotonic_ns() // 1000000
+        struct.pack_into(_RECORD, self._buffer, self._pos, t_ms & 0xFFFFFFFF, raw, offset, scale,
+                         _NAN if temperature is None else temperature)
+        self._pos += _RECORD_SIZE
+        self.records += 1
+        if self._pos == len(self._buffer):
+            self.flush()
+
+    def record_reading(self, hx, raw: int) -> None:
+        """Buffer `raw` along with the offset, scale and last temperature `hx`
+        is weighing with"""
+        self.record(raw, hx.offset, hx.scale, temperature=hx.temperature)
+
+    def flush(self) -> None:
+        if self._pos:
+            self._file.write(self._view[:self._pos])
+            self._file.flush()
+            self._pos = 0
+            self.flushes += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Session:
+    """One recorded session as parallel arrays: `times` (ms), `counts`,
+    `offsets`, `scales` and `temperatures` (NaN where none was logged)"""
+
+    def __init__(self):
+        self.times = array.array('I')
+        self.counts = array.array('i')
+        self.offsets = array.array('i')
+        self.scales = array.array('f')
+        self.temperatures = array.array('f')
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def duration(self) -> float:
+        """Seconds from the first reading to the last"""
+        if not self.times:
+            return 0.0
+        return (self.times[-1] - self.times[0]) / 1000
+
+
+def read_sessions(path: str) -> List[Session]:
+    """Every session in the log, oldest first"""
+    with open(path, "rb") as log_file:
+        _check_header(log_file.read(_HEADER_SIZE))
+        data = log_file.read()
+
+    sessions = []
+    session = None
+    last = None
+    for pos in range(0, len(data) - _RECORD_SIZE + 1, _RECORD_SIZE):
+        t_ms, raw, offset, scale, temperature = struct.unpack_from(_RECORD, data, pos)
+        if session is None or t_ms < last:
+            session = Session()
+            sessions.append(session)
+        session.times.append(t_ms)
+        session.counts.append(raw)
+        session.offsets.append(offset)
+        session.scales.append(scale)
+        session.temperatures.append(temperature)
+        last = t_ms
+
+    return sessions
+
+
+def read_session(path: str, session: int = -1) -> Session:
+    """One session from the log, the latest by default"""
+    sessions = read_sessions(path)
+    if not sessions:
+        raise ValueError("No readings recorded in {}".format(path))
+    return sessions[session]
+
+
+def _check_header(data: bytes) -> None:
+    if len(data) < _HEADER_SIZE:
+        raise ValueError("Not a version {} HX711 session log".format(_FORMAT_VERSION))
+    magic, version, reserved, record_size = struct.unpack_from(_HEADER, data, 0)
+    if magic != _MAGIC or version != _FORMAT_VERSION or record_size != _RECORD_SIZE:
+        raise ValueError("Not a version {} HX711 session log".format(_FORMAT_VERSION))
@@ -0,0 +1,91 @@
+"""
+`hx711.stability`
+====================================================
+
+Settling detection for HX711 readings: decides when the load has stopped
+moving so a weight can be taken as soon as it's physically ready, rather than
+after a fixed number of conversions.
+
+* Author(s): Erik Hess
+"""
+
+import array
+
+try:
+    # Only used for typing
+    from typing import Callable, Optional
+except ImportError:
+    pass
+
+
+class StabilityDetector:
+    """Tracks the variance of the last `window` raw counts with running sums,
+    O(1) per sample. The signal is stable once the window is full and its
+    standard deviation is at or below `tolerance` counts.
+
+    `on_stable(mean)` is called with the window's mean count each time the
+    signal goes from moving to stable, then re-arms once it moves again."""
+
+    def __init__(
+        self,
+        window: int = 8,
+        tolerance: int = 20,
+        on_stable: Optional[Callable[[int], None]] = None
+    ):
+        if window < 2:
+            raise ValueError("Window must hold at least 2 samples")
+
+        self.window = window
+        self.tolerance = tolerance
+        self.on_stable = on_stable
+
+        self._ring = array.array('i', [0] * window)
+        self.reset()
+
+    def reset(self) -> None:
+        self._head = 0
+        self.count = 0
+        self._sum = 0
+        self._sum_sq = 0
+        self._anchor = None  # Sums are kept relative to this to keep them small
+        self.stable = False
+
+    @property
+    def mean(self) -> int:
+        if not self.count:
+            raise ValueError("No samples yet")
+        return self._anchor + self._sum // self.count
+
+    def update(self, value: int) -> bool:
+        """Add a raw count, returns True if the window is stable"""
+        if self._anchor is None:
+            self._anchor = value
+
+        value -= self._anchor
+        ring = self._ring
+        head = self._head
+
+        if self.count == self.window:
+            old = ring[head]
+            self._sum -= old
+            self._sum_sq -= old * old
+        else:
+            self.count += 1
+
+        ring[head] = value
+        self._sum += value
+        self._sum_sq += value * value
+        self._head = (head + 1) % self.window
+
+        # n * var = sum_sq - sum**2 / n, compared without any division
+        count = self.count
+        stable = count == self.window and (
+            count * self._sum_sq - self._sum * self._sum
+            <= count * count * self.tolerance * self.tolerance
+        )
+
+        if stable and not self.stable and self.on_stable:
+            self.on_stable(self.mean)
+
+        self.stable = stable
+        return stable
@@ -0,0 +1,328 @@
+##
+## This file is part of the libsigrokdecode project.
+##
+## Copyright (C) 2022 Erik Hess <me@erikhess.com>
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 2 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, see <http://www.gnu.org/licenses/>.
+##
+
+## Offline, NumPy-vectorized companion to the `pd.py` decoder.
+##
+## Reads a whole capture (a sigrok `.sr` session or a packed binary dump),
+## finds every SCK/DOUT edge in bulk and decodes all frames at once, instead
+## of stepping edge by edge through `wait()`. Not loaded by sigrok itself.
+##
+## Usage:
+##
+##   python offline.py capture.sr                        # One line per frame
+##   python offline.py capture.sr --annotations          # sigrok-cli style annotations
+##   python offline.py dump.bin --samplerate 24000000 --unitsize 1 --dout 0 --sck 1
+
+import argparse
+import configparser
+import sys
+import zipfile
+
+import numpy
+
+# Same classes, in the same order, as `Decoder.annotations` in pd.py
+ANNOTATIONS = (
+    ('rdy', 'Ready'),             # 0
+    ('sof', 'Start of frame'),    # 1
+    ('eof', 'End of frame'),      # 2
+    ('bit', 'Bit'),               # 3
+    ('bitlength', 'Bit Length'),  # 4
+    ('pwr-dn', 'Power down'),     # 5
+    ('pwr-on', 'Power on'),       # 6
+    ('count', 'ADC count'),       # 7
+    ('gain', 'Gain'),             # 8
+    ('err', 'Error'),             # 9
+    ('jitter', 'Bit jitter'),     # 10
+)
+(ANN_RDY, ANN_SOF, ANN_EOF, ANN_BIT, ANN_BITLENGTH, ANN_PWR_DN, ANN_PWR_ON, ANN_COUNT, ANN_GAIN, ANN_ERR,
+ ANN_JITTER) = range(11)
+
+DATA_BITS = 24
+POWER_DOWN_S = 0.00006  # SCK high this long powers the HX711 down
+FRAME_GAP_S = 0.0001    # SCK low this long ends a frame, like pd.py's two-bit timeout but fixed
+CHUNK_SAMPLES = 1 << 24
+
+
+def unpack_units(raw: bytes, unitsize: int) -> numpy.ndarray:
+    dtype = {1: numpy.uint8, 2: '<u2', 4: '<u4'}.get(unitsize)
+    if dtype is None:
+        raise ValueError("Unsupported unitsize {}".format(unitsize))
+    usable = len(raw) - len(raw) % unitsize
+    return numpy.frombuffer(raw, dtype=dtype, count=usable // unitsize)
+
+
+def parse_samplerate(text: str) -> int:
+    number, _, unit = text.strip().partition(' ')
+    scale = {'': 1, 'Hz': 1, 'kHz': 1000, 'KHz': 1000, 'MHz': 1000000, 'GHz': 1000000000}[unit.strip()]
+    return int(float(number) * scale)
+
+
+def sr_chunks(path: str, dout: str = None, sck: str = None):
+    """Open a sigrok session, returns (samplerate, dout bit, sck bit, chunk iterator).
+    Probes are found by name (DOUT/SCK, any case), else probe1 is DOUT and probe2 SCK."""
+    session = zipfile.ZipFile(path)
+    meta = configparser.ConfigParser()
+    meta.read_string(session.read('metadata').decode())
+    device = meta['device 1']
+
+    samplerate = parse_samplerate(device['samplerate'])
+    unitsize = int(device['unitsize'])
+    capturefile = device['capturefile']
+
+    probes = {}
+    for key, name in device.items():
+        if key.startswith('probe'):
+            probes[name.lower()] = int(key[5:]) - 1
+    dout_bit = probes.get((dout or 'dout').lower(), 0)
+    sck_bit = probes.get((sck or 'sck').lower(), 1)
+
+    names = [name for name in session.namelist() if name.startswith(capturefile + '-')]
+    names.sort(key=lambda name: int(name.rsplit('-', 1)[1]))
+
+    def chunks():
+        for name in names:
+            yield unpack_units(session.read(name), unitsize)
+
+    return samplerate, dout_bit, sck_bit, chunks()
+
+
+def binary_chunks(path: str, unitsize: int = 1, chunk: int = CHUNK_SAMPLES):
+    """Packed little-endian samples, one `unitsize`-byte unit per sample"""
+    with open(path, 'rb') as dump:
+        while True:
+            raw = dump.read(chunk * unitsize)
+            if not raw:
+                return
+            yield unpack_units(raw, unitsize)
+
+
+class Edges:
+    """Every SCK and DOUT transition in a capture, gathered chunk by chunk so
+    captures larger than memory stream through"""
+
+    def __init__(self):
+        self.sck_rise = []
+        self.sck_fall = []
+        self.dout_at_fall = []  # DOUT sampled at each SCK fall, like pd.py does
+        self.dout_fall = []     # DOUT falls with SCK low: conversion ready
+        self.length = 0
+
+    def scan(self, chunks, dout_bit: int, sck_bit: int) -> 'Edges':
+        sck_mask = 1 << sck_bit
+        dout_mask = 1 << dout_bit
+        mask = sck_mask | dout_mask
+        previous = None
+        offset = 0
+        for chunk in chunks:
+            if not len(chunk):
+                continue
+            if previous is None:
+                previous = chunk[0]
+
+            # One pass over the samples finds every change, everything after
+            # that only touches the (few) changed samples
+            changed = numpy.flatnonzero(chunk[1:] != chunk[:-1]) + 1
+            if chunk[0] != previous:
+                changed = numpy.concatenate(([0], changed))
+            after = chunk[changed] & mask
+            before = chunk[changed - 1] & mask
+            if len(changed) and changed[0] == 0:
+                before[0] = previous & mask
+
+            sck_before = (before & sck_mask) != 0
+            sck_after = (after & sck_mask) != 0
+            dout_before = (before & dout_mask) != 0
+            dout_after = (after & dout_mask) != 0
+
+            rises = changed[~sck_before & sck_after]
+            falls_at = ~sck_after & sck_before
+            falls = changed[falls_at]
+            ready = changed[dout_before & ~dout_after & ~sck_after]
+
+            self.sck_rise.append(rises + offset)
+            self.sck_fall.append(falls + offset)
+            self.dout_at_fall.append(dout_after[falls_at].astype(numpy.int8))
+            self.dout_fall.append(ready + offset)
+
+            previous = chunk[-1]
+            offset += len(chunk)
+
+        self.length = offset
+        for name in ('sck_rise', 'sck_fall', 'dout_at_fall', 'dout_fall'):
+            parts = getattr(self, name)
+            setattr(self, name, numpy.concatenate(parts) if parts else numpy.zeros(0, dtype=numpy.int64))
+        return self
+
+
+class Frames:
+    """Bulk decode of the edges: one entry per readout in `sof`, `eof`, `end`,
+    `count`, `gain` and `pulses`, one per SCK pulse in `bit_*`"""
+
+    def __init__(self, edges: Edges, samplerate: int, frame_gap: float = FRAME_GAP_S):
+        self.samplerate = samplerate
+        rise, fall, dout = edges.sck_rise, edges.sck_fall, edges.dout_at_fall
+
+        # Pair every rise with the fall after it, dropping a pulse cut off at either end
+        if len(fall) and len(rise) and fall[0] < rise[0]:
+            fall, dout = fall[1:], dout[1:]
+        pulses = min(len(rise), len(fall))
+        rise, fall, dout = rise[:pulses], fall[:pulses], dout[:pulses]
+
+        power_down = (fall - rise) >= int(POWER_DOWN_S * samplerate)
+        self.power_down = rise[power_down] + int(POWER_DOWN_S * samplerate)
+        self.power_on = fall[power_down]
+
+        keep = ~power_down
+        rise, fall, dout = rise[keep], fall[keep], dout[keep].astype(numpy.int64)
+
+        # A new frame starts at the first pulse and after every long low gap. DOUT
+        # ready edges can't be trusted for this on glitchy bit-banged captures.
+        starts = numpy.ones(len(rise), dtype=bool)
+        starts[1:] = (rise[1:] - fall[:-1]) >= int(frame_gap * samplerate)
+        frame = numpy.cumsum(starts) - 1
+        first = numpy.flatnonzero(starts)
+        index = numpy.arange(len(rise)) - first[frame]  # Pulse number within its frame
+
+        self.pulses = numpy.bincount(frame, minlength=len(first)) if len(rise) else numpy.zeros(0, dtype=numpy.int64)
+        last = first + self.pulses - 1
+
+        data = index < DATA_BITS
+        weights = numpy.zeros(len(rise), dtype=numpy.int64)
+        weights[data] = dout[data] << (DATA_BITS - 1 - index[data])
+        raw = numpy.bincount(frame, weights=weights, minlength=len(first)).astype(numpy.int64)
+        self.count = numpy.where(raw > 0x7FFFFF, raw - 0x1000000, raw)
+
+        self.gain = self.pulses - DATA_BITS
+        self.sof = rise[first] if len(first) else rise[:0]
+        eof_pulse = numpy.minimum(first + DATA_BITS, last)  # 25th rise, like pd.py's end_bit
+        self.eof = numpy.where(self.pulses > DATA_BITS, rise[eof_pulse], fall[last]) if len(first) else rise[:0]
+        self.end = fall[last] if len(first) else fall[:0]
+        self.valid = (self.gain >= 1) & (self.gain <= 3)
+
+        # Bits span rise to next rise within the frame, the last one rise to fall
+        self.bit_start = rise
+        self.bit_end = numpy.empty_like(rise)
+        self.bit_end[:-1] = rise[1:]
+        if len(rise):
+            self.bit_end[last] = fall[last]
+        self.bit_value = dout
+        self.bit_index = index
+        self.ready = edges.dout_fall
+
+        # Per-frame rise-to-rise bit length stats, as pd.py's jitter annotation
+        timed = numpy.ones(len(rise), dtype=bool)
+        timed[last] = False
+        lengths = (self.bit_end - self.bit_start)[timed]
+        timed_frame = frame[timed]
+        self.bitlength_count = numpy.bincount(timed_frame, minlength=len(first))
+        self.bitlength_sum = numpy.bincount(timed_frame, weights=lengths, minlength=len(first)).astype(numpy.int64)
+        self.bitlength_min = numpy.full(len(first), numpy.iinfo(numpy.int64).max)
+        self.bitlength_max = numpy.zeros(len(first), dtype=numpy.int64)
+        numpy.minimum.at(self.bitlength_min, timed_frame, lengths)
+        numpy.maximum.at(self.bitlength_max, timed_frame, lengths)
+        self.jitter = numpy.where(self.bitlength_count > 0, self.bitlength_max - self.bitlength_min, 0)
+
+    def __len__(self) -> int:
+        return len(self.sof)
+
+    def bit_lengths(self) -> numpy.ndarray:
+        return self.bit_end - self.bit_start
+
+    def jitter_texts(self, timed: int, total: int, shortest: int, longest: int) -> list:
+        """pd.py's put_jitter() texts"""
+        jitter = longest - shortest
+        text = 'Bit avg {}, min {}, max {}, jitter {}'.format(total // timed, shortest, longest, jitter)
+        if self.samplerate:
+            text += ' ({:.0f} ns)'.format(jitter * 1e9 / self.samplerate)
+        return [text, 'Jitter {}'.format(jitter), 'J']
+
+    def annotations(self):
+        """(start, end, class, [texts]) tuples sorted by start sample, the same
+        classes and texts pd.py puts"""
+        out = []
+        for sample in self.ready.tolist():
+            out.append((sample, sample, ANN_RDY, ['Ready', 'Rdy', 'R']))
+        for sample in self.power_down.tolist():
+            out.append((sample, sample, ANN_PWR_DN, ['Power Down', 'P_DN', 'D']))
+        for sample in self.power_on.tolist():
+            out.append((sample, sample, ANN_PWR_ON, ['Power On', 'P_ON', 'O']))
+        for start, end, value in zip(self.bit_start.tolist(), self.bit_end.tolist(), self.bit_value.tolist()):
+            out.append((start, end, ANN_BIT, [str(value)]))
+            out.append((start, end, ANN_BITLENGTH, [str(end - start)]))
+        for sof, eof, end, count, gain, valid, timed, total, shortest, longest in zip(
+                self.sof.tolist(), self.eof.tolist(), self.end.tolist(),
+                self.count.tolist(), self.gain.tolist(), self.valid.tolist(),
+                self.bitlength_count.tolist(), self.bitlength_sum.tolist(),
+                self.bitlength_min.tolist(), self.bitlength_max.tolist()):
+            out.append((sof, sof, ANN_SOF, ['Start', 'SOF', 'S']))
+            out.append((eof, eof, ANN_EOF, ['End', 'EOF', 'E']))
+            if gain >= 0:
+                out.append((sof, eof, ANN_COUNT, [str(count)]))
+            if valid:
+                out.append((eof, end, ANN_GAIN, [str(gain)]))
+                out.append((sof, eof, ANN_JITTER, self.jitter_texts(timed, total, shortest, longest)))
+            else:
+                out.append((sof, end, ANN_ERR, ['{} SCK pulses, expected 25-27'.format(gain + DATA_BITS)]))
+        out.sort(key=lambda annotation: annotation[0])
+        return out
+
+
+def decode(chunks, samplerate: int, dout_bit: int = 0, sck_bit: int = 1, frame_gap: float = FRAME_GAP_S) -> Frames:
+    return Frames(Edges().scan(chunks, dout_bit, sck_bit), samplerate, frame_gap)
+
+
+def decode_file(
+        path: str, samplerate: int = None, unitsize: int = 1, dout_bit: int = 0, sck_bit: int = 1,
+        frame_gap: float = FRAME_GAP_S) -> Frames:
+    if zipfile.is_zipfile(path):
+        samplerate, dout_bit, sck_bit, chunks = sr_chunks(path)
+    else:
+        if not samplerate:
+            raise ValueError("Binary dumps need a samplerate")
+        chunks = binary_chunks(path, unitsize)
+    return decode(chunks, samplerate, dout_bit, sck_bit, frame_gap)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline HX711 capture decoder')
+    parser.add_argument('capture', help='sigrok .sr session or packed binary dump')
+    parser.add_argument('--samplerate', type=int, help='Hz, binary dumps only')
+    parser.add_argument('--unitsize', type=int, default=1, help='bytes per sample, binary dumps only')
+    parser.add_argument('--dout', type=int, default=0, help='DOUT bit, binary dumps only')
+    parser.add_argument('--sck', type=int, default=1, help='SCK bit, binary dumps only')
+    parser.add_argument('--frame-gap', type=float, default=FRAME_GAP_S, help='seconds of SCK low that end a frame')
+    parser.add_argument('--annotations', action='store_true', help='print every annotation')
+    args = parser.parse_args(argv)
+
+    frames = decode_file(args.capture, args.samplerate, args.unitsize, args.dout, args.sck, args.frame_gap)
+
+    if args.annotations:
+        for start, end, cls, texts in frames.annotations():
+            print('{}-{} hx711-1: {}: {}'.format(start, end, ANNOTATIONS[cls][0], texts[0]))
+        return
+
+    for sof, count, gain, valid in zip(frames.sof.tolist(), frames.count.tolist(),
+                                       frames.gain.tolist(), frames.valid.tolist()):
+        print('{:12.6f} s  {:9}  gain pulses {}{}'.format(
+            sof / frames.samplerate, count, gain, '' if valid else '  ERROR'))
+    print('{} frames, {} power downs'.format(len(frames), len(frames.power_down)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,8 @@
 from common.srdhelper import bitpack
 import sigrokdecode as srd
 
+POWER_DOWN_US = 60  # SCK high this long powers the HX711 down
+
 class Decoder(srd.Decoder):
     api_version = 3
     id = 'hx711'
@@ -58,6 +60,7 @@ class Decoder(srd.Decoder):
         ('count', 'ADC count'),       # 7
         ('gain', 'Gain'),             # 8
         ('err', 'Error'),             # 9
+        ('jitter', 'Bit jitter'),     # 10
     )
     annotation_rows = (
         ('bits', 'Bits', (3,)),
@@ -66,6 +69,7 @@ class Decoder(srd.Decoder):
         ('adc', 'ADC', (7,)),
         ('gainset', 'Gain Set', (8,)),
         ('errors', 'Errors', (9,)),
+        ('timing', 'Bit Timing', (10,)),
     )
 
     def __init__(self):
@@ -83,8 +87,8 @@ class Decoder(srd.Decoder):
 
     def reset_variables(self):
         self.state = 'IDLE'
-        self.rawbits = []  # All bits
-        self.bitlengths = []  # All bit lengths
+        self.bitcount = 0  # Bits read this frame
+        self.reset_bitlengths()
         self.sof = None  # Start of frame
         self.eof = None  # End of frame
         self.start_bit = None  # Start of bit
@@ -128,18 +132,69 @@ class Decoder(srd.Decoder):
     def put_error(self, start, end, error):
         self.put(start, end, self.out_ann, [9, [str(error)]])
 
+    def put_jitter(self):
+        if not self.bitlength_count:
+            return
+        avg = self.bitlength_sum // self.bitlength_count
+        jitter = self.bitlength_max - self.bitlength_min
+        text = 'Bit avg {}, min {}, max {}, jitter {}'.format(
+            avg, self.bitlength_min, self.bitlength_max, jitter)
+        if self.samplerate:
+            text += ' ({:.0f} ns)'.format(jitter * 1e9 / self.samplerate)
+        self.put(self.sof, self.eof, self.out_ann, [10, [text, 'Jitter {}'.format(jitter), 'J']])
+
+    def reset_bitlengths(self):
+        # Running stats, so timing a bit costs the same however long the frame
+        self.bitlength_sum = 0
+        self.bitlength_count = 0
+        self.bitlength_min = None
+        self.bitlength_max = None
+
+    def add_bitlength(self, bitlength):
+        self.bitlength_sum += bitlength
+        self.bitlength_count += 1
+        if self.bitlength_min is None or bitlength < self.bitlength_min:
+            self.bitlength_min = bitlength
+        if self.bitlength_max is None or bitlength > self.bitlength_max:
+            self.bitlength_max = bitlength
+
     def handle_bit(self):
-        self.rawbits.append(self.this_bit)
-        self.adc_count = self.adc_count << 1 | self.this_bit
+        self.bitcount += 1
+        if self.bitcount <= 24:  # Anything after is gain pulses, DOUT is high by then
+            self.adc_count = self.adc_count << 1 | self.this_bit
 
     def get_samples_per_bit(self):
-        if len(self.bitlengths) > 1:
-            return sum(self.bitlengths) // len(self.bitlengths)
-        elif len(self.bitlengths) == 1:
-            return sum(self.bitlengths)
+        if self.bitlength_count:
+            return self.bitlength_sum // self.bitlength_count
+        elif self.samplerate:
+            return self.samplerate // 20000  # No bits timed yet, assume the datasheet's 50 us max SCK high
         else:
             raise RuntimeError("Bitlengths is empty! samplerate: {}".format(self.samplerate))
 
+    def end_frame(self):
+        self.gain = self.bitcount - 24
+        self.gain_end = self.eof + self.get_samples_per_bit() * self.gain
+        self.put_gain()
+        self.put_jitter()
+        self.state = 'IDLE'
+        self.reset_variables()
+
+    def handle_clock_held(self):
+        # SCK went high and stayed there past the bit timeout. Held for 60 us
+        # it powers the chip down, which ends the frame we were reading.
+        rise = self.start_bit
+        self.wait({1: 'f'})
+        if self.samplerate and self.samplenum - rise >= self.samplerate * POWER_DOWN_US // 1000000:
+            self.power_dn = rise + self.samplerate * POWER_DOWN_US // 1000000
+            self.put_power_dn()
+            self.power_on = self.samplenum
+            self.put_power_on()
+        if self.bitcount > 24:
+            self.end_frame()
+        else:
+            self.put_error(self.sof, self.samplenum, 'Partial frame, {} bits'.format(self.bitcount))
+            self.reset_variables()
+
     def metadata(self, key, value):
         if key == srd.SRD_CONF_SAMPLERATE:
             self.samplerate = value
@@ -148,8 +203,8 @@ class Decoder(srd.Decoder):
         # State machine
         while True:
             if self.state == 'IDLE':
-                self.put_error(self.samplenum, self.samplenum, 'IDLE ENTER, len(rawbits) = {}'.format(
-                    len(self.rawbits)))
+                self.put_error(self.samplenum, self.samplenum, 'IDLE ENTER, bitcount = {}'.format(
+                    self.bitcount))
                 # Wait for ready state
                 self.wait({0: 'f', 0: 'l'})
                 if self.matched[0]:
@@ -163,8 +218,8 @@ class Decoder(srd.Decoder):
                 self.put_sof()
                 self.start_bit = self.samplenum
                 self.adc_count = 0
-                self.rawbits = []
-                self.bitlengths = []
+                self.bitcount = 0
+                self.reset_bitlengths()
                 self.gain = 0
                 self.state = 'START_READING'
             elif self.state == 'START_READING':
@@ -174,11 +229,11 @@ class Decoder(srd.Decoder):
                 self.state = 'READING'
             elif self.state == 'READING':
                 wait_max = self.get_samples_per_bit() * 2
-                if (len(self.rawbits) - 1) < 27:
+                if (self.bitcount - 1) < 27:
                     self.wait([{'skip': wait_max}, {1: 'r'}])  # Wait for clcok-rise before proceeding to next bit
                     if not self.matched[0]:
                         self.end_bit = self.samplenum
-                        self.bitlengths.append(self.end_bit - self.start_bit)
+                        self.add_bitlength(self.end_bit - self.start_bit)
                         self.put_bitlength(self.end_bit - self.start_bit)
                         self.put_bit()
                         self.start_bit = self.samplenum
@@ -186,24 +241,19 @@ class Decoder(srd.Decoder):
                         if not self.matched[0]:
                             self.this_bit = hx_rx
                             self.handle_bit()
-                            if (len(self.rawbits) - 1) == 24:
+                            if (self.bitcount - 1) == 24:
                                 self.eof = self.end_bit
                                 self.put_eof()
                                 self.put_adc_count()
                         else:
-                            # TODO: Handle stuck clock
-                            raise RuntimeError("DEBUG: SKIP TIME HIT, INNER READ LOOP")
+                            self.handle_clock_held()
                     else:
                         # raise RuntimeError("DEBUG: SKIP TIME HIT, MAIN READ STATE")
                         # Handle end of signal
-                        self.put_error(self.samplenum, self.samplenum, 'END READ LOOP, len(rawbits) = {}'.format(
-                            self.end_bit, len(self.rawbits)))
-                        if len(self.rawbits) > 24:
+                        self.put_error(self.samplenum, self.samplenum, 'END READ LOOP, bitcount = {}'.format(
+                            self.bitcount))
+                        if self.bitcount > 24:
                             # self.put_error(self.samplenum, self.samplenum, 'ENTER GAIN STATE')
-                            self.gain = len(self.rawbits) - 24
-                            self.gain_end = self.get_samples_per_bit() * self.gain
-                            self.put_gain()
-                            self.state = 'IDLE'
-                            self.reset_variables()
+                            self.end_frame()
                         else:
                             pass
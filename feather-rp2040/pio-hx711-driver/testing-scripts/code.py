@@ -16,19 +16,19 @@ if mode == "GPIO":
     dio_data = DigitalInOut(board.D5)
     dio_clk = DigitalInOut(board.D6)
 
-    hx = hx711_gpio.HX711_GPIO(dio_data, dio_clk, gain=1, scalar=403, tare=True)
+    hx = hx711_gpio.HX711_GPIO(dio_data, dio_clk, gain=1, scale=403, tare=True)
 elif mode == "PIO":
     import hx711.hx711_pio as hx711_pio
 
     pin_data = board.D5
     pin_clk = board.D6
 
-    hx = hx711_pio.HX711_PIO(pin_data, pin_clk, scalar=403, tare=True)
+    hx = hx711_pio.HX711_PIO(pin_data, pin_clk, scale=403, tare=True)
 
-print("init, offset: {}, scalar: {}".format(hx.offset, hx.scalar))
+print("init, offset: {}, scale: {}".format(hx.offset, hx.scale))
 
 while True:
     reading = hx.read(5)
     reading_raw = hx.read_raw()
-    print("[{: 8.2f} g] [{: 8} raw] offset: {}, scalar: {}".format(reading, reading_raw, hx.offset, hx.scalar))
+    print("[{: 8.2f} g] [{: 8} raw] offset: {}, scale: {}".format(reading, reading_raw, hx.offset, hx.scale))
     oled.text_area.text = oled.text_hx.format(reading)
\ No newline at end of file
@@ -1,12 +1,14 @@
 # Minimal HX711 driver demo
+#
+# The v1 minimal driver grew into the `hx711` package's `pio` backend
 
 import board
-from hx711_pio import HX711_PIO
+from hx711 import backends
 
 pin_data = board.D5
 pin_clk = board.D6
 
-hx711 = HX711_PIO(pin_data, pin_clk)
+hx711 = backends.create("pio", pin_data, pin_clk)
 
 while True:
     print(hx711.read_raw())
\ No newline at end of file